@@ -77,6 +77,27 @@ options:
       - How often to retry on SERVFAIL errors.
     type: int
     default: 0
+  cache_size:
+    description:
+      - Maximal number of answers to cache. By default, answers are not cached.
+      - The cache is shared by all lookups running in the same process that use the same DNS servers and the same O(query_timeout).
+      - Negative answers (the DNS name does not exist, or has no records of the requested type) are also cached, in a cache
+        shared by all lookups running in the same process.
+      - The caches live in the Ansible worker process that runs the lookup. They are not cleared when a task is retried with
+        C(until), so such a retry loop keeps getting the cached answer until it expires. Negative answers are cached for up to
+        the SOA minimum TTL of the zone. Do not enable caching for lookups that wait for a DNS record to change.
+      - Set to V(0) to disable caching, including the caching of negative answers.
+    type: int
+    default: 0
+    version_added: 4.2.0
+  max_concurrency:
+    description:
+      - Maximal number of DNS names to look up at the same time.
+      - The results are always returned in the order of O(_terms).
+      - The default V(1) looks up the DNS names one after another.
+    type: int
+    default: 1
+    version_added: 4.2.0
   nxdomain_handling:
     description:
       - How to handle NXDOMAIN errors. These appear if an unknown domain name is queried.
@@ -154,6 +175,7 @@ _result:
       Additional: []
 """
 
+import functools
 import typing as t
 
 from ansible.errors import AnsibleLookupError
@@ -167,11 +189,13 @@ from ansible_collections.community.dns.plugins.module_utils._dnspython_records i
 from ansible_collections.community.dns.plugins.module_utils._ips import is_ip_address
 from ansible_collections.community.dns.plugins.module_utils._resolver import (
     SimpleResolver,
+    run_concurrently,
 )
 from ansible_collections.community.dns.plugins.plugin_utils._resolver import (
     assert_requirements_present as assert_requirements_present_dnspython,
 )
 from ansible_collections.community.dns.plugins.plugin_utils._resolver import (
+    get_caches,
     guarded_run,
 )
 
@@ -314,10 +338,19 @@ class LookupModule(LookupBase):
 
         self.set_options(var_options=variables, direct=kwargs)
 
+        max_concurrency: int = self.get_option("max_concurrency")
+        if max_concurrency < 1:
+            raise AnsibleLookupError("max_concurrency must be at least 1")
+
+        negative_cache, resolver_pool = get_caches(self.get_option("cache_size"))
         resolver = SimpleResolver(
             timeout=self.get_option("query_timeout"),
             timeout_retries=self.get_option("query_retry"),
             servfail_retries=self.get_option("servfail_retries"),
+            negative_cache=negative_cache,
+            resolver_pool=resolver_pool,
+            cache_size=self.get_option("cache_size"),
+            max_concurrency=max_concurrency,
         )
 
         record_type = self.get_option("type")
@@ -350,10 +383,10 @@ class LookupModule(LookupBase):
                     )
                 )
 
-        result = []
-        for name in terms:
-            result.append(
-                self._resolve(
+        results = run_concurrently(
+            [
+                functools.partial(
+                    self._resolve,
                     resolver,
                     to_text(name),
                     rdtype,
@@ -362,5 +395,8 @@ class LookupModule(LookupBase):
                     target_can_be_relative=search,
                     search=search,
                 )
-            )
-        return result
+                for name in terms
+            ],
+            max_concurrency=max_concurrency,
+        )
+        return results
@@ -0,0 +1,89 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Note that this module util is **PRIVATE** to the collection. It can have breaking changes at any time.
+# Do not use this from other collections or standalone plugins/modules!
+
+from __future__ import annotations
+
+import json
+import traceback
+import typing as t
+
+from ansible.module_utils.common.text.converters import to_native
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Mapping
+
+    from ansible.module_utils.basic import AnsibleModule
+
+
+# Maximal number of DNS names whose lookup failed to list in the summary
+_MAX_FAILED_NAMES = 100
+
+
+class JSONLinesWriter:
+    """
+    Writes results to a file as they come in, one JSON object per line.
+
+    Only a summary of the results is kept in memory, so that the memory needed
+    does not grow with the number of results. If ``dry_run`` is ``True``, the
+    summary is created without writing the file.
+    """
+
+    def __init__(self, path: str, dry_run: bool = False) -> None:
+        self.path = path
+        self.total = 0
+        self.failed = 0
+        self.failed_names: list[str] = []
+        # The file stays open until close() is called
+        self._file = (
+            None if dry_run else open(path, "w", encoding="utf-8")  # noqa: SIM115
+        )
+
+    def write(self, result: Mapping[str, t.Any], error: str | None = None) -> None:
+        """
+        Write ``result`` as one line. If ``error`` is provided, it is added to the line
+        as ``error``, and the result is counted as failed.
+        """
+        if error is not None:
+            result = {**result, "error": error}
+            self.failed += 1
+            if len(self.failed_names) < _MAX_FAILED_NAMES:
+                self.failed_names.append(result["name"])
+        if self._file is not None:
+            self._file.write(json.dumps(result) + "\n")
+            # Allow to follow the progress while the module is running
+            self._file.flush()
+        self.total += 1
+
+    def get_summary(self) -> dict[str, t.Any]:
+        return {
+            "path": self.path,
+            "total": self.total,
+            "succeeded": self.total - self.failed,
+            "failed": self.failed,
+            "failed_names": self.failed_names,
+        }
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def open_output_file(module: AnsibleModule, path: str | None) -> JSONLinesWriter | None:
+    """
+    Create a writer for ``path``, or return ``None`` if no path is provided.
+
+    In check mode, the file is not written.
+    """
+    if path is None:
+        return None
+    try:
+        return JSONLinesWriter(path, dry_run=module.check_mode)
+    except OSError as exc:
+        module.fail_json(
+            msg=f"Cannot open output file {path}: {to_native(exc)}",
+            exception=traceback.format_exc(),
+        )
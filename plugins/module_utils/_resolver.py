@@ -7,18 +7,37 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import functools
+import queue
+import random
+import socket
+import threading
+import time
 import traceback
 import typing as t
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
 
 from ansible.module_utils.basic import missing_required_lib
 from ansible.module_utils.common.text.converters import to_native, to_text
 
+from ansible_collections.community.dns.plugins.module_utils._resolver_cache import (
+    PersistentCache,
+    TTLCache,
+)
+
 try:
     import dns
+    import dns.asyncresolver
+    import dns.edns
     import dns.exception
     import dns.inet
     import dns.message
     import dns.name
+    import dns.opcode
     import dns.query
     import dns.rcode
     import dns.rdatatype
@@ -34,7 +53,8 @@ if t.TYPE_CHECKING:  # pragma: no cover
 
     from ansible.module_utils.basic import AnsibleModule
 
-    _P = t.ParamSpec("_P")
+    from collections.abc import AsyncIterator, Awaitable, Iterator
+
     _T = t.TypeVar("_T")
 
     class ResolverParams(t.TypedDict):
@@ -43,6 +63,18 @@ if t.TYPE_CHECKING:  # pragma: no cover
 
 _EDNS_SIZE = 1232  # equals dns.message.DEFAULT_EDNS_PAYLOAD; larger values cause problems with Route53 nameservers for me
 
+# Lifetime (in seconds) of cache entries for which the responses did not provide a TTL
+_FALLBACK_TTL = 300
+
+# Maximal lifetime (in seconds) of negative cache entries; RFC 2308 recommends one to three hours
+_MAX_NEGATIVE_TTL = 10800
+
+# Delay (in seconds) before a hedged query is sent, as long as too few RTTs were measured
+_DEFAULT_HEDGE_DELAY = 0.5
+
+# How often (in seconds) the NOTIFY listener checks whether it has been closed
+_NOTIFY_POLL_INTERVAL = 0.2
+
 
 class ResolverError(Exception):
     pass
@@ -52,14 +84,811 @@ class InvalidInput(ResolverError):
     pass
 
 
+def run_concurrently(
+    functions: Sequence[t.Callable[[], _T]], max_concurrency: int = 1
+) -> list[_T]:
+    """
+    Run the given functions with at most ``max_concurrency`` of them at the same time.
+
+    The results are returned in the same order as the functions. If one or more functions
+    raise an exception, the exception of the first such function (in order) is re-raised.
+    """
+    if max_concurrency <= 1 or len(functions) <= 1:
+        return [function() for function in functions]
+    with ThreadPoolExecutor(
+        max_workers=min(max_concurrency, len(functions))
+    ) as executor:
+        futures = [executor.submit(function) for function in functions]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def run_coroutines(
+    functions: Sequence[t.Callable[[], Awaitable[_T]]], max_concurrency: int = 1
+) -> list[_T]:
+    """
+    Run the coroutines returned by the given functions on an event loop, with at most
+    ``max_concurrency`` of them at the same time.
+
+    This behaves like ``run_concurrently()``, but does not need a thread per query.
+    """
+
+    async def run_all() -> list[_T]:
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+        async def run(function: t.Callable[[], Awaitable[_T]]) -> _T:
+            async with semaphore:
+                return await function()
+
+        results = await asyncio.gather(
+            *[run(function) for function in functions], return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return t.cast("list[_T]", results)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(run_all())
+    # There is already an event loop running in this thread, so use another thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, run_all()).result()
+
+
+class _QuerySlots:
+    """
+    Bounds the number of DNS queries in flight, across all threads and event loops.
+
+    Slots are only held while a single query is sent, and never while waiting for other
+    functions, so that nested calls of ``run_concurrently()`` and ``run_coroutines()``
+    cannot exceed the bound or deadlock.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._semaphore = threading.BoundedSemaphore(max(size, 1))
+
+    @contextlib.contextmanager
+    def claim(self) -> Iterator[None]:
+        with self._semaphore:
+            yield
+
+    @contextlib.asynccontextmanager
+    async def claim_async(self) -> AsyncIterator[None]:
+        # Blocking would stall the event loop, which might run the query holding the slot
+        delay = 0.001
+        while not self._semaphore.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.05)
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+# Addresses used to check whether an address family can be reached. These are documentation
+# addresses (RFC 5737 and RFC 3849); no packets are sent to them.
+_ADDRESS_FAMILY_PROBE_ADDRESSES: dict[int, str] = {
+    socket.AF_INET: "192.0.2.1",
+    socket.AF_INET6: "2001:db8::1",
+}
+
+_REACHABLE_ADDRESS_FAMILIES: dict[int, bool] = {}
+_REACHABLE_ADDRESS_FAMILIES_LOCK = threading.Lock()
+
+ADDRESS_FAMILIES = ("auto", "ipv4", "ipv6", "both")
+
+
+def _probe_address_family(family: int) -> bool:
+    try:
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+    except OSError:
+        return False
+    try:
+        # Connecting a UDP socket does not send anything, but fails if there is no route
+        sock.connect((_ADDRESS_FAMILY_PROBE_ADDRESSES[family], 53))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def is_address_family_reachable(family: int) -> bool:
+    """
+    Check whether the host has a route to addresses of the given address family.
+
+    The result is cached for the lifetime of the process.
+    """
+    with _REACHABLE_ADDRESS_FAMILIES_LOCK:
+        if family not in _REACHABLE_ADDRESS_FAMILIES:
+            _REACHABLE_ADDRESS_FAMILIES[family] = _probe_address_family(family)
+        return _REACHABLE_ADDRESS_FAMILIES[family]
+
+
+def _get_address_family(address: str) -> int | None:
+    try:
+        return dns.inet.af_for_address(address)
+    except ValueError:
+        return None
+
+
+def select_addresses(
+    addresses: Sequence[str],
+    address_family: t.Literal["auto", "ipv4", "ipv6", "both"] = "auto",
+) -> list[str]:
+    """
+    Filter and order IP addresses according to ``address_family``.
+
+    With ``ipv4`` and ``ipv6``, only addresses of that family are returned. With ``auto``,
+    addresses of families that cannot be reached are moved to the end. With ``both``,
+    the addresses are returned unchanged.
+    """
+    if address_family == "both":
+        return list(addresses)
+    families = {address: _get_address_family(address) for address in addresses}
+    if address_family == "ipv4":
+        return [address for address in addresses if families[address] == socket.AF_INET]
+    if address_family == "ipv6":
+        return [
+            address for address in addresses if families[address] == socket.AF_INET6
+        ]
+
+    def is_unreachable(address: str) -> bool:
+        family = families[address]
+        return family is not None and not is_address_family_reachable(family)
+
+    return sorted(addresses, key=is_unreachable)
+
+
+class _ServerStatistics:
+    """
+    Keeps track of smoothed round-trip times (SRTT) and failures of nameservers.
+
+    Every new RTT measurement is combined with the previous SRTT by an exponential
+    moving average. A timeout counts as an RTT of ``failure_penalty`` seconds.
+
+    After ``failure_threshold`` consecutive failures, the circuit of a server is opened,
+    and it is considered unavailable. After ``open_duration`` seconds, one query is allowed
+    to probe whether the server is reachable again (half-open); if it fails, the circuit
+    is opened again, and if it succeeds, the circuit is closed.
+    """
+
+    def __init__(
+        self,
+        smoothing: float = 0.3,
+        failure_penalty: float = 10,
+        failure_threshold: int = 3,
+        open_duration: float = 30,
+    ) -> None:
+        self.smoothing = smoothing
+        self.failure_penalty = failure_penalty
+        self.failure_threshold = failure_threshold
+        self.open_duration = open_duration
+        self._srtt: dict[str, float] = {}
+        self._failures: dict[str, int] = {}
+        self._queries: dict[str, int] = {}
+        self._timeouts: dict[str, int] = {}
+        self._opened: dict[str, float] = {}
+        self._rtts: deque[float] = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def _update(self, server: str, rtt: float) -> None:
+        srtt = self._srtt.get(server)
+        self._srtt[server] = (
+            rtt if srtt is None else (1 - self.smoothing) * srtt + self.smoothing * rtt
+        )
+
+    def record_success(self, server: str, rtt: float | None = None) -> None:
+        """
+        Record that ``server`` answered. If ``rtt`` is not provided, the SRTT is not changed.
+        """
+        with self._lock:
+            if rtt is not None:
+                self._update(server, rtt)
+                self._rtts.append(rtt)
+            self._failures[server] = 0
+            self._queries[server] = self._queries.get(server, 0) + 1
+            self._opened.pop(server, None)
+
+    def record_failure(self, server: str) -> None:
+        with self._lock:
+            self._update(server, self.failure_penalty)
+            self._failures[server] = self._failures.get(server, 0) + 1
+            self._queries[server] = self._queries.get(server, 0) + 1
+            self._timeouts[server] = self._timeouts.get(server, 0) + 1
+            if self._failures[server] >= self.failure_threshold:
+                self._opened[server] = monotonic()
+
+    def get_srtt(self, server: str) -> float | None:
+        return self._srtt.get(server)
+
+    def get_failures(self, server: str) -> int:
+        return self._failures.get(server, 0)
+
+    def get_rtt_quantile(self, quantile: float, min_samples: int = 5) -> float | None:
+        """
+        Return the ``quantile`` of the recently measured RTTs of all servers,
+        or ``None`` if less than ``min_samples`` RTTs were measured.
+        """
+        with self._lock:
+            rtts = sorted(self._rtts)
+        if len(rtts) < max(min_samples, 1):
+            return None
+        return rtts[min(int(quantile * len(rtts)), len(rtts) - 1)]
+
+    def _get_state(
+        self, server: str, now: float
+    ) -> t.Literal["closed", "open", "half-open"]:
+        opened = self._opened.get(server)
+        if opened is None:
+            return "closed"
+        return "open" if now - opened < self.open_duration else "half-open"
+
+    def get_state(self, server: str) -> t.Literal["closed", "open", "half-open"]:
+        with self._lock:
+            return self._get_state(server, monotonic())
+
+    def is_available(self, server: str) -> bool:
+        """
+        Return whether ``server`` should be queried.
+
+        If the circuit of the server is half-open, this returns ``True`` for a single caller,
+        which is expected to probe the server.
+        """
+        with self._lock:
+            opened = self._opened.get(server)
+            if opened is None:
+                return True
+            now = monotonic()
+            if now - opened < self.open_duration:
+                return False
+            # Allow one probe; further callers have to wait for another open_duration
+            self._opened[server] = now
+            return True
+
+    def filter_available(self, servers: Sequence[_T]) -> list[_T]:
+        return [server for server in servers if self.is_available(str(server))]
+
+    def sort(self, servers: Sequence[_T]) -> list[_T]:
+        """
+        Sort servers so that servers without recent failures come first, ordered by their SRTT.
+
+        Servers without measurements are sorted first, so that they get probed.
+        Otherwise, the order of ``servers`` is kept.
+        """
+        with self._lock:
+            return sorted(
+                servers,
+                key=lambda server: (
+                    self._failures.get(str(server), 0) > 0,
+                    self._srtt.get(str(server), 0),
+                ),
+            )
+
+    def get_statistics(self) -> dict[str, dict[str, t.Any]]:
+        """
+        Return the statistics of all servers that have been queried.
+        """
+        # Take a consistent snapshot, since other threads can record results meanwhile
+        with self._lock:
+            now = monotonic()
+            return {
+                server: {
+                    "queries": self._queries.get(server, 0),
+                    "timeouts": self._timeouts.get(server, 0),
+                    "consecutive_failures": self._failures.get(server, 0),
+                    "srtt": self._srtt.get(server),
+                    "state": self._get_state(server, now),
+                }
+                for server in sorted(self._queries)
+            }
+
+
+class _Flight:
+    """
+    A computation that is in progress. Other threads can wait for its result.
+    """
+
+    def __init__(self) -> None:
+        self.waiters = 0
+        self._done = threading.Event()
+        self._result: t.Any = None
+        self._exception: BaseException | None = None
+
+    def wait(self) -> t.Any:
+        self._done.wait()
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+
+class _SingleFlight:
+    """
+    Coalesces concurrent computations with the same key.
+
+    The first thread that claims a key computes the result; all threads that claim
+    the same key while this is in progress wait for that result instead of computing
+    it themselves.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[t.Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key: t.Hashable) -> tuple[_Flight, bool]:
+        """
+        Return the flight for ``key``, and whether the caller has to compute its result.
+
+        If the caller has to compute the result, it must call ``finish()`` afterwards.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                return flight, False
+            flight = _Flight()
+            self._flights[key] = flight
+            return flight, True
+
+    def finish(
+        self,
+        key: t.Hashable,
+        flight: _Flight,
+        *,
+        result: t.Any = None,
+        exception: BaseException | None = None,
+    ) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight._result = result
+        flight._exception = exception
+        flight._done.set()
+
+    def run(self, key: t.Hashable, function: t.Callable[[], _T]) -> _T:
+        """
+        Return the result of ``function()``, unless a computation for ``key`` is
+        already in progress. In that case, wait for its result.
+        """
+        flight, owner = self.claim(key)
+        if not owner:
+            return flight.wait()
+        try:
+            result = function()
+        except BaseException as exc:
+            self.finish(key, flight, exception=exc)
+            raise
+        self.finish(key, flight, result=result)
+        return result
+
+    def get_waiters(self, key: t.Hashable) -> int:
+        with self._lock:
+            flight = self._flights.get(key)
+            return 0 if flight is None else flight.waiters
+
+
+def create_negative_cache(max_size: int = 10000) -> TTLCache:
+    """
+    Create a cache for negative answers (NXDOMAIN and NODATA) that can be passed to resolvers.
+    """
+    return TTLCache(max_size=max_size, max_ttl=_MAX_NEGATIVE_TTL)
+
+
+def _get_negative_ttl(response: dns.message.Message | None) -> float | None:
+    """
+    Determine how long a negative answer can be cached (RFC 2308, section 5).
+    Returns ``None`` if the response has no SOA record in its authority section.
+    """
+    if response is None:
+        return None
+    for rrset in response.authority:
+        if rrset.rdtype == dns.rdatatype.SOA and len(rrset) > 0:
+            return min(rrset.ttl, rrset[0].minimum)
+    return None
+
+
+class RetryPolicy:
+    """
+    Decides how long to wait before retrying a DNS query, and how long a query may take.
+
+    The delay before the n-th retry is ``backoff * 2 ** (n - 1)`` seconds, capped by ``max_backoff``,
+    and randomly shortened by up to the fraction ``jitter`` so that retries of concurrent
+    queries do not happen at the same time.
+
+    With ``limit_time()``, a deadline can be set. The timeout of every query is then shrunk to
+    the time remaining until the deadline, and no query is started after the deadline.
+    """
+
+    def __init__(
+        self, backoff: float = 0.05, max_backoff: float = 1, jitter: float = 0.5
+    ) -> None:
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.deadline: float | None = None
+        self._thread_deadlines = threading.local()
+
+    @contextlib.contextmanager
+    def limit_time(self, seconds: float | None) -> Iterator[None]:
+        """
+        Set a deadline ``seconds`` seconds in the future while the context is active.
+        If ``seconds`` is ``None``, there is no deadline.
+        """
+        previous_deadline = self.deadline
+        self.deadline = None if seconds is None else monotonic() + seconds
+        try:
+            yield
+        finally:
+            self.deadline = previous_deadline
+
+    @contextlib.contextmanager
+    def limit_thread_time(self, deadline: float) -> Iterator[None]:
+        """
+        Set a deadline (a value of ``monotonic()``) for the current thread only while the
+        context is active. It applies in addition to the deadline set by ``limit_time()``.
+        """
+        previous_deadline = getattr(self._thread_deadlines, "deadline", None)
+        self._thread_deadlines.deadline = deadline
+        try:
+            yield
+        finally:
+            self._thread_deadlines.deadline = previous_deadline
+
+    def get_remaining_time(self) -> float | None:
+        deadline = self.deadline
+        thread_deadline = getattr(self._thread_deadlines, "deadline", None)
+        if thread_deadline is not None and (
+            deadline is None or thread_deadline < deadline
+        ):
+            deadline = thread_deadline
+        if deadline is None:
+            return None
+        return deadline - monotonic()
+
+    def get_timeout(self, timeout: float) -> float:
+        """
+        Return the timeout to use for the next query. Raise ``dns.exception.Timeout``
+        if the deadline has been reached.
+        """
+        remaining = self.get_remaining_time()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            raise dns.exception.Timeout(timeout=0)
+        return min(timeout, remaining)
+
+    def get_delay(self, retry: int) -> float:
+        delay = min(self.backoff * 2 ** (retry - 1), self.max_backoff)
+        return delay * (1 - self.jitter * random.random())
+
+    def _get_wait_time(self, retry: int) -> float:
+        delay = self.get_delay(retry)
+        remaining = self.get_remaining_time()
+        if remaining is not None:
+            delay = min(delay, remaining)
+        return delay
+
+    def wait(self, retry: int) -> None:
+        """
+        Wait before the ``retry``-th retry (counting from 1).
+        """
+        delay = self._get_wait_time(retry)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, retry: int) -> None:
+        """
+        Wait before the ``retry``-th retry (counting from 1) without blocking the event loop.
+        """
+        delay = self._get_wait_time(retry)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ResolverPool:
+    """
+    A pool of configured dnspython resolvers, indexed by their nameservers and options.
+
+    Resolvers are configured once and then reused, including their answer caches.
+    If ``cache_size`` is positive, a resolver gets a ``dns.resolver.LRUCache`` of that size.
+    """
+
+    def __init__(self) -> None:
+        self._resolvers: dict[
+            tuple[tuple[str, ...] | None, float, int], dns.resolver.Resolver
+        ] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        nameservers: Sequence[str] | None = None,
+        *,
+        timeout: float = 10,
+        cache_size: int = 0,
+    ) -> dns.resolver.Resolver:
+        """
+        Return a resolver for the given nameservers. If ``nameservers`` is ``None``,
+        the resolver uses the system's resolver configuration.
+        """
+        key = (
+            None if nameservers is None else tuple(nameservers),
+            timeout,
+            cache_size,
+        )
+        with self._lock:
+            resolver = self._resolvers.get(key)
+            if resolver is None:
+                if nameservers is None:
+                    resolver = dns.resolver.Resolver()
+                else:
+                    resolver = dns.resolver.Resolver(configure=False)
+                    resolver.timeout = timeout
+                    resolver.nameservers = list(nameservers)
+                resolver.use_edns(0, ednsflags=dns.flags.DO, payload=_EDNS_SIZE)
+                if cache_size > 0:
+                    resolver.cache = dns.resolver.LRUCache(max_size=cache_size)
+                self._resolvers[key] = resolver
+            return resolver
+
+    def clear(self) -> None:
+        with self._lock:
+            self._resolvers.clear()
+
+
+class TransportPool:
+    """
+    Reuses sockets for queries sent directly to nameservers.
+
+    A socket is only used by one query at a time. Afterwards, it is returned to the pool,
+    from which the next query of any thread takes it, so that at most one socket is open
+    per query that is sent at the same time. There are UDP sockets per address family,
+    and TCP connections per nameserver. TCP queries ask the nameserver to keep the
+    connection open (RFC 7828).
+
+    Nameservers that truncated a UDP response are asked over TCP right away afterwards.
+    A socket is closed after an error, so that late responses cannot be mistaken for
+    responses to later queries.
+    """
+
+    def __init__(self) -> None:
+        self._idle: dict[t.Hashable, list[socket.socket]] = {}
+        self._tcp_servers: set[tuple[str, int]] = set()
+        # All open sockets, including the ones that are in use
+        self._sockets: set[socket.socket] = set()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _use_socket(
+        self, key: t.Hashable, create: t.Callable[[], socket.socket]
+    ) -> Iterator[socket.socket]:
+        """
+        Take an idle socket for ``key`` from the pool, or create one with ``create``.
+        The socket is returned to the pool afterwards, or closed if an error occurred.
+        """
+        with self._lock:
+            idle = self._idle.get(key)
+            sock = idle.pop() if idle else None
+        if sock is None:
+            sock = create()
+            with self._lock:
+                self._sockets.add(sock)
+        try:
+            yield sock
+        except BaseException:
+            with self._lock:
+                self._sockets.discard(sock)
+            sock.close()
+            raise
+        with self._lock:
+            # The pool could have been closed in the meantime
+            if sock in self._sockets:
+                self._idle.setdefault(key, []).append(sock)
+
+    def _create_udp_socket(self, family: int) -> socket.socket:
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        return sock
+
+    def _create_tcp_socket(
+        self, family: int, nameserver: str, port: int, timeout: float
+    ) -> socket.socket:
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(timeout)
+            sock.connect((nameserver, port))
+        except OSError as exc:
+            sock.close()
+            if isinstance(exc, socket.timeout):
+                raise dns.exception.Timeout(timeout=timeout) from exc
+            raise
+        sock.setblocking(False)
+        return sock
+
+    def needs_tcp(self, nameserver: str, port: int = 53) -> bool:
+        with self._lock:
+            return (nameserver, port) in self._tcp_servers
+
+    def query(
+        self,
+        query: dns.message.Message,
+        nameserver: str,
+        *,
+        timeout: float,
+        port: int = 53,
+    ) -> dns.message.Message:
+        family = dns.inet.af_for_address(nameserver)
+        if not self.needs_tcp(nameserver, port):
+            with self._use_socket(
+                ("udp", family), lambda: self._create_udp_socket(family)
+            ) as sock:
+                response = dns.query.udp(
+                    query,
+                    nameserver,
+                    timeout=timeout,
+                    port=port,
+                    ignore_unexpected=True,
+                    sock=sock,
+                )
+            if not response.flags & dns.flags.TC:
+                return response
+            with self._lock:
+                self._tcp_servers.add((nameserver, port))
+        return self._query_tcp(query, nameserver, family, timeout=timeout, port=port)
+
+    def _query_tcp(
+        self,
+        query: dns.message.Message,
+        nameserver: str,
+        family: int,
+        *,
+        timeout: float,
+        port: int,
+    ) -> dns.message.Message:
+        # The TCP keepalive option (RFC 7828) must only be sent over TCP,
+        # so do not modify the original query
+        question = query.question[0]
+        tcp_query = dns.message.make_query(
+            question.name,
+            question.rdtype,
+            use_edns=0,
+            payload=_EDNS_SIZE,
+            options=[dns.edns.GenericOption(dns.edns.OptionType.KEEPALIVE, b"")],
+        )
+        # After an error, the connection might have been closed by the nameserver,
+        # or it is in an unknown state; it is closed then
+        with self._use_socket(
+            ("tcp", nameserver, port),
+            lambda: self._create_tcp_socket(family, nameserver, port, timeout),
+        ) as sock:
+            return dns.query.tcp(
+                tcp_query, nameserver, timeout=timeout, port=port, sock=sock
+            )
+
+    def close(self) -> None:
+        """
+        Close all sockets.
+        """
+        with self._lock:
+            sockets = list(self._sockets)
+            self._sockets.clear()
+            self._idle.clear()
+        for sock in sockets:
+            sock.close()
+
+
+class NotifyListener:
+    """
+    Receives DNS NOTIFY messages (RFC 1996) on a UDP socket.
+
+    A background thread acknowledges every NOTIFY and remembers the zone it was sent for,
+    until ``wait()`` is called for a DNS name in that zone.
+    """
+
+    def __init__(self, address: str, port: int = 53) -> None:
+        self._socket = socket.socket(
+            dns.inet.af_for_address(address), socket.SOCK_DGRAM
+        )
+        try:
+            self._socket.bind((address, port))
+        except OSError:
+            self._socket.close()
+            raise
+        self._socket.settimeout(_NOTIFY_POLL_INTERVAL)
+        self._condition = threading.Condition()
+        self._notified: set[dns.name.Name] = set()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._receive, daemon=True)
+        self._thread.start()
+
+    @property
+    def port(self) -> int:
+        return self._socket.getsockname()[1]
+
+    def _receive(self) -> None:
+        while not self._closed.is_set():
+            try:
+                wire, source = self._socket.recvfrom(65535)
+            # socket.timeout is only an alias of TimeoutError since Python 3.10;
+            # before, it is a subclass of OSError that must be caught first
+            except socket.timeout:  # noqa: UP041
+                continue
+            except OSError:
+                return
+            try:
+                message = dns.message.from_wire(wire)
+            except dns.exception.DNSException:
+                continue
+            if message.opcode() != dns.opcode.NOTIFY or message.flags & dns.flags.QR:
+                continue
+            try:
+                self._socket.sendto(
+                    dns.message.make_response(message).to_wire(), source
+                )
+            except OSError:
+                pass
+            with self._condition:
+                self._notified.update(question.name for question in message.question)
+                self._condition.notify_all()
+
+    def wait(self, names: Collection[str], timeout: float) -> bool:
+        """
+        Wait at most ``timeout`` seconds for a NOTIFY for a zone containing one of ``names``.
+
+        Returns whether such a NOTIFY was received. It is also returned if it arrived
+        before this call.
+        """
+        dnsnames = [dns.name.from_unicode(to_text(name)) for name in names]
+
+        def get_zones() -> set[dns.name.Name]:
+            return {
+                zone
+                for zone in self._notified
+                if any(dnsname.is_subdomain(zone) for dnsname in dnsnames)
+            }
+
+        with self._condition:
+            zones = self._condition.wait_for(get_zones, timeout)
+            self._notified -= zones
+        return bool(zones)
+
+    def close(self) -> None:
+        self._closed.set()
+        self._thread.join()
+        self._socket.close()
+
+
 class _Resolve:
     def __init__(
-        self, timeout: float = 10, timeout_retries: int = 3, servfail_retries: int = 0
+        self,
+        timeout: float = 10,
+        timeout_retries: int = 3,
+        servfail_retries: int = 0,
+        address_family: t.Literal["auto", "ipv4", "ipv6", "both"] = "auto",
+        retry_policy: RetryPolicy | None = None,
+        negative_cache: TTLCache | None = None,
+        backend: t.Literal["threads", "asyncio"] = "threads",
+        max_concurrency: int = 1,
     ) -> None:
         self.timeout = timeout
         self.timeout_retries = timeout_retries
         self.servfail_retries = servfail_retries
+        self.max_concurrency = max_concurrency
+        # Every query sent claims one of these slots, so that at most ``max_concurrency``
+        # queries are in flight, no matter how many callers run functions concurrently
+        self.query_slots = _QuerySlots(max_concurrency)
+        self.address_family = address_family
+        self.retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+        self.negative_cache = negative_cache
+        self.backend = backend
         self.default_resolver = dns.resolver.get_default_resolver()
+        self._default_async_resolver: dns.asyncresolver.Resolver | None = None
+        self._default_async_resolver_lock = threading.Lock()
 
     def _handle_reponse_errors(
         self,
@@ -88,17 +917,125 @@ class _Resolve:
             msg = f"{msg} with query {query}"
         raise ResolverError(msg)
 
-    def _handle_timeout(
-        self, function: t.Callable[_P, _T], *args: _P.args, **kwargs: _P.kwargs
+    def _handle_timeout(self, function: t.Callable[[float], _T]) -> _T:
+        """
+        Call ``function`` with the timeout to use, and retry on timeouts.
+        """
+        retry = 0
+        while True:
+            try:
+                timeout = self.retry_policy.get_timeout(self.timeout)
+                with self.query_slots.claim():
+                    return function(timeout)
+            except dns.exception.Timeout as exc:
+                if retry >= self.timeout_retries:
+                    raise exc
+                retry += 1
+                self.retry_policy.wait(retry)
+
+    async def _handle_timeout_async(
+        self, function: t.Callable[[float], Awaitable[_T]]
     ) -> _T:
+        """
+        Same as ``_handle_timeout()``, but ``function`` returns an awaitable.
+        """
         retry = 0
         while True:
             try:
-                return function(*args, **kwargs)
+                timeout = self.retry_policy.get_timeout(self.timeout)
+                async with self.query_slots.claim_async():
+                    return await function(timeout)
             except dns.exception.Timeout as exc:
                 if retry >= self.timeout_retries:
                     raise exc
                 retry += 1
+                await self.retry_policy.wait_async(retry)
+
+    def _run_concurrently(
+        self,
+        functions: Sequence[t.Callable[[], _T]],
+        async_functions: Sequence[t.Callable[[], Awaitable[_T]]],
+        max_concurrency: int,
+    ) -> list[_T]:
+        """
+        Run either ``functions`` in threads, or ``async_functions`` on an event loop,
+        depending on the backend.
+        """
+        if self.backend == "asyncio" and max_concurrency > 1 and len(functions) > 1:
+            return run_coroutines(async_functions, max_concurrency=max_concurrency)
+        return run_concurrently(functions, max_concurrency=max_concurrency)
+
+    def _get_default_async_resolver(self) -> dns.asyncresolver.Resolver:
+        """
+        Return an asynchronous resolver that uses the same nameservers as the default resolver.
+        """
+        with self._default_async_resolver_lock:
+            if self._default_async_resolver is None:
+                resolver = dns.asyncresolver.Resolver(configure=False)
+                resolver.nameservers = list(self.default_resolver.nameservers)
+                self._default_async_resolver = resolver
+            return self._default_async_resolver
+
+    def _check_negative_cache(
+        self,
+        resolver: dns.resolver.BaseResolver,
+        dnsname: dns.name.Name,
+        rdtype: dns.rdatatype.RdataType,
+        search: bool | None,
+    ) -> tuple[tuple[str, int, str, bool] | None, bool]:
+        """
+        Return the negative cache key for a query, and whether the query is known to
+        return no data. Raise ``dns.resolver.NXDOMAIN`` if the name is known not to exist.
+        """
+        if self.negative_cache is None:
+            return None, False
+        cache_key = (
+            str(dnsname),
+            int(rdtype),
+            "|".join(sorted(str(nameserver) for nameserver in resolver.nameservers)),
+            bool(search),
+        )
+        cached = self.negative_cache.get(cache_key)
+        if cached == "NXDOMAIN":
+            raise dns.resolver.NXDOMAIN(qnames=[dnsname], responses={})
+        return cache_key, cached == "NODATA"
+
+    def _cache_negative_exception(
+        self,
+        cache_key: tuple[str, int, str, bool] | None,
+        exc: dns.resolver.NXDOMAIN | dns.resolver.NoAnswer,
+    ) -> None:
+        if cache_key is None:
+            return
+        if isinstance(exc, dns.resolver.NXDOMAIN):
+            for response in (exc.kwargs.get("responses") or {}).values():
+                self._cache_negative_response(cache_key, "NXDOMAIN", response)
+        else:
+            self._cache_negative_response(
+                cache_key, "NODATA", exc.kwargs.get("response")
+            )
+
+    def _cache_negative_answer(
+        self,
+        cache_key: tuple[str, int, str, bool] | None,
+        answer: dns.resolver.Answer,
+    ) -> None:
+        if (
+            cache_key is not None
+            and answer.rrset is None
+            and answer.response.rcode() == dns.rcode.NOERROR
+        ):
+            self._cache_negative_response(cache_key, "NODATA", answer.response)
+
+    def _cache_negative_response(
+        self,
+        cache_key: tuple[str, int, str, bool],
+        kind: t.Literal["NXDOMAIN", "NODATA"],
+        response: dns.message.Message | None,
+    ) -> None:
+        ttl = _get_negative_ttl(response)
+        if ttl is not None and ttl > 0 and self.negative_cache is not None:
+            self.negative_cache.set(cache_key, kind, ttl)
 
     def _resolve(
         self,
@@ -109,26 +1046,195 @@ class _Resolve:
         rdtype: dns.rdatatype.RdataType,
         **kwargs: t.Unpack[ResolverParams],
     ) -> dns.rrset.RRset | None:
-        retry = 0
-        while True:
-            response = self._handle_timeout(
-                resolver.resolve,
+        cache_key, no_data = self._check_negative_cache(
+            resolver, dnsname, rdtype, kwargs.get("search")
+        )
+        if no_data:
+            return None
+        try:
+            answer = self._resolve_answer(
+                resolver,
                 dnsname,
-                lifetime=self.timeout,
+                handle_response_errors=handle_response_errors,
                 rdtype=rdtype,
                 **kwargs,
             )
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer) as exc:
+            self._cache_negative_exception(cache_key, exc)
+            raise
+        self._cache_negative_answer(cache_key, answer)
+        return answer.rrset
+
+    async def _resolve_async(
+        self,
+        resolver: dns.asyncresolver.Resolver,
+        dnsname: dns.name.Name,
+        *,
+        handle_response_errors: bool = False,
+        rdtype: dns.rdatatype.RdataType,
+        **kwargs: t.Unpack[ResolverParams],
+    ) -> dns.rrset.RRset | None:
+        """
+        Same as ``_resolve()``, but for asynchronous resolvers.
+        """
+        cache_key, no_data = self._check_negative_cache(
+            resolver, dnsname, rdtype, kwargs.get("search")
+        )
+        if no_data:
+            return None
+        try:
+            answer = await self._resolve_answer_async(
+                resolver,
+                dnsname,
+                handle_response_errors=handle_response_errors,
+                rdtype=rdtype,
+                **kwargs,
+            )
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer) as exc:
+            self._cache_negative_exception(cache_key, exc)
+            raise
+        self._cache_negative_answer(cache_key, answer)
+        return answer.rrset
+
+    def _record_answer(
+        self,
+        resolver: dns.resolver.BaseResolver,
+        address: str | None,
+        rtt: float,
+    ) -> None:
+        """
+        Called when ``resolver`` got an answer, which came from ``address`` if known.
+        Does nothing by default.
+        """
+
+    def _record_timeout(
+        self, resolver: dns.resolver.BaseResolver, exc: dns.exception.Timeout
+    ) -> None:
+        """
+        Called when ``resolver`` timed out. Does nothing by default.
+        """
+
+    def _send_query(
+        self,
+        resolver: dns.resolver.Resolver,
+        dnsname: dns.name.Name,
+        *,
+        lifetime: float,
+        rdtype: dns.rdatatype.RdataType,
+        **kwargs: t.Unpack[ResolverParams],
+    ) -> dns.resolver.Answer:
+        return resolver.resolve(dnsname, lifetime=lifetime, rdtype=rdtype, **kwargs)
+
+    def _query_resolver(
+        self,
+        resolver: dns.resolver.Resolver,
+        dnsname: dns.name.Name,
+        *,
+        lifetime: float,
+        rdtype: dns.rdatatype.RdataType,
+        **kwargs: t.Unpack[ResolverParams],
+    ) -> dns.resolver.Answer:
+        """
+        Send a query with ``resolver`` and record its outcome. Answers from the negative
+        cache never get here, so they are not recorded.
+        """
+        start = monotonic()
+        try:
+            answer = self._send_query(
+                resolver, dnsname, lifetime=lifetime, rdtype=rdtype, **kwargs
+            )
+        except dns.exception.Timeout as exc:
+            self._record_timeout(resolver, exc)
+            raise
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            self._record_answer(resolver, None, monotonic() - start)
+            raise
+        self._record_answer(resolver, str(answer.nameserver), monotonic() - start)
+        return answer
+
+    async def _query_resolver_async(
+        self,
+        resolver: dns.asyncresolver.Resolver,
+        dnsname: dns.name.Name,
+        *,
+        lifetime: float,
+        rdtype: dns.rdatatype.RdataType,
+        **kwargs: t.Unpack[ResolverParams],
+    ) -> dns.resolver.Answer:
+        """
+        Same as ``_query_resolver()``, but for asynchronous resolvers.
+        """
+        start = monotonic()
+        try:
+            answer = await resolver.resolve(
+                dnsname, lifetime=lifetime, rdtype=rdtype, **kwargs
+            )
+        except dns.exception.Timeout as exc:
+            self._record_timeout(resolver, exc)
+            raise
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            self._record_answer(resolver, None, monotonic() - start)
+            raise
+        self._record_answer(resolver, str(answer.nameserver), monotonic() - start)
+        return answer
+
+    def _resolve_answer(
+        self,
+        resolver: dns.resolver.Resolver,
+        dnsname: dns.name.Name,
+        *,
+        handle_response_errors: bool = False,
+        rdtype: dns.rdatatype.RdataType,
+        **kwargs: t.Unpack[ResolverParams],
+    ) -> dns.resolver.Answer:
+        retry = 0
+        while True:
+            response = self._handle_timeout(
+                lambda timeout: self._query_resolver(
+                    resolver, dnsname, lifetime=timeout, rdtype=rdtype, **kwargs
+                )
+            )
             if (
                 response.response.rcode() == dns.rcode.SERVFAIL
                 and retry < self.servfail_retries
             ):
                 retry += 1
+                self.retry_policy.wait(retry)
                 continue
             if handle_response_errors:
                 self._handle_reponse_errors(
                     dnsname, response.response, nameserver=resolver.nameservers
                 )
-            return response.rrset
+            return response
+
+    async def _resolve_answer_async(
+        self,
+        resolver: dns.asyncresolver.Resolver,
+        dnsname: dns.name.Name,
+        *,
+        handle_response_errors: bool = False,
+        rdtype: dns.rdatatype.RdataType,
+        **kwargs: t.Unpack[ResolverParams],
+    ) -> dns.resolver.Answer:
+        retry = 0
+        while True:
+            response = await self._handle_timeout_async(
+                lambda timeout: self._query_resolver_async(
+                    resolver, dnsname, lifetime=timeout, rdtype=rdtype, **kwargs
+                )
+            )
+            if (
+                response.response.rcode() == dns.rcode.SERVFAIL
+                and retry < self.servfail_retries
+            ):
+                retry += 1
+                await self.retry_policy.wait_async(retry)
+                continue
+            if handle_response_errors:
+                self._handle_reponse_errors(
+                    dnsname, response.response, nameserver=resolver.nameservers
+                )
+            return response
 
 
 class SimpleResolver(_Resolve):
@@ -137,12 +1243,30 @@ class SimpleResolver(_Resolve):
         timeout: float = 10,
         timeout_retries: int = 3,
         servfail_retries: int = 0,
+        max_concurrency: int = 1,
+        address_family: t.Literal["auto", "ipv4", "ipv6", "both"] = "auto",
+        retry_policy: RetryPolicy | None = None,
+        negative_cache: TTLCache | None = None,
+        resolver_pool: ResolverPool | None = None,
+        cache_size: int = 0,
+        backend: t.Literal["threads", "asyncio"] = "threads",
     ) -> None:
         super().__init__(
             timeout=timeout,
             timeout_retries=timeout_retries,
             servfail_retries=servfail_retries,
+            address_family=address_family,
+            retry_policy=retry_policy,
+            negative_cache=negative_cache,
+            backend=backend,
+            max_concurrency=max_concurrency,
         )
+        self.resolver_pool = resolver_pool
+        self.cache_size = cache_size
+        if resolver_pool is not None:
+            self.default_resolver = resolver_pool.get(
+                timeout=timeout, cache_size=cache_size
+            )
 
     def resolve(
         self,
@@ -161,59 +1285,82 @@ class SimpleResolver(_Resolve):
         )
 
         resolver = self.default_resolver
-        if server_addresses:
-            resolver = dns.resolver.Resolver(configure=False)
-            resolver.timeout = self.timeout
-            resolver.nameservers = server_addresses
-
-        resolver.use_edns(0, ednsflags=dns.flags.DO, payload=_EDNS_SIZE)
+        if self.resolver_pool is not None:
+            if server_addresses:
+                resolver = self.resolver_pool.get(
+                    server_addresses, timeout=self.timeout, cache_size=self.cache_size
+                )
+        else:
+            if server_addresses:
+                resolver = dns.resolver.Resolver(configure=False)
+                resolver.timeout = self.timeout
+                resolver.nameservers = server_addresses
 
-        try:
-            return self._resolve(
-                resolver, dnsname, handle_response_errors=True, rdtype=rdtype, **kwargs
-            )
-        except dns.resolver.NXDOMAIN:
-            if nxdomain_is_empty:
-                return None
-            raise
-        except dns.resolver.NoAnswer:
-            return None
+            resolver.use_edns(0, ednsflags=dns.flags.DO, payload=_EDNS_SIZE)
 
-    def resolve_addresses(
-        self, target: str | bytes, **kwargs: t.Unpack[ResolverParams]
-    ) -> list[str]:
-        dnsname = dns.name.from_unicode(to_text(target))
-        resolver = self.default_resolver
-        result = []
-        try:
-            for data in (
-                self._resolve(
-                    resolver,
-                    dnsname,
-                    handle_response_errors=True,
-                    rdtype=dns.rdatatype.A,
-                    **kwargs,
-                )
-                or ()
-            ):
-                result.append(str(data))
-        except dns.resolver.NoAnswer:
-            pass
         try:
-            for data in (
-                self._resolve(
-                    resolver,
-                    dnsname,
-                    handle_response_errors=True,
-                    rdtype=dns.rdatatype.AAAA,
-                    **kwargs,
-                )
-                or ()
-            ):
-                result.append(str(data))
+            return self._resolve(
+                resolver, dnsname, handle_response_errors=True, rdtype=rdtype, **kwargs
+            )
+        except dns.resolver.NXDOMAIN:
+            if nxdomain_is_empty:
+                return None
+            raise
         except dns.resolver.NoAnswer:
-            pass
-        return result
+            return None
+
+    def resolve_addresses(
+        self, target: str | bytes, **kwargs: t.Unpack[ResolverParams]
+    ) -> list[str]:
+        dnsname = dns.name.from_unicode(to_text(target))
+        resolver = self.default_resolver
+
+        def resolve(rdtype: dns.rdatatype.RdataType) -> list[str]:
+            try:
+                return [
+                    str(data)
+                    for data in self._resolve(
+                        resolver,
+                        dnsname,
+                        handle_response_errors=True,
+                        rdtype=rdtype,
+                        **kwargs,
+                    )
+                    or ()
+                ]
+            except dns.resolver.NoAnswer:
+                return []
+
+        async def resolve_async(rdtype: dns.rdatatype.RdataType) -> list[str]:
+            try:
+                return [
+                    str(data)
+                    for data in await self._resolve_async(
+                        self._get_default_async_resolver(),
+                        dnsname,
+                        handle_response_errors=True,
+                        rdtype=rdtype,
+                        **kwargs,
+                    )
+                    or ()
+                ]
+            except dns.resolver.NoAnswer:
+                return []
+
+        rdtypes = []
+        if self.address_family != "ipv6":
+            rdtypes.append(dns.rdatatype.A)
+        if self.address_family != "ipv4":
+            rdtypes.append(dns.rdatatype.AAAA)
+        results = self._run_concurrently(
+            [functools.partial(resolve, rdtype) for rdtype in rdtypes],
+            [functools.partial(resolve_async, rdtype) for rdtype in rdtypes],
+            max_concurrency=self.max_concurrency,
+        )
+        return select_addresses(
+            [address for result in results for address in result],
+            self.address_family,
+        )
 
 
 class ResolveDirectlyFromNameServers(_Resolve):
@@ -224,38 +1371,114 @@ class ResolveDirectlyFromNameServers(_Resolve):
         servfail_retries: int = 0,
         always_ask_default_resolver: bool = True,
         server_addresses: Sequence[str] | None = None,
+        max_concurrency: int = 1,
+        cache_size: int = 10000,
+        cache_max_ttl: float | None = 3600,
+        persistent_cache: PersistentCache | None = None,
+        address_family: t.Literal["auto", "ipv4", "ipv6", "both"] = "auto",
+        retry_policy: RetryPolicy | None = None,
+        negative_cache: TTLCache | None = None,
+        backend: t.Literal["threads", "asyncio"] = "threads",
+        hedging: bool = False,
+        transport_pool: TransportPool | None = None,
     ) -> None:
         super().__init__(
             timeout=timeout,
             timeout_retries=timeout_retries,
             servfail_retries=servfail_retries,
+            address_family=address_family,
+            retry_policy=retry_policy,
+            negative_cache=negative_cache,
+            backend=backend,
+            max_concurrency=max_concurrency,
         )
-        self.cache: dict[tuple[str, t.Literal["ns", "addr"]], list[str]] = {}
-        self.cname_cache: dict[str, dns.name.Name | None] = {}
-        self.resolver_cache: dict[str, dns.resolver.Resolver] = {}
+        self.hedging = hedging
+        self.transport_pool = transport_pool
         self.default_nameservers: list[str | dns.nameserver.Nameserver] = list(
             self.default_resolver.nameservers
             if server_addresses is None
             else server_addresses
         )
         self.always_ask_default_resolver = always_ask_default_resolver
+        # The results depend on which nameservers are asked for the delegations,
+        # so only share persistently cached results with resolvers configured the same way
+        persistent_prefix = "|".join(
+            ["default" if always_ask_default_resolver else "parent"]
+            + sorted(str(nameserver) for nameserver in self.default_nameservers)
+            + [""]
+        )
+        self.cache: TTLCache[
+            tuple[str, t.Literal["ns", "addr", "addr4", "addr6"]], list[str]
+        ] = TTLCache(
+            max_size=cache_size,
+            max_ttl=cache_max_ttl,
+            persistent_cache=persistent_cache,
+            persistent_prefix=persistent_prefix,
+        )
+        # With a single address family, only the addresses of that family are looked up,
+        # so they are cached separately from the addresses of both families
+        self.address_cache_kind: t.Literal["addr", "addr4", "addr6"] = "addr"
+        if address_family == "ipv4":
+            self.address_cache_kind = "addr4"
+        elif address_family == "ipv6":
+            self.address_cache_kind = "addr6"
+        self.cname_cache: TTLCache[str, str | None] = TTLCache(
+            max_size=cache_size,
+            max_ttl=cache_max_ttl,
+            persistent_cache=persistent_cache,
+            persistent_prefix=f"{persistent_prefix}cname|",
+        )
+        # The apex of the zone every looked up DNS name belongs to
+        self.zone_cache: TTLCache[str, str] = TTLCache(
+            max_size=cache_size,
+            max_ttl=cache_max_ttl,
+            persistent_cache=persistent_cache,
+            persistent_prefix=f"{persistent_prefix}zone|",
+        )
+        # The records of the zones transferred with AXFR, together with the set of
+        # their owner names, per zone and nameserver; None if the transfer of a zone
+        # failed for some nameserver
+        self.zone_transfers: dict[
+            str,
+            dict[
+                str,
+                tuple[
+                    dict[tuple[dns.name.Name, int], dns.rrset.RRset],
+                    set[dns.name.Name],
+                ],
+            ]
+            | None,
+        ] = {}
+        self.resolver_cache: TTLCache[str, dns.resolver.Resolver] = TTLCache(
+            max_size=cache_size, max_ttl=cache_max_ttl
+        )
+        self.async_resolver_cache: TTLCache[str, dns.asyncresolver.Resolver] = TTLCache(
+            max_size=cache_size, max_ttl=cache_max_ttl
+        )
+        self.server_statistics = _ServerStatistics(failure_penalty=timeout)
+        # Queries for the same zone cut or nameserver name that are already being sent by
+        # another thread are not sent again; instead, the result of the other thread is used
+        self.in_flight = _SingleFlight()
 
     def _lookup_ns_names(
         self,
         target: dns.name.Name,
         nameservers: Sequence[str] | None = None,
         nameserver_ips: Sequence[str | dns.nameserver.Nameserver] | None = None,
-    ) -> tuple[list[str] | None, dns.name.Name | None]:
+    ) -> tuple[list[str] | None, dns.name.Name | None, float]:
+        """
+        Query the NS records of ``target``.
+
+        Returns the nameserver names (``None`` if ``target`` is not a zone cut),
+        a CNAME target for ``target`` (or ``None``), and the TTL for this information.
+        """
         if self.always_ask_default_resolver:
             nameservers = None
             nameserver_ips = self.default_nameservers
         if nameservers is None and nameserver_ips is None:
             nameserver_ips = self.default_nameservers
         if not nameserver_ips and nameservers:
-            for ns in nameservers:
-                nameserver_ips = self._lookup_address(ns)
-                if nameserver_ips:
-                    break
+            nameserver_ips = self._get_nameserver_ips(nameservers)
         if not nameserver_ips:
             if nameservers:
                 raise ResolverError(
@@ -263,37 +1486,44 @@ class ResolveDirectlyFromNameServers(_Resolve):
                 )
             raise ResolverError("Have neither nameservers nor nameserver IPs")
 
-        nameserver = nameserver_ips[0]
-
-        # Sanity check: do we have a valid nameserver IP?
-        if isinstance(nameserver, str):
-            try:
-                dns.inet.af_for_address(nameserver)
-            except ValueError as exc:
-                raise InvalidInput(
-                    f"Invalid nameserver IP address {nameserver}"
-                ) from exc
-
+        # Ask the fastest nameserver first, and fail over to the next ones on timeouts.
+        # Nameservers that failed repeatedly are not asked at all for some time.
+        candidates = self.server_statistics.sort(
+            self.server_statistics.filter_available(nameserver_ips)
+        )
+        if not candidates:
+            raise ResolverError(
+                f"Cannot get NS for {target}: the nameservers {', '.join(str(ip) for ip in nameserver_ips)}"
+                " did not respond to recent queries"
+            )
+        candidate_index = 0
         query = dns.message.make_query(target, dns.rdatatype.NS)
         retry = 0
         while True:
-            if isinstance(nameserver, str):
-                response = self._handle_timeout(
-                    dns.query.udp, query, nameserver, timeout=self.timeout
-                )
-            else:
-                response = self._handle_timeout(
-                    nameserver.query,
-                    query,
-                    timeout=self.timeout,
-                    # The following are taken from the default arguments of
-                    # dns.resolver.Resolver.resolve():
-                    source=None,
-                    source_port=0,
-                    max_size=False,
-                )
+            timeout_retry = 0
+            while True:
+                nameserver = candidates[candidate_index % len(candidates)]
+                timeout = self.retry_policy.get_timeout(self.timeout)
+                start = monotonic()
+                try:
+                    with self.query_slots.claim():
+                        response = self._query_nameserver(query, nameserver, timeout)
+                    break
+                except dns.exception.Timeout:
+                    self.server_statistics.record_failure(str(nameserver))
+                    if timeout_retry >= self.timeout_retries:
+                        raise
+                    timeout_retry += 1
+                    candidate_index += 1
+                    # Only back off when asking the same nameserver again
+                    if len(candidates) == 1:
+                        self.retry_policy.wait(timeout_retry)
+            self.server_statistics.record_success(str(nameserver), monotonic() - start)
             if response.rcode() == dns.rcode.SERVFAIL and retry < self.servfail_retries:
                 retry += 1
+                candidate_index += 1
+                if len(candidates) == 1:
+                    self.retry_policy.wait(retry)
                 continue
             break
         self._handle_reponse_errors(
@@ -305,24 +1535,162 @@ class ResolveDirectlyFromNameServers(_Resolve):
         )
 
         cname = None
+        ttls: list[float] = []
         for rrset in response.answer:
             if rrset.rdtype == dns.rdatatype.CNAME:
                 cname = dns.name.from_text(to_text(rrset[0]))
+                ttls.append(rrset.ttl)
 
         new_nameservers: list[str] = []
         rrsets = list(response.authority)
         rrsets.extend(response.answer)
         for rrset in rrsets:
             if rrset.rdtype == dns.rdatatype.SOA:
-                # We keep the current nameservers
-                return None, cname
+                # We keep the current nameservers. The negative TTL is the minimum
+                # of the SOA's TTL and its MINIMUM field (RFC 2308, section 5).
+                ttls.extend([rrset.ttl, rrset[0].minimum])
+                return None, cname, min(ttls)
             if rrset.rdtype == dns.rdatatype.NS:
                 new_nameservers.extend(str(ns_record.target) for ns_record in rrset)
-        return sorted(set(new_nameservers)) if new_nameservers else None, cname
+                ttls.append(rrset.ttl)
+        return (
+            sorted(set(new_nameservers)) if new_nameservers else None,
+            cname,
+            min(ttls) if ttls else _FALLBACK_TTL,
+        )
+
+    def _query_nameserver(
+        self,
+        query: dns.message.QueryMessage,
+        nameserver: str | dns.nameserver.Nameserver,
+        timeout: float,
+    ) -> dns.message.Message:
+        if isinstance(nameserver, str):
+            # Sanity check: do we have a valid nameserver IP?
+            try:
+                dns.inet.af_for_address(nameserver)
+            except ValueError as exc:
+                raise InvalidInput(
+                    f"Invalid nameserver IP address {nameserver}"
+                ) from exc
+            if self.transport_pool is not None:
+                return self.transport_pool.query(query, nameserver, timeout=timeout)
+            return dns.query.udp(query, nameserver, timeout=timeout)
+        return nameserver.query(
+            query,
+            timeout=timeout,
+            # The following are taken from the default arguments of
+            # dns.resolver.Resolver.resolve():
+            source=None,
+            source_port=0,
+            max_size=False,
+        )
+
+    def _send_query(
+        self,
+        resolver: dns.resolver.Resolver,
+        dnsname: dns.name.Name,
+        *,
+        lifetime: float,
+        rdtype: dns.rdatatype.RdataType,
+        **kwargs: t.Unpack[ResolverParams],
+    ) -> dns.resolver.Answer:
+        # The default resolver is configured by the system, so dnspython has to send its queries
+        if self.transport_pool is None or resolver is self.default_resolver:
+            return super()._send_query(
+                resolver, dnsname, lifetime=lifetime, rdtype=rdtype, **kwargs
+            )
+        return self._send_query_with_transport_pool(
+            resolver, dnsname, lifetime=lifetime, rdtype=rdtype
+        )
+
+    def _send_query_with_transport_pool(
+        self,
+        resolver: dns.resolver.Resolver,
+        dnsname: dns.name.Name,
+        *,
+        lifetime: float,
+        rdtype: dns.rdatatype.RdataType,
+    ) -> dns.resolver.Answer:
+        """
+        Same as ``resolver.resolve()``, but sends the queries with the transport pool.
+
+        Like dnspython, the addresses of ``resolver`` are asked one after another until
+        one of them answers, and ``dns.resolver.LifetimeTimeout`` lists the addresses
+        that were tried.
+        """
+        assert self.transport_pool is not None
+        query = dns.message.make_query(
+            dnsname, rdtype, use_edns=0, want_dnssec=True, payload=_EDNS_SIZE
+        )
+        deadline = monotonic() + lifetime
+        errors: list[
+            tuple[str, bool, int, Exception | str, dns.message.Message | None]
+        ] = []
+        for nameserver in resolver.nameservers:
+            address = str(nameserver)
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                break
+            try:
+                response = self.transport_pool.query(
+                    query, address, timeout=min(resolver.timeout, remaining)
+                )
+            except (dns.exception.DNSException, OSError) as exc:
+                errors.append((address, False, 53, exc, None))
+                continue
+            rcode = response.rcode()
+            if rcode == dns.rcode.NOERROR:
+                answer = dns.resolver.Answer(
+                    dnsname,
+                    rdtype,
+                    dns.rdataclass.IN,
+                    t.cast(dns.message.QueryMessage, response),
+                    address,
+                    53,
+                )
+                if answer.rrset is None:
+                    raise dns.resolver.NoAnswer(response=response)
+                return answer
+            if rcode == dns.rcode.NXDOMAIN:
+                raise dns.resolver.NXDOMAIN(
+                    qnames=[dnsname], responses={dnsname: response}
+                )
+            errors.append((address, False, 53, dns.rcode.to_text(rcode), response))
+        # Like dnspython, only fail without a timeout if no address timed out
+        if not errors or any(
+            isinstance(error[3], dns.exception.Timeout) for error in errors
+        ):
+            raise dns.resolver.LifetimeTimeout(timeout=lifetime, errors=errors)
+        raise dns.resolver.NoNameservers(request=query, errors=errors)
+
+    def _get_nameserver_ips(self, nameservers: Sequence[str]) -> list[str]:
+        """
+        Return IP addresses to reach one of ``nameservers``.
+
+        If the addresses of some of the nameservers are already known, all of them are returned,
+        so that the fastest one can be picked. Otherwise, the addresses of the first nameserver
+        that resolves are looked up.
+        """
+        result: list[str] = []
+        for nameserver in nameservers:
+            for address in self.cache.get((nameserver, self.address_cache_kind)) or []:
+                if address not in result:
+                    result.append(address)
+        result = select_addresses(result, self.address_family)
+        if result:
+            return result
+        for nameserver in nameservers:
+            result = select_addresses(
+                self._lookup_address(nameserver), self.address_family
+            )
+            if result:
+                break
+        return result
 
     def _lookup_address_impl(
         self, target: dns.name.Name, rdtype: dns.rdatatype.RdataType
-    ) -> list[str]:
+    ) -> tuple[list[str], float]:
         try:
             answer = self._resolve(
                 self.default_resolver,
@@ -330,38 +1698,187 @@ class ResolveDirectlyFromNameServers(_Resolve):
                 handle_response_errors=True,
                 rdtype=rdtype,
             )
-            return [str(res) for res in answer or ()]
+            if answer is None:
+                return [], _FALLBACK_TTL
+            return [str(res) for res in answer], answer.ttl
         except dns.resolver.NoAnswer:
-            return []
+            return [], _FALLBACK_TTL
 
-    def _lookup_address(self, target) -> list[str]:
-        result = self.cache.get((target, "addr"))
-        if result is None:
-            result = self._lookup_address_impl(target, dns.rdatatype.A)
-            result.extend(self._lookup_address_impl(target, dns.rdatatype.AAAA))
-            self.cache[(target, "addr")] = result
+    async def _lookup_address_impl_async(
+        self, target: dns.name.Name, rdtype: dns.rdatatype.RdataType
+    ) -> tuple[list[str], float]:
+        try:
+            answer = await self._resolve_async(
+                self._get_default_async_resolver(),
+                target,
+                handle_response_errors=True,
+                rdtype=rdtype,
+            )
+            if answer is None:
+                return [], _FALLBACK_TTL
+            return [str(res) for res in answer], answer.ttl
+        except dns.resolver.NoAnswer:
+            return [], _FALLBACK_TTL
+
+    def _lookup_addresses(self, targets: Sequence[str]) -> dict[str, list[str]]:
+        """
+        Look up the IPv4 and IPv6 addresses of all ``targets``.
+
+        The A and AAAA queries for all targets not found in the cache are sent in parallel,
+        with at most ``max_concurrency`` queries at the same time.
+        """
+        result: dict[str, list[str]] = {}
+        missing: list[str] = []
+        pending: dict[str, _Flight] = {}
+        in_flight: dict[str, _Flight] = {}
+        for target in targets:
+            addresses = self.cache.get((target, self.address_cache_kind))
+            if addresses is not None:
+                result[target] = addresses
+            elif target not in pending and target not in in_flight:
+                flight, owner = self.in_flight.claim((target, self.address_cache_kind))
+                if not owner:
+                    in_flight[target] = flight
+                    continue
+                # Another thread could have finished the same lookup right before we claimed it
+                addresses = self.cache.get((target, self.address_cache_kind))
+                if addresses is not None:
+                    result[target] = addresses
+                    self.in_flight.finish(
+                        (target, self.address_cache_kind), flight, result=addresses
+                    )
+                    continue
+                missing.append(target)
+                pending[target] = flight
+        try:
+            self._lookup_missing_addresses(missing, result)
+        except BaseException as exc:
+            for target, flight in pending.items():
+                self.in_flight.finish(
+                    (target, self.address_cache_kind), flight, exception=exc
+                )
+            raise
+        for target, flight in pending.items():
+            self.in_flight.finish(
+                (target, self.address_cache_kind), flight, result=result[target]
+            )
+        # Only wait for other threads after finishing our own lookups, so that
+        # threads waiting for each other's lookups cannot deadlock
+        for target, flight in in_flight.items():
+            result[target] = flight.wait()
         return result
 
+    def _lookup_missing_addresses(
+        self, missing: Sequence[str], result: dict[str, list[str]]
+    ) -> None:
+        # Addresses of a family that is not used are not needed
+        rdtypes = []
+        if self.address_family != "ipv6":
+            rdtypes.append(dns.rdatatype.A)
+        if self.address_family != "ipv4":
+            rdtypes.append(dns.rdatatype.AAAA)
+        queries = [
+            (dns.name.from_unicode(target), rdtype)
+            for target in missing
+            for rdtype in rdtypes
+        ]
+        answers = self._run_concurrently(
+            [
+                functools.partial(self._lookup_address_impl, dnsname, rdtype)
+                for dnsname, rdtype in queries
+            ],
+            [
+                functools.partial(self._lookup_address_impl_async, dnsname, rdtype)
+                for dnsname, rdtype in queries
+            ],
+            max_concurrency=self.max_concurrency,
+        )
+        for index, target in enumerate(missing):
+            target_answers = answers[len(rdtypes) * index : len(rdtypes) * (index + 1)]
+            result[target] = [
+                address for addresses, dummy in target_answers for address in addresses
+            ]
+            self.cache.set(
+                (target, self.address_cache_kind),
+                result[target],
+                min(ttl for dummy, ttl in target_answers),
+            )
+
+    def _lookup_address(self, target: str) -> list[str]:
+        return self._lookup_addresses([target])[target]
+
+    def _lookup_zone_cut(
+        self,
+        target_part: dns.name.Name,
+        nameservers: list[str] | None,
+        nameserver_ips: Sequence[str | dns.nameserver.Nameserver] | None,
+        ttl: float | None,
+    ) -> tuple[list[str] | None, float | None]:
+        """
+        Look up the nameservers of ``target_part`` and cache them.
+
+        Returns the nameservers responsible for ``target_part`` and the TTL of this information.
+        """
+        # Another thread could have finished the same lookup right before we started it
+        cached = self.cache.get_with_ttl((str(target_part), "ns"))
+        if cached is not None:
+            return cached
+        nameserver_names, cname, level_ttl = self._lookup_ns_names(
+            target_part, nameservers=nameservers, nameserver_ips=nameserver_ips
+        )
+        if nameserver_names is not None:
+            nameservers = nameserver_names
+        ttl = level_ttl if ttl is None else min(ttl, level_ttl)
+
+        if nameservers is not None:
+            self.cache.set((str(target_part), "ns"), nameservers, ttl)
+        zone = (
+            str(target_part)
+            if nameserver_names is not None
+            else self.zone_cache.get(str(target_part.parent()))
+        )
+        if zone is not None:
+            self.zone_cache.set(str(target_part), zone, ttl)
+        self.cname_cache.set(
+            str(target_part), None if cname is None else str(cname), ttl
+        )
+        return nameservers, ttl
+
     def _do_lookup_ns(self, target: dns.name.Name) -> list[str] | None:
         nameserver_ips: Sequence[str | dns.nameserver.Nameserver] | None = (
             self.default_nameservers
         )
         nameservers: list[str] | None = None
-        for i in range(2, len(target.labels) + 1):
+        # The information obtained for a subzone cannot be valid for longer
+        # than the information on its parent zones
+        ttl: float | None = None
+        # Start the walk below the closest ancestor whose nameservers are known.
+        # Its TTL already is capped by the TTLs of its own ancestors.
+        start = 2
+        for i in range(len(target.labels) - 1, 1, -1):
+            cached = self.cache.get_with_ttl((str(target.split(i)[1]), "ns"))
+            if cached is not None:
+                nameservers, ttl = cached
+                nameserver_ips = None
+                start = i + 1
+                break
+        for i in range(start, len(target.labels) + 1):
             target_part = target.split(i)[1]
-            _nameservers = self.cache.get((str(target_part), "ns"))
-            if _nameservers is None:
-                nameserver_names, cname = self._lookup_ns_names(
-                    target_part, nameservers=nameservers, nameserver_ips=nameserver_ips
+            cached = self.cache.get_with_ttl((str(target_part), "ns"))
+            if cached is None:
+                nameservers, ttl = self.in_flight.run(
+                    (str(target_part), "ns"),
+                    functools.partial(
+                        self._lookup_zone_cut,
+                        target_part,
+                        nameservers,
+                        nameserver_ips,
+                        ttl,
+                    ),
                 )
-                if nameserver_names is not None:
-                    nameservers = nameserver_names
-
-                if nameservers is not None:
-                    self.cache[(str(target_part), "ns")] = nameservers
-                self.cname_cache[str(target_part)] = cname
             else:
-                nameservers = _nameservers
+                nameservers, remaining_ttl = cached
+                ttl = remaining_ttl if ttl is None else min(ttl, remaining_ttl)
             nameserver_ips = None
 
         return nameservers
@@ -370,34 +1887,433 @@ class ResolveDirectlyFromNameServers(_Resolve):
         result = self.cache.get((str(target), "ns"))
         if result is None:
             result = self._do_lookup_ns(target)
-            if result is not None:
-                self.cache[(str(target), "ns")] = result
         return result
 
+    def prefetch_nameservers(self, targets: Sequence[str | bytes]) -> None:
+        """
+        Look up the nameservers of all ``targets`` and cache them.
+
+        Instead of walking down from the top-level domain for every target one after
+        another, the zone cuts of all targets are looked up level by level. All zone cuts
+        of one level are looked up concurrently, with at most ``max_concurrency`` queries
+        at the same time. Afterwards, ``resolve_nameservers()`` and ``resolve()`` find the
+        nameservers of the targets in the cache.
+
+        Nothing is done if ``max_concurrency`` is 1. Errors are ignored; they happen again
+        when the nameservers of the affected targets are looked up.
+        """
+        if self.max_concurrency <= 1:
+            return
+        levels: list[list[dns.name.Name]] = []
+        seen: set[dns.name.Name] = set()
+        for target in targets:
+            dnsname = dns.name.from_unicode(to_text(target))
+            for i in range(2, len(dnsname.labels) + 1):
+                target_part = dnsname.split(i)[1]
+                if target_part in seen:
+                    continue
+                seen.add(target_part)
+                while len(levels) < i - 1:
+                    levels.append([])
+                levels[i - 2].append(target_part)
+
+        # Maps every zone that has been looked up to the nameservers responsible for it and
+        # the TTL of this information; None if it could not be looked up
+        delegations: dict[
+            dns.name.Name, tuple[list[str] | None, float | None] | None
+        ] = {}
+
+        def lookup(target_part: dns.name.Name) -> None:
+            if len(target_part.labels) > 2:
+                parent = delegations.get(target_part.parent())
+                if parent is None:
+                    delegations[target_part] = None
+                    return
+                nameservers, ttl = parent
+                nameserver_ips = None
+            else:
+                nameservers, ttl = None, None
+                nameserver_ips = self.default_nameservers
+            cached = self.cache.get_with_ttl((str(target_part), "ns"))
+            if cached is not None:
+                nameservers, remaining_ttl = cached
+                delegations[target_part] = (
+                    nameservers,
+                    remaining_ttl if ttl is None else min(ttl, remaining_ttl),
+                )
+                return
+            try:
+                delegations[target_part] = self.in_flight.run(
+                    (str(target_part), "ns"),
+                    functools.partial(
+                        self._lookup_zone_cut,
+                        target_part,
+                        nameservers,
+                        nameserver_ips,
+                        ttl,
+                    ),
+                )
+            except (dns.exception.DNSException, ResolverError):
+                delegations[target_part] = None
+
+        for level in levels:
+            run_concurrently(
+                [functools.partial(lookup, target_part) for target_part in level],
+                max_concurrency=self.max_concurrency,
+            )
+
+    def _get_nameserver_addresses(self, nameservers: Sequence[str]) -> list[str]:
+        nameserver_ips = set()
+        for addresses in self._lookup_addresses(nameservers).values():
+            nameserver_ips.update(addresses)
+        return sorted(nameserver_ips)
+
+    def _select_resolver_addresses(self, nameservers, nameserver_ips) -> list[str]:
+        # The resolver asks the nameservers in this order, so make sure that
+        # addresses that cannot be reached are not asked first
+        addresses = select_addresses(nameserver_ips, self.address_family)
+        if not addresses:
+            raise ResolverError(
+                f"The nameservers {', '.join(nameservers)} have no addresses of the selected address family"
+            )
+        addresses = self.server_statistics.filter_available(addresses)
+        if not addresses:
+            raise ResolverError(
+                f"The nameservers {', '.join(nameservers)} did not respond to recent queries"
+            )
+        return addresses
+
+    def _configure_resolver(
+        self, resolver: dns.resolver.BaseResolver, addresses: list[str]
+    ) -> None:
+        resolver.use_edns(0, ednsflags=dns.flags.DO, payload=_EDNS_SIZE)
+        resolver.timeout = self.timeout
+        resolver.nameservers = addresses
+
     def _get_resolver(
         self, dnsname: dns.name.Name, nameservers
     ) -> dns.resolver.Resolver:
-        cache_index = "|".join([str(dnsname)] + sorted(nameservers))
+        return self._get_resolver_for_addresses(
+            self._select_resolver_addresses(
+                nameservers, self._get_nameserver_addresses(nameservers)
+            )
+        )
+
+    def _get_resolver_for_addresses(
+        self, addresses: list[str]
+    ) -> dns.resolver.Resolver:
+        # Since the nameserver addresses expire from the cache, index the resolvers
+        # by the addresses and not by the nameserver names
+        cache_index = "|".join(addresses)
         resolver = self.resolver_cache.get(cache_index)
         if resolver is None:
             resolver = dns.resolver.Resolver(configure=False)
-            resolver.use_edns(0, ednsflags=dns.flags.DO, payload=_EDNS_SIZE)
-            resolver.timeout = self.timeout
-            nameserver_ips = set()
-            for nameserver in nameservers:
-                nameserver_ips.update(self._lookup_address(nameserver))
-            resolver.nameservers = sorted(nameserver_ips)
-            self.resolver_cache[cache_index] = resolver
+            self._configure_resolver(resolver, addresses)
+            self.resolver_cache.set(cache_index, resolver, _FALLBACK_TTL)
+        return resolver
+
+    def _get_async_resolver(
+        self, dnsname: dns.name.Name, nameservers
+    ) -> dns.asyncresolver.Resolver:
+        addresses = self._select_resolver_addresses(
+            nameservers, self._get_nameserver_addresses(nameservers)
+        )
+        cache_index = "|".join(addresses)
+        resolver = self.async_resolver_cache.get(cache_index)
+        if resolver is None:
+            resolver = dns.asyncresolver.Resolver(configure=False)
+            self._configure_resolver(resolver, addresses)
+            self.async_resolver_cache.set(cache_index, resolver, _FALLBACK_TTL)
         return resolver
 
+    def _record_answer(
+        self,
+        resolver: dns.resolver.BaseResolver,
+        address: str | None,
+        rtt: float,
+    ) -> None:
+        """
+        Update the statistics of the address of ``resolver`` that answered.
+
+        If the address is not known, an answer can only be attributed to an address
+        if the resolver has just one. The RTT is only known if the resolver has just
+        one address, since otherwise it can include timeouts of other addresses.
+        """
+        addresses = [str(nameserver) for nameserver in resolver.nameservers]
+        if len(addresses) == 1:
+            self.server_statistics.record_success(addresses[0], rtt)
+        elif address is not None:
+            self.server_statistics.record_success(address)
+
+    def _record_timeout(
+        self, resolver: dns.resolver.BaseResolver, exc: dns.exception.Timeout
+    ) -> None:
+        """
+        Update the statistics of the addresses of ``resolver`` that did not answer in time.
+
+        dnspython lists the addresses that were tried in the ``errors`` of the exception.
+        If these are not available, only the first address was tried.
+        """
+        errors = exc.kwargs.get("errors")
+        if errors is None:
+            addresses = [str(nameserver) for nameserver in resolver.nameservers[:1]]
+        else:
+            addresses = []
+            for error in errors:
+                address = str(error[0])
+                if (
+                    isinstance(error[3], dns.exception.Timeout)
+                    and address not in addresses
+                ):
+                    addresses.append(address)
+        for address in addresses:
+            self.server_statistics.record_failure(address)
+
+    def _resolve_with_statistics(
+        self,
+        resolver: dns.resolver.Resolver,
+        dnsname: dns.name.Name,
+        *,
+        rdtype: dns.rdatatype.RdataType,
+        **kwargs: t.Unpack[ResolverParams],
+    ) -> dns.rrset.RRset | None:
+        # Hedged queries need a second query slot
+        if self.hedging and self.max_concurrency > 1 and len(resolver.nameservers) > 1:
+            return self._resolve_hedged(
+                [str(address) for address in resolver.nameservers],
+                dnsname,
+                rdtype=rdtype,
+                **kwargs,
+            )
+        return self._resolve(
+            resolver,
+            dnsname,
+            handle_response_errors=True,
+            rdtype=rdtype,
+            **kwargs,
+        )
+
+    def _get_hedge_delay(self) -> float:
+        """
+        Return how long to wait for an answer before asking the next address.
+
+        This is the 90th percentile of the recently measured RTTs, so that roughly
+        one in ten queries is hedged.
+        """
+        delay = self.server_statistics.get_rtt_quantile(0.9)
+        return min(_DEFAULT_HEDGE_DELAY if delay is None else delay, self.timeout)
+
+    def _resolve_hedged(
+        self,
+        addresses: list[str],
+        dnsname: dns.name.Name,
+        *,
+        rdtype: dns.rdatatype.RdataType,
+        **kwargs: t.Unpack[ResolverParams],
+    ) -> dns.rrset.RRset | None:
+        """
+        Send the query to the first address. Whenever no answer arrived within the hedge delay,
+        or a query failed, also send it to the next address. The first answer is returned.
+        """
+
+        # The queries that lost the race must not outlive the deadline that applies now,
+        # even if it is lifted once this method returns. Without a deadline, they can take
+        # as long as a single query with all its retries.
+        remaining = self.retry_policy.get_remaining_time()
+        if remaining is None:
+            remaining = self.timeout * (self.timeout_retries + 1)
+        deadline = monotonic() + remaining
+        results: queue.Queue[tuple[dns.rrset.RRset | None, Exception | None]] = (
+            queue.Queue()
+        )
+
+        def query(address: str) -> None:
+            # The statistics are updated by _resolve() for every query that is sent
+            try:
+                with self.retry_policy.limit_thread_time(deadline):
+                    result = self._resolve(
+                        self._get_resolver_for_addresses([address]),
+                        dnsname,
+                        handle_response_errors=True,
+                        rdtype=rdtype,
+                        **kwargs,
+                    )
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                results.put((None, exc))
+            else:
+                results.put((result, None))
+
+        def start_query(address: str) -> None:
+            # Daemon threads do not keep the interpreter alive for the queries that lost the race
+            threading.Thread(target=query, args=(address,), daemon=True).start()
+
+        start_query(addresses[0])
+        next_index = 1
+        running = 1
+        first_exception: Exception | None = None
+        while running:
+            try:
+                result, exception = results.get(
+                    timeout=(
+                        self._get_hedge_delay() if next_index < len(addresses) else None
+                    )
+                )
+            except queue.Empty:
+                pass
+            else:
+                running -= 1
+                if exception is None:
+                    return result
+                if isinstance(
+                    exception, (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer)
+                ):
+                    # These are answers as well
+                    raise exception
+                if first_exception is None:
+                    first_exception = exception
+            if next_index < len(addresses):
+                start_query(addresses[next_index])
+                next_index += 1
+                running += 1
+        assert first_exception is not None
+        raise first_exception
+
+    def get_nameserver_statistics(self) -> dict[str, dict[str, t.Any]]:
+        """
+        Return statistics for all nameserver addresses that have been queried.
+        """
+        return self.server_statistics.get_statistics()
+
+    def get_zone(self, target: str | bytes) -> str | None:
+        """
+        Return the apex of the zone ``target`` belongs to, or ``None`` if it is not known.
+        """
+        dnsname = dns.name.from_unicode(to_text(target))
+        self._lookup_ns(dnsname)
+        return self.zone_cache.get(str(dnsname))
+
+    def transfer_zone(
+        self, zone: str, nameserver: str
+    ) -> dict[tuple[dns.name.Name, int], dns.rrset.RRset] | None:
+        """
+        Transfer ``zone`` from ``nameserver`` with AXFR.
+
+        Returns the RRsets of the zone, indexed by their names and types,
+        or ``None`` if the transfer is refused or fails for all addresses of the nameserver.
+        """
+        addresses = self.server_statistics.filter_available(
+            select_addresses(self._lookup_address(nameserver), self.address_family)
+        )
+        for address in addresses:
+            records: dict[tuple[dns.name.Name, int], dns.rrset.RRset] = {}
+            try:
+                with self.query_slots.claim():
+                    for message in dns.query.xfr(
+                        address,
+                        zone,
+                        timeout=self.timeout,
+                        lifetime=self.retry_policy.get_remaining_time(),
+                        relativize=False,
+                    ):
+                        for rrset in message.answer:
+                            key = (rrset.name, rrset.rdtype)
+                            if key in records:
+                                records[key].union_update(rrset)
+                            else:
+                                records[key] = rrset
+            except (dns.exception.DNSException, OSError, EOFError):
+                continue
+            return records
+        return None
+
+    def resolve_from_zone_transfer(
+        self,
+        target: str | bytes,
+        *,
+        rdtype: dns.rdatatype.RdataType,
+    ) -> dict[str, dns.rrset.RRset | None] | None:
+        """
+        Look up the records of ``target`` in its zone, which is transferred from all of its
+        nameservers with AXFR the first time it is needed.
+
+        Returns the same as ``resolve()``, or ``None`` if the zone of ``target`` is not known
+        or could not be transferred from all of its nameservers, or if the answer cannot be
+        taken from the zone's records directly (CNAMEs, DNAMEs, wildcards, and delegations).
+        In that case, ``resolve()`` has to be used.
+        """
+        zone = self.get_zone(target)
+        if zone is None:
+            return None
+        dnsname = dns.name.from_unicode(to_text(target))
+        if self.cname_cache.get(str(dnsname)) is not None:
+            return None
+        zonename = dns.name.from_unicode(zone)
+
+        def transfer() -> (
+            dict[
+                str,
+                tuple[
+                    dict[tuple[dns.name.Name, int], dns.rrset.RRset],
+                    set[dns.name.Name],
+                ],
+            ]
+            | None
+        ):
+            # Check again, since another thread could have finished the transfer
+            # between the check below and claiming the flight
+            if zone in self.zone_transfers:
+                return self.zone_transfers[zone]
+            transfers = {}
+            for nameserver in self.resolve_nameservers(zone):
+                records = self.transfer_zone(zone, nameserver)
+                if records is None:
+                    self.zone_transfers[zone] = None
+                    return None
+                transfers[nameserver] = (records, {name for name, _ in records})
+            self.zone_transfers[zone] = transfers
+            return transfers
+
+        if zone in self.zone_transfers:
+            transfers = self.zone_transfers[zone]
+        else:
+            transfers = self.in_flight.run((zone, "axfr"), transfer)
+        if not transfers:
+            return None
+        result: dict[str, dns.rrset.RRset | None] = {}
+        for nameserver, (records, names) in transfers.items():
+            if (
+                rdtype != dns.rdatatype.CNAME
+                and (dnsname, dns.rdatatype.CNAME) in records
+            ):
+                # The nameservers would follow the CNAME
+                return None
+            ancestor = dnsname
+            while ancestor != zonename and ancestor != dns.name.root:
+                ancestor = ancestor.parent()
+                if (ancestor, dns.rdatatype.DNAME) in records:
+                    # The nameservers would synthesize a CNAME (RFC 6672)
+                    return None
+                if ancestor != zonename and (ancestor, dns.rdatatype.NS) in records:
+                    # The name is delegated to another zone
+                    return None
+                if (
+                    dnsname not in names
+                    and dns.name.Name((b"*",) + ancestor.labels) in names
+                ):
+                    # The name could be synthesized from a wildcard (RFC 4592); since
+                    # that depends on the closest encloser, leave this to the nameservers
+                    return None
+            result[nameserver] = records.get((dnsname, rdtype))
+        return result
+
     def resolve_nameservers(
         self, target: str | bytes, resolve_addresses: bool = False
     ) -> list[str]:
         nameservers = self._lookup_ns(dns.name.from_unicode(to_text(target)))
         if resolve_addresses:
             nameserver_ips = set()
-            for nameserver in nameservers or []:
-                nameserver_ips.update(self._lookup_address(nameserver))
+            for addresses in self._lookup_addresses(nameservers or []).values():
+                nameserver_ips.update(addresses)
             nameservers = list(nameserver_ips)
         return sorted(nameservers or [])
 
@@ -407,8 +2323,13 @@ class ResolveDirectlyFromNameServers(_Resolve):
         *,
         nxdomain_is_empty: bool = True,
         rdtype: dns.rdatatype.RdataType,
+        exclude_nameservers: Collection[str] | None = None,
         **kwargs: t.Unpack[ResolverParams]
     ) -> dict[str, dns.rrset.RRset | None]:
+        """
+        Query all authoritative nameservers of ``target``, except the ones in
+        ``exclude_nameservers``. Returns the records indexed by nameserver.
+        """
         dnsname = dns.name.from_unicode(to_text(target))
         loop_catcher = set()
         while True:
@@ -421,17 +2342,34 @@ class ResolveDirectlyFromNameServers(_Resolve):
             cname = self.cname_cache.get(str(dnsname))
             if cname is None:
                 break
-            dnsname = cname
+            dnsname = dns.name.from_text(cname)
             if dnsname in loop_catcher:
                 raise ResolverError(f"Found CNAME loop starting at {to_native(target)}")
             loop_catcher.add(dnsname)
 
-        results: dict[str, dns.rrset.RRset | None] = {}
-        for nameserver in nameservers or []:
-            results[nameserver] = None
+        def empty_rrset() -> dns.rrset.RRset:
+            # Note that rdclass is not always correct, but it's good enough for us...
+            return dns.rrset.RRset(
+                name=dnsname, rdclass=dns.rdataclass.IN, rdtype=rdtype
+            )
+
+        def resolve_from(nameserver: str) -> dns.rrset.RRset | None:
             resolver = self._get_resolver(dnsname, [nameserver])
             try:
-                results[nameserver] = self._resolve(
+                return self._resolve_with_statistics(
+                    resolver, dnsname, rdtype=rdtype, **kwargs
+                )
+            except dns.resolver.NoAnswer:
+                return None
+            except dns.resolver.NXDOMAIN:
+                if nxdomain_is_empty:
+                    return empty_rrset()
+                raise
+
+        async def resolve_from_async(nameserver: str) -> dns.rrset.RRset | None:
+            resolver = self._get_async_resolver(dnsname, [nameserver])
+            try:
+                return await self._resolve_async(
                     resolver,
                     dnsname,
                     handle_response_errors=True,
@@ -439,16 +2377,53 @@ class ResolveDirectlyFromNameServers(_Resolve):
                     **kwargs,
                 )
             except dns.resolver.NoAnswer:
-                pass
+                return None
             except dns.resolver.NXDOMAIN:
                 if nxdomain_is_empty:
-                    # Note that rdclass is not always correct, but it's good enough for us...
-                    results[nameserver] = dns.rrset.RRset(
-                        name=dnsname, rdclass=dns.rdataclass.IN, rdtype=rdtype
-                    )
-                else:
-                    raise
-        return results
+                    return empty_rrset()
+                raise
+
+        nameservers = nameservers or []
+        if exclude_nameservers:
+            nameservers = [
+                nameserver
+                for nameserver in nameservers
+                if nameserver not in exclude_nameservers
+            ]
+        # Resolve the addresses of all nameservers in one go
+        addresses = self._lookup_addresses(nameservers)
+        if self.address_family in ("ipv4", "ipv6"):
+            # Skip the nameservers that cannot be reached with the selected address family
+            usable_nameservers = [
+                nameserver
+                for nameserver in nameservers
+                if select_addresses(addresses[nameserver], self.address_family)
+            ]
+            if nameservers and not usable_nameservers:
+                raise ResolverError(
+                    f"The nameservers {', '.join(nameservers)} have no addresses of the selected address family"
+                )
+            nameservers = usable_nameservers
+        rrsets = self._run_concurrently(
+            [functools.partial(resolve_from, nameserver) for nameserver in nameservers],
+            [
+                functools.partial(resolve_from_async, nameserver)
+                for nameserver in nameservers
+            ],
+            max_concurrency=self.max_concurrency,
+        )
+        return {
+            nameserver: rrsets[index] for index, nameserver in enumerate(nameservers)
+        }
+
+
+def format_resolver_error(error: Exception, server: str | None = None) -> str:
+    suffix = f" for {server}" if server is not None else ""
+    if isinstance(error, InvalidInput):
+        return f"Invalid input{suffix}: {to_native(error)}"
+    if isinstance(error, ResolverError):
+        return f"Unexpected resolving error{suffix}: {to_native(error)}"
+    return f"Unexpected DNS error{suffix}: {to_native(error)}"
 
 
 def guarded_run(
@@ -458,36 +2433,31 @@ def guarded_run(
     server: str | None = None,
     generate_additional_results: t.Callable[[], Mapping[str, t.Any]] | None = None,
 ) -> _T:
-    suffix = f" for {server}" if server is not None else ""
     kwargs: Mapping[str, t.Any] = {}
     try:
         return runner()
-    except InvalidInput as e:
-        if generate_additional_results is not None:
-            kwargs = generate_additional_results()
-        module.fail_json(
-            msg=f"Invalid input{suffix}: {to_native(e)}",
-            exception=traceback.format_exc(),
-            **kwargs,
-        )
-    except ResolverError as e:
-        if generate_additional_results is not None:
-            kwargs = generate_additional_results()
-        module.fail_json(
-            msg=f"Unexpected resolving error{suffix}: {to_native(e)}",
-            exception=traceback.format_exc(),
-            **kwargs,
-        )
-    except dns.exception.DNSException as e:
+    except (ResolverError, dns.exception.DNSException) as e:
         if generate_additional_results is not None:
             kwargs = generate_additional_results()
         module.fail_json(
-            msg=f"Unexpected DNS error{suffix}: {to_native(e)}",
+            msg=format_resolver_error(e, server=server),
             exception=traceback.format_exc(),
             **kwargs,
         )
 
 
+def capture_resolver_error(runner: t.Callable[[], object]) -> str | None:
+    """
+    Call ``runner``. Return the message ``guarded_run()`` would fail with if it raises
+    a resolving error, and ``None`` if it succeeds.
+    """
+    try:
+        runner()
+    except (ResolverError, dns.exception.DNSException) as e:
+        return format_resolver_error(e)
+    return None
+
+
 def assert_requirements_present(module: AnsibleModule) -> None:
     if DNSPYTHON_IMPORTERROR is not None:
         module.fail_json(
@@ -0,0 +1,208 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Note that this module util is **PRIVATE** to the collection. It can have breaking changes at any time.
+# Do not use this from other collections or standalone plugins/modules!
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import traceback
+import typing as t
+from collections import OrderedDict
+from time import monotonic
+
+from ansible.module_utils.basic import missing_required_lib
+from ansible.module_utils.common.text.converters import to_native
+
+try:
+    import sqlite3
+except ImportError:
+    SQLITE3_IMPORTERROR = traceback.format_exc()
+else:
+    SQLITE3_IMPORTERROR = None  # type: ignore  # TODO
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from ansible.module_utils.basic import AnsibleModule
+
+
+_K = t.TypeVar("_K")
+_V = t.TypeVar("_V")
+
+
+class PersistentCacheError(Exception):
+    pass
+
+
+class PersistentCache:
+    """
+    A cache of JSON-serializable values stored in a SQLite database.
+
+    The database can be shared by multiple processes at the same time. Since it can outlive
+    the current process, expiry times are stored as wall clock times.
+    Errors while reading or writing entries are ignored, so a broken cache never makes
+    resolving fail; it only makes it slower.
+    """
+
+    def __init__(self, path: str, timeout: float = 10) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            self._connection = sqlite3.connect(
+                path, timeout=timeout, check_same_thread=False, isolation_level=None
+            )
+            try:
+                # WAL mode allows readers and a writer to access the database at the same time.
+                # It is not supported by all filesystems; in that case SQLite's default mode is fine as well.
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.Error:
+                pass
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "DELETE FROM entries WHERE expires <= ?", (time.time(),)
+            )
+        except sqlite3.Error as exc:
+            raise PersistentCacheError(to_native(exc)) from exc
+
+    def get(self, key: str) -> tuple[t.Any, float] | None:
+        """
+        Return the value for ``key`` together with its remaining lifetime,
+        or ``None`` if there is no such entry or if it expired.
+        """
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT value, expires FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        remaining = row[1] - time.time()
+        if remaining <= 0:
+            return None
+        try:
+            return json.loads(row[0]), remaining
+        except ValueError:
+            return None
+
+    def set(self, key: str, value: t.Any, ttl: float) -> None:
+        try:
+            with self._lock:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), time.time() + ttl),
+                )
+        except sqlite3.Error:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class TTLCache(t.Generic[_K, _V]):
+    """
+    A thread-safe cache whose entries expire after their TTL.
+
+    The lifetime of entries is capped by ``max_ttl``. If more than ``max_size`` entries
+    are stored, the least recently used entries are evicted.
+
+    If ``persistent_cache`` is provided, entries are also written to it, and entries not
+    found in memory are looked up there. Keys and values must be JSON-serializable in that case;
+    ``persistent_prefix`` is prepended to the serialized keys.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        max_ttl: float | None = None,
+        persistent_cache: PersistentCache | None = None,
+        persistent_prefix: str = "",
+    ) -> None:
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self.persistent_cache = persistent_cache
+        self.persistent_prefix = persistent_prefix
+        self._entries: OrderedDict[_K, tuple[float, _V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get_persistent_key(self, key: _K) -> str:
+        return self.persistent_prefix + json.dumps(key)
+
+    def _store(self, key: _K, value: _V, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_with_ttl(self, key: _K) -> tuple[_V, float] | None:
+        """
+        Return the value for ``key`` together with its remaining lifetime,
+        or ``None`` if there is no such entry or if it expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                remaining = expires - monotonic()
+                if remaining > 0:
+                    self._entries.move_to_end(key)
+                    return value, remaining
+                del self._entries[key]
+        if self.persistent_cache is None:
+            return None
+        persistent_entry = self.persistent_cache.get(self._get_persistent_key(key))
+        if persistent_entry is None:
+            return None
+        value, remaining = persistent_entry
+        if self.max_ttl is not None:
+            remaining = min(remaining, self.max_ttl)
+        self._store(key, value, remaining)
+        return value, remaining
+
+    def get(self, key: _K) -> _V | None:
+        entry = self.get_with_ttl(key)
+        return None if entry is None else entry[0]
+
+    def clear(self) -> None:
+        """
+        Remove all entries from memory. The persistent cache is not modified.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def set(self, key: _K, value: _V, ttl: float) -> None:
+        if self.max_ttl is not None:
+            ttl = min(ttl, self.max_ttl)
+        self._store(key, value, ttl)
+        if self.persistent_cache is not None:
+            self.persistent_cache.set(self._get_persistent_key(key), value, ttl)
+
+
+def open_persistent_cache(
+    module: AnsibleModule, path: str | None
+) -> PersistentCache | None:
+    if path is None:
+        return None
+    if SQLITE3_IMPORTERROR is not None:
+        module.fail_json(
+            msg=missing_required_lib("sqlite3"),
+            exception=SQLITE3_IMPORTERROR,
+        )
+    try:
+        return PersistentCache(path)
+    except PersistentCacheError as exc:
+        module.fail_json(
+            msg=f"Cannot open cache {path}: {exc}",
+            exception=traceback.format_exc(),
+        )
@@ -15,6 +15,13 @@ extends_documentation_fragment:
   - community.dns._attributes
   - community.dns._attributes.info_module
   - community.dns._attributes.idempotent_not_modify_state
+attributes:
+  check_mode:
+    details:
+      - This action does not modify state, except for writing O(output_file). This is skipped in check mode.
+  idempotent:
+    details:
+      - This action does not modify state, except for writing O(output_file).
 author:
   - Felix Fontein (@felixfontein)
 options:
@@ -59,6 +66,74 @@ options:
     type: list
     elements: str
     version_added: 2.7.0
+  max_concurrency:
+    description:
+      - Maximal number of DNS queries to send at the same time when resolving the nameserver names to IP addresses.
+      - If larger than V(1), the nameservers of all zones containing the names in O(name) are looked up before the
+        nameservers of the names themselves. The zones on the same level of the DNS tree are looked up at the same time.
+      - The default V(1) sends the queries one after another.
+    type: int
+    default: 1
+    version_added: 4.2.0
+  cache_path:
+    description:
+      - Path to a SQLite database in which the nameservers of zones, the addresses of these nameservers, and CNAMEs are cached
+        across module invocations.
+      - The database is created if it does not exist. It can be shared by tasks running at the same time.
+      - Cache entries expire according to the TTLs of the DNS records, but at the latest after one hour.
+      - If not specified, this information is only cached during a single module invocation.
+    type: path
+    version_added: 4.2.0
+  address_family:
+    description:
+      - Which IP address families to use for querying nameservers.
+      - V(auto) checks which address families this host can reach. Addresses of other families are only used after all
+        addresses of reachable families have been tried.
+      - V(ipv4) only uses IPv4 addresses, and V(ipv6) only uses IPv6 addresses.
+      - V(both) uses IPv4 and IPv6 addresses without checking whether they can be reached.
+    type: str
+    choices:
+      - auto
+      - ipv4
+      - ipv6
+      - both
+    default: auto
+    version_added: 4.2.0
+  concurrency_backend:
+    description:
+      - How to send DNS queries at the same time when O(max_concurrency) is larger than V(1).
+      - V(threads) sends every query from its own thread.
+      - V(asyncio) sends the queries from a single thread with an C(asyncio) event loop, which needs fewer resources
+        when many queries are sent at the same time.
+    type: str
+    choices:
+      - threads
+      - asyncio
+    default: threads
+    version_added: 4.2.0
+  reuse_sockets:
+    description:
+      - When set to V(true), the sockets used to query nameservers directly are reused for later queries, instead of opening
+        a new socket for every query.
+      - Nameservers that returned a truncated response are asked over TCP right away afterwards. TCP connections are kept
+        open and reused.
+      - This is used for the queries that look up the nameservers of the zones. The addresses of the nameservers are looked
+        up with the default resolver, which does not reuse sockets.
+    type: bool
+    default: false
+    version_added: 4.2.0
+  output_file:
+    description:
+      - Path of a file to write the results to, instead of returning them in RV(results).
+      - For every DNS name in O(name), a line with a JSON object is written to the file as soon as its lookup finished. The
+        object has the same structure as the entries of RV(results).
+      - If the lookup for a DNS name fails, the object contains the error message as C(error), and the module continues
+        with the next DNS name. The module only returns a summary in RV(output_summary).
+      - This keeps the amount of memory needed low when looking up a lot of DNS names.
+      - The file is overwritten if it already exists. In check mode, the file is not written, but RV(output_summary) is
+        returned nonetheless.
+    type: path
+    version_added: 4.2.0
 requirements:
   - dnspython >= 2.0.0
 """
@@ -80,7 +155,7 @@ RETURN = r"""
 results:
   description:
     - Information on the nameservers for every DNS name provided in O(name).
-  returned: always
+  returned: if O(output_file) is not specified
   type: list
   elements: dict
   contains:
@@ -109,17 +184,92 @@ results:
         - ns1.example.org
         - ns2.example.org
         - ns3.example.org
+output_summary:
+  description:
+    - A summary of the results written to O(output_file).
+  returned: if O(output_file) is specified
+  type: dict
+  version_added: 4.2.0
+  contains:
+    path:
+      description:
+        - The path of the output file.
+      type: str
+      returned: success
+      sample: /tmp/results.jsonl
+    total:
+      description:
+        - The number of DNS names whose results have been written.
+      type: int
+      returned: success
+      sample: 3
+    succeeded:
+      description:
+        - The number of DNS names whose lookup succeeded.
+      type: int
+      returned: success
+      sample: 2
+    failed:
+      description:
+        - The number of DNS names whose lookup failed.
+      type: int
+      returned: success
+      sample: 1
+    failed_names:
+      description:
+        - The DNS names whose lookup failed.
+        - At most the first 100 of these names are listed. The error messages of all names can be found in O(output_file).
+      type: list
+      elements: str
+      returned: success
+      sample:
+        - does-not-exist.example.com
+nameserver_statistics:
+  description:
+    - Statistics on the nameserver addresses that have been queried directly, indexed by address.
+    - For every address, V(queries) is the number of queries sent to it, V(timeouts) the number of these queries that timed
+      out, V(consecutive_failures) the number of timeouts since its last answer, and V(srtt) its smoothed round-trip time
+      in seconds (V(null) if unknown).
+    - An address that did not answer three queries in a row is not queried for 30 seconds. During that time, V(state) is
+      V(open). After that, V(state) is V(half-open) and a single query is sent to check whether it answers again. Otherwise,
+      V(state) is V(closed).
+  returned: always
+  type: dict
+  version_added: 4.2.0
+  sample:
+    192.0.2.1:
+      queries: 12
+      timeouts: 0
+      consecutive_failures: 0
+      srtt: 0.0213
+      state: closed
+    192.0.2.2:
+      queries: 3
+      timeouts: 3
+      consecutive_failures: 3
+      srtt: 10.0
+      state: open
 """
 
+import functools
 import typing as t
 
 from ansible.module_utils.basic import AnsibleModule
 
 from ansible_collections.community.dns.plugins.module_utils._resolver import (
     ResolveDirectlyFromNameServers,
+    TransportPool,
     assert_requirements_present,
+    capture_resolver_error,
+    create_negative_cache,
     guarded_run,
 )
+from ansible_collections.community.dns.plugins.module_utils._output_file import (
+    open_output_file,
+)
+from ansible_collections.community.dns.plugins.module_utils._resolver_cache import (
+    open_persistent_cache,
+)
 
 
 def main() -> None:
@@ -132,31 +282,85 @@ def main() -> None:
             "always_ask_default_resolver": {"type": "bool", "default": True},
             "servfail_retries": {"type": "int", "default": 0},
             "server": {"type": "list", "elements": "str"},
+            "max_concurrency": {"type": "int", "default": 1},
+            "cache_path": {"type": "path"},
+            "address_family": {
+                "type": "str",
+                "default": "auto",
+                "choices": ["auto", "ipv4", "ipv6", "both"],
+            },
+            "concurrency_backend": {
+                "type": "str",
+                "default": "threads",
+                "choices": ["threads", "asyncio"],
+            },
+            "reuse_sockets": {"type": "bool", "default": False},
+            "output_file": {"type": "path"},
         },
         supports_check_mode=True,
     )
     assert_requirements_present(module)
 
+    if module.params["max_concurrency"] < 1:
+        module.fail_json(msg="max_concurrency must be at least 1")
+
     names = module.params["name"]
     resolve_addresses = module.params["resolve_addresses"]
 
+    transport_pool = TransportPool() if module.params["reuse_sockets"] else None
     resolver = ResolveDirectlyFromNameServers(
         timeout=module.params["query_timeout"],
         timeout_retries=module.params["query_retry"],
         servfail_retries=module.params["servfail_retries"],
         always_ask_default_resolver=module.params["always_ask_default_resolver"],
         server_addresses=module.params["server"],
+        max_concurrency=module.params["max_concurrency"],
+        persistent_cache=open_persistent_cache(module, module.params["cache_path"]),
+        address_family=module.params["address_family"],
+        backend=module.params["concurrency_backend"],
+        transport_pool=transport_pool,
+        negative_cache=create_negative_cache(),
+    )
+    output_file = open_output_file(module, module.params["output_file"])
+    results: list[dict[str, t.Any]] = (
+        [{"name": name} for name in names] if output_file is None else []
     )
-    results: list[dict[str, t.Any]] = [{"name": name} for name in names]
 
-    def f():
-        for index, name in enumerate(names):
-            results[index]["nameservers"] = sorted(
-                resolver.resolve_nameservers(name, resolve_addresses=resolve_addresses)
+    def lookup(result: dict[str, t.Any]) -> None:
+        result["nameservers"] = sorted(
+            resolver.resolve_nameservers(
+                result["name"], resolve_addresses=resolve_addresses
             )
+        )
+
+    def f():
+        resolver.prefetch_nameservers(names)
+        if output_file is None:
+            for result in results:
+                lookup(result)
+            return
+        for name in names:
+            result = {"name": name}
+            error = capture_resolver_error(functools.partial(lookup, result))
+            output_file.write(result, error=error)
+
+    def generate_results() -> dict[str, t.Any]:
+        output: dict[str, t.Any]
+        if output_file is None:
+            output = {"results": results}
+        else:
+            output = {"output_summary": output_file.get_summary()}
+        output["nameserver_statistics"] = resolver.get_nameserver_statistics()
+        return output
 
-    guarded_run(f, module, generate_additional_results=lambda: {"results": results})
-    module.exit_json(results=results)
+    try:
+        guarded_run(f, module, generate_additional_results=generate_results)
+    finally:
+        if output_file is not None:
+            output_file.close()
+        if transport_pool is not None:
+            transport_pool.close()
+    module.exit_json(**generate_results())
 
 
 if __name__ == "__main__":
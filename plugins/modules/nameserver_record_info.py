@@ -16,6 +16,13 @@ extends_documentation_fragment:
   - community.dns._attributes
   - community.dns._attributes.info_module
   - community.dns._attributes.idempotent_not_modify_state
+attributes:
+  check_mode:
+    details:
+      - This action does not modify state, except for writing O(output_file). This is skipped in check mode.
+  idempotent:
+    details:
+      - This action does not modify state, except for writing O(output_file).
 author:
   - Felix Fontein (@felixfontein)
 options:
@@ -29,7 +36,7 @@ options:
     description:
       - The record type to retrieve.
       - Support for V(HTTPS) and V(SVCB) has been added in community.dns 3.4.0.
-    required: true
+      - Exactly one of O(type) and O(types) must be specified.
     type: str
     choices:
       - A
@@ -58,6 +65,44 @@ options:
       - SVCB
       - TLSA
       - TXT
+  types:
+    description:
+      - A list of record types to retrieve.
+      - The records of all types are retrieved with the same nameservers and nameserver addresses, so these are only looked
+        up once per DNS name. For every DNS name, the records of different types are queried at the same time if
+        O(max_concurrency) is larger than V(1).
+      - The records are returned in RV(results[].result_by_type) instead of RV(results[].result).
+      - Exactly one of O(type) and O(types) must be specified.
+    type: list
+    elements: str
+    choices:
+      - A
+      - AAAA
+      - CAA
+      - CNAME
+      - DNAME
+      - DNSKEY
+      - DS
+      - HINFO
+      - HTTPS
+      - LOC
+      - MX
+      - NAPTR
+      - NS
+      - NSEC
+      - NSEC3
+      - NSEC3PARAM
+      - PTR
+      - RP
+      - RRSIG
+      - SOA
+      - SPF
+      - SRV
+      - SSHFP
+      - SVCB
+      - TLSA
+      - TXT
+    version_added: 4.2.0
   query_retry:
     description:
       - Number of retries for DNS query timeouts.
@@ -88,6 +133,88 @@ options:
     type: list
     elements: str
     version_added: 2.7.0
+  max_concurrency:
+    description:
+      - Maximal number of DNS queries to send at the same time.
+      - This is used to query all authoritative nameservers of a DNS name at the same time, and to resolve the names of
+        these nameservers to IPv4 and IPv6 addresses in parallel.
+      - If larger than V(1), the nameservers of all zones containing the names in O(name) are looked up first. The zones
+        on the same level of the DNS tree are looked up at the same time.
+      - The types in O(types) are looked up at the same time. The limit applies to all of these queries together.
+      - The default V(1) sends all queries one after another.
+    type: int
+    default: 1
+    version_added: 4.2.0
+  cache_path:
+    description:
+      - Path to a SQLite database in which the nameservers of zones, the addresses of these nameservers, and CNAMEs are cached
+        across module invocations.
+      - The database is created if it does not exist. It can be shared by tasks running at the same time.
+      - Cache entries expire according to the TTLs of the DNS records, but at the latest after one hour.
+      - If not specified, this information is only cached during a single module invocation.
+    type: path
+    version_added: 4.2.0
+  address_family:
+    description:
+      - Which IP address families to use for querying nameservers.
+      - V(auto) checks which address families this host can reach. Addresses of other families are only used after all
+        addresses of reachable families have been tried.
+      - V(ipv4) only uses IPv4 addresses, and V(ipv6) only uses IPv6 addresses. Nameservers without addresses of that
+        family are not queried.
+      - V(both) uses IPv4 and IPv6 addresses without checking whether they can be reached.
+    type: str
+    choices:
+      - auto
+      - ipv4
+      - ipv6
+      - both
+    default: auto
+    version_added: 4.2.0
+  concurrency_backend:
+    description:
+      - How to send DNS queries at the same time when O(max_concurrency) is larger than V(1).
+      - V(threads) sends every query from its own thread.
+      - V(asyncio) sends the queries from a single thread with an C(asyncio) event loop, which needs fewer resources
+        when many queries are sent at the same time.
+    type: str
+    choices:
+      - threads
+      - asyncio
+    default: threads
+    version_added: 4.2.0
+  reuse_sockets:
+    description:
+      - When set to V(true), the sockets used to query nameservers directly are reused for later queries, instead of opening
+        a new socket for every query.
+      - Nameservers that returned a truncated response are asked over TCP right away afterwards. TCP connections are kept
+        open and reused.
+      - This is used for all queries sent directly to nameservers, both to look up the nameservers of the zones and to query
+        the records, unless O(concurrency_backend=asyncio). The addresses of the nameservers are looked up with the default
+        resolver, which does not reuse sockets.
+    type: bool
+    default: false
+    version_added: 4.2.0
+  zone_transfer:
+    description:
+      - When set to V(true), the zones containing the names in O(name) are transferred with AXFR from all of their
+        nameservers, and the records are looked up in the transferred zones instead of being queried name by name.
+      - If a nameserver does not allow the transfer of a zone, the records of all names in that zone are queried as usual.
+      - This is useful to look up many names in a few zones whose nameservers allow zone transfers to this host.
+    type: bool
+    default: false
+    version_added: 4.2.0
+  output_file:
+    description:
+      - Path of a file to write the results to, instead of returning them in RV(results).
+      - For every DNS name in O(name), a line with a JSON object is written to the file as soon as its lookup finished. The
+        object has the same structure as the entries of RV(results).
+      - If the lookup for a DNS name fails, the object contains the error message as C(error), and the module continues
+        with the next DNS name. The module only returns a summary in RV(output_summary).
+      - This keeps the amount of memory needed low when looking up a lot of DNS names.
+      - The file is overwritten if it already exists. In check mode, the file is not written, but RV(output_summary) is
+        returned nonetheless.
+    type: path
+    version_added: 4.2.0
 requirements:
   - dnspython >= 2.0.0
 """
@@ -104,13 +231,29 @@ EXAMPLES = r"""
 - name: Show TXT values for www.example.com for all nameservers
   ansible.builtin.debug:
     msg: '{{ result.results[0].result }}'
+
+- name: Retrieve A, AAAA, and MX records from all nameservers for two DNS names
+  community.dns.nameserver_record_info:
+    name:
+      - www.example.com
+      - example.org
+    types:
+      - A
+      - AAAA
+      - MX
+    max_concurrency: 4
+  register: result
+
+- name: Show MX records for example.org for all nameservers
+  ansible.builtin.debug:
+    msg: '{{ result.results[1].result_by_type.MX }}'
 """
 
 RETURN = r"""
 results:
   description:
     - Information on the records for every DNS name provided in O(name).
-  returned: always
+  returned: if O(output_file) is not specified
   type: list
   elements: dict
   contains:
@@ -123,7 +266,7 @@ results:
     result:
       description:
         - A list of values per nameserver.
-      returned: success
+      returned: success and O(type) is specified
       type: list
       elements: dict
       sample:
@@ -489,6 +632,24 @@ results:
                 - The windows.
               type: str
               returned: if O(type=NSEC) or O(type=NSEC3)
+    result_by_type:
+      description:
+        - For every record type in O(types), a list of values per nameserver.
+        - Every list has the same structure as RV(results[].result), except that only
+          RV(results[].result[].nameserver) and RV(results[].result[].entries) are returned.
+      returned: success and O(types) is specified
+      type: dict
+      version_added: 4.2.0
+      sample:
+        A:
+          - nameserver: ns1.example.com
+            entries:
+              - address: 127.0.0.1
+        MX:
+          - nameserver: ns1.example.com
+            entries:
+              - exchange: mail.example.com
+                preference: 10
   sample:
     - name: www.example.com
       result:
@@ -510,8 +671,74 @@ results:
         - nameserver: ns3.example.org
           values:
             - address: 127.0.0.1
+output_summary:
+  description:
+    - A summary of the results written to O(output_file).
+  returned: if O(output_file) is specified
+  type: dict
+  version_added: 4.2.0
+  contains:
+    path:
+      description:
+        - The path of the output file.
+      type: str
+      returned: success
+      sample: /tmp/results.jsonl
+    total:
+      description:
+        - The number of DNS names whose results have been written.
+      type: int
+      returned: success
+      sample: 3
+    succeeded:
+      description:
+        - The number of DNS names whose lookup succeeded.
+      type: int
+      returned: success
+      sample: 2
+    failed:
+      description:
+        - The number of DNS names whose lookup failed.
+      type: int
+      returned: success
+      sample: 1
+    failed_names:
+      description:
+        - The DNS names whose lookup failed.
+        - At most the first 100 of these names are listed. The error messages of all names can be found in O(output_file).
+      type: list
+      elements: str
+      returned: success
+      sample:
+        - does-not-exist.example.com
+nameserver_statistics:
+  description:
+    - Statistics on the nameserver addresses that have been queried directly, indexed by address.
+    - For every address, V(queries) is the number of queries sent to it, V(timeouts) the number of these queries that timed
+      out, V(consecutive_failures) the number of timeouts since its last answer, and V(srtt) its smoothed round-trip time
+      in seconds (V(null) if unknown).
+    - An address that did not answer three queries in a row is not queried for 30 seconds. During that time, V(state) is
+      V(open). After that, V(state) is V(half-open) and a single query is sent to check whether it answers again. Otherwise,
+      V(state) is V(closed).
+  returned: always
+  type: dict
+  version_added: 4.2.0
+  sample:
+    192.0.2.1:
+      queries: 12
+      timeouts: 0
+      consecutive_failures: 0
+      srtt: 0.0213
+      state: closed
+    192.0.2.2:
+      queries: 3
+      timeouts: 3
+      consecutive_failures: 3
+      srtt: 10.0
+      state: open
 """
 
+import functools
 import typing as t
 
 from ansible.module_utils.basic import AnsibleModule
@@ -523,96 +750,194 @@ from ansible_collections.community.dns.plugins.module_utils._dnspython_records i
 )
 from ansible_collections.community.dns.plugins.module_utils._resolver import (
     ResolveDirectlyFromNameServers,
+    TransportPool,
     assert_requirements_present,
+    capture_resolver_error,
+    create_negative_cache,
     guarded_run,
+    run_concurrently,
+)
+from ansible_collections.community.dns.plugins.module_utils._output_file import (
+    open_output_file,
 )
+from ansible_collections.community.dns.plugins.module_utils._resolver_cache import (
+    open_persistent_cache,
+)
+
+RECORD_TYPES = [
+    "A",
+    "AAAA",
+    "CAA",
+    "CNAME",
+    "DNAME",
+    "DNSKEY",
+    "DS",
+    "HINFO",
+    "HTTPS",
+    "LOC",
+    "MX",
+    "NAPTR",
+    "NS",
+    "NSEC",
+    "NSEC3",
+    "NSEC3PARAM",
+    "PTR",
+    "RP",
+    "RRSIG",
+    "SOA",
+    "SPF",
+    "SRV",
+    "SSHFP",
+    "SVCB",
+    "TLSA",
+    "TXT",
+]
 
 
 def main() -> None:
     module = AnsibleModule(
         argument_spec={
             "name": {"required": True, "type": "list", "elements": "str"},
-            "type": {
-                "required": True,
-                "type": "str",
-                "choices": [
-                    "A",
-                    "AAAA",
-                    "CAA",
-                    "CNAME",
-                    "DNAME",
-                    "DNSKEY",
-                    "DS",
-                    "HINFO",
-                    "HTTPS",
-                    "LOC",
-                    "MX",
-                    "NAPTR",
-                    "NS",
-                    "NSEC",
-                    "NSEC3",
-                    "NSEC3PARAM",
-                    "PTR",
-                    "RP",
-                    "RRSIG",
-                    "SOA",
-                    "SPF",
-                    "SRV",
-                    "SSHFP",
-                    "SVCB",
-                    "TLSA",
-                    "TXT",
-                ],
-            },
+            "type": {"type": "str", "choices": RECORD_TYPES},
+            "types": {"type": "list", "elements": "str", "choices": RECORD_TYPES},
             "query_retry": {"type": "int", "default": 3},
             "query_timeout": {"type": "float", "default": 10},
             "always_ask_default_resolver": {"type": "bool", "default": True},
             "servfail_retries": {"type": "int", "default": 0},
             "server": {"type": "list", "elements": "str"},
+            "cache_path": {"type": "path"},
+            "address_family": {
+                "type": "str",
+                "default": "auto",
+                "choices": ["auto", "ipv4", "ipv6", "both"],
+            },
+            "concurrency_backend": {
+                "type": "str",
+                "default": "threads",
+                "choices": ["threads", "asyncio"],
+            },
+            "reuse_sockets": {"type": "bool", "default": False},
+            "output_file": {"type": "path"},
+            "zone_transfer": {"type": "bool", "default": False},
+            "max_concurrency": {"type": "int", "default": 1},
         },
+        mutually_exclusive=[("type", "types")],
+        required_one_of=[("type", "types")],
         supports_check_mode=True,
     )
     assert_requirements_present(module)
 
+    if module.params["max_concurrency"] < 1:
+        module.fail_json(msg="max_concurrency must be at least 1")
+
     names = module.params["name"]
-    record_type = module.params["type"]
+    record_types = module.params["types"]
+    if record_types is None:
+        record_types = [module.params["type"]]
+    else:
+        record_types = list(dict.fromkeys(record_types))
 
+    transport_pool = TransportPool() if module.params["reuse_sockets"] else None
     resolver = ResolveDirectlyFromNameServers(
         timeout=module.params["query_timeout"],
         timeout_retries=module.params["query_retry"],
         servfail_retries=module.params["servfail_retries"],
         always_ask_default_resolver=module.params["always_ask_default_resolver"],
         server_addresses=module.params["server"],
+        persistent_cache=open_persistent_cache(module, module.params["cache_path"]),
+        max_concurrency=module.params["max_concurrency"],
+        address_family=module.params["address_family"],
+        backend=module.params["concurrency_backend"],
+        transport_pool=transport_pool,
+        negative_cache=create_negative_cache(),
     )
-    results: list[dict[str, t.Any]] = [{"name": name} for name in names]
 
-    if record_type not in NAME_TO_RDTYPE:
-        min_version = NAME_TO_REQUIRED_VERSION[record_type]
-        module.fail_json(
-            msg=f"Your dnspython version does not support {record_type} records. You need version {min_version} or newer."
-        )
-    rdtype = NAME_TO_RDTYPE[record_type]
+    for record_type in record_types:
+        if record_type not in NAME_TO_RDTYPE:
+            min_version = NAME_TO_REQUIRED_VERSION[record_type]
+            module.fail_json(
+                msg=f"Your dnspython version does not support {record_type} records. You need version {min_version} or newer."
+            )
 
-    def f():
-        for index, name in enumerate(names):
-            result = []
-            results[index]["result"] = result
+    output_file = open_output_file(module, module.params["output_file"])
+    results: list[dict[str, t.Any]] = (
+        [{"name": name} for name in names] if output_file is None else []
+    )
+
+    def lookup(name: str, record_type: str, result: list[dict[str, t.Any]]) -> None:
+        rdtype = NAME_TO_RDTYPE[record_type]
+        records_for_nameservers = None
+        if module.params["zone_transfer"]:
+            records_for_nameservers = resolver.resolve_from_zone_transfer(
+                name, rdtype=rdtype
+            )
+        if records_for_nameservers is None:
             records_for_nameservers = resolver.resolve(name, rdtype=rdtype)
-            for nameserver, records in records_for_nameservers.items():
-                ns_result = {
-                    "nameserver": nameserver,
-                }
-                result.append(ns_result)
-                values = []
-                if records is not None:
-                    for data in records:
-                        values.append(convert_rdata_to_dict(data))
+        for nameserver, records in records_for_nameservers.items():
+            ns_result: dict[str, t.Any] = {
+                "nameserver": nameserver,
+            }
+            result.append(ns_result)
+            values = []
+            if records is not None:
+                for data in records:
+                    values.append(convert_rdata_to_dict(data))
+            if module.params["type"] is not None:
                 ns_result["values"] = values
-                ns_result["entries"] = values
-            result.sort(key=lambda v: v["nameserver"])
+            ns_result["entries"] = values
+        result.sort(key=lambda v: v["nameserver"])
+
+    def lookup_name(result: dict[str, t.Any]) -> None:
+        name = result["name"]
+        if module.params["type"] is not None:
+            result["result"] = []
+            lookup(name, module.params["type"], result["result"])
+            return
+        result_by_type: dict[str, list[dict[str, t.Any]]] = {
+            record_type: [] for record_type in record_types
+        }
+        result["result_by_type"] = result_by_type
+        # The lookups of the nameservers of the name and their addresses are shared
+        # by the lookups of all types, even if they are done at the same time. The
+        # resolver limits the number of queries sent by all lookups together.
+        run_concurrently(
+            [
+                functools.partial(
+                    lookup, name, record_type, result_by_type[record_type]
+                )
+                for record_type in record_types
+            ],
+            max_concurrency=module.params["max_concurrency"],
+        )
+
+    def f():
+        resolver.prefetch_nameservers(names)
+        if output_file is None:
+            for result in results:
+                lookup_name(result)
+            return
+        for name in names:
+            result = {"name": name}
+            error = capture_resolver_error(functools.partial(lookup_name, result))
+            output_file.write(result, error=error)
+
+    def generate_results() -> dict[str, t.Any]:
+        output: dict[str, t.Any]
+        if output_file is None:
+            output = {"results": results}
+        else:
+            output = {"output_summary": output_file.get_summary()}
+        output["nameserver_statistics"] = resolver.get_nameserver_statistics()
+        return output
 
-    guarded_run(f, module, generate_additional_results=lambda: {"results": results})
-    module.exit_json(results=results)
+    try:
+        guarded_run(f, module, generate_additional_results=generate_results)
+    finally:
+        if output_file is not None:
+            output_file.close()
+        if transport_pool is not None:
+            transport_pool.close()
+    module.exit_json(**generate_results())
 
 
 if __name__ == "__main__":
@@ -83,6 +83,8 @@ options:
     description:
       - Global timeout for waiting for all records in seconds.
       - If not set, will wait indefinitely.
+      - Since community.dns 4.2.0, the timeouts of DNS queries are shortened so that they do not exceed this timeout. After
+        the timeout expired, one last check is made whose DNS queries are limited by O(query_timeout).
     type: float
   max_sleep:
     description:
@@ -110,6 +112,121 @@ options:
     type: list
     elements: str
     version_added: 2.7.0
+  max_concurrency:
+    description:
+      - Maximal number of DNS queries to send at the same time.
+      - This is used to check the records of O(records) at the same time, to query all authoritative nameservers of a DNS
+        name at the same time, and to resolve the names of these nameservers to IPv4 and IPv6 addresses in parallel.
+        The limit applies to all of these queries together.
+      - All checks of a round share the time remaining until O(timeout).
+      - The default V(1) sends all queries one after another.
+    type: int
+    default: 1
+    version_added: 4.2.0
+  cache_path:
+    description:
+      - Path to a SQLite database in which the nameservers of zones, the addresses of these nameservers, and CNAMEs are cached
+        across module invocations.
+      - The database is created if it does not exist. It can be shared by tasks running at the same time.
+      - Cache entries expire according to the TTLs of the DNS records, but at the latest after one hour.
+      - If not specified, this information is only cached during a single module invocation.
+    type: path
+    version_added: 4.2.0
+  address_family:
+    description:
+      - Which IP address families to use for querying nameservers.
+      - V(auto) checks which address families this host can reach. Addresses of other families are only used after all
+        addresses of reachable families have been tried.
+      - V(ipv4) only uses IPv4 addresses, and V(ipv6) only uses IPv6 addresses. Nameservers without addresses of that
+        family are not queried.
+      - V(both) uses IPv4 and IPv6 addresses without checking whether they can be reached.
+    type: str
+    choices:
+      - auto
+      - ipv4
+      - ipv6
+      - both
+    default: auto
+    version_added: 4.2.0
+  concurrency_backend:
+    description:
+      - How to send DNS queries at the same time when O(max_concurrency) is larger than V(1).
+      - V(threads) sends every query from its own thread.
+      - V(asyncio) sends the queries from a single thread with an C(asyncio) event loop, which needs fewer resources
+        when many queries are sent at the same time.
+    type: str
+    choices:
+      - threads
+      - asyncio
+    default: threads
+    version_added: 4.2.0
+  hedge_queries:
+    description:
+      - When set to V(true), a query to a nameserver with multiple addresses is also sent to its next address if no answer
+        arrived after some time. The first answer is used.
+      - The time to wait is the 90th percentile of the round-trip times measured so far.
+      - This reduces the time spent waiting for slow or unreachable addresses, at the cost of sending more queries.
+      - This is not used for queries sent with O(concurrency_backend=asyncio).
+      - Hedged queries count towards O(max_concurrency), so this is only used if O(max_concurrency) is larger than V(1).
+    type: bool
+    default: false
+    version_added: 4.2.0
+  converged_nameservers:
+    description:
+      - How to handle nameservers that already returned the expected TXT values for a record with O(records[].mode=subset)
+        or O(records[].mode=equals).
+      - V(recheck) queries all nameservers of the DNS name in every round.
+      - V(skip) no longer queries nameservers that returned the expected values. Only the nameservers that did not return
+        them yet are queried in the following rounds. RV(records[].entries) contains the values last retrieved from every
+        nameserver.
+      - V(confirm) behaves like V(skip), but once all nameservers returned the expected values, all nameservers are queried
+        once more. The check only completes if all of them still return the expected values.
+      - For the other comparison modes, all nameservers are queried in every round.
+    type: str
+    choices:
+      - recheck
+      - skip
+      - confirm
+    default: recheck
+    version_added: 4.2.0
+  check_serial:
+    description:
+      - When set to V(true), every round first queries the SOA record of the zone of every DNS name from all of its
+        nameservers. The TXT records are only queried from nameservers whose SOA serial changed since the last round.
+      - For every zone, this sends a single query per nameserver instead of one query per DNS name and nameserver.
+      - This assumes that the nameservers increase the serial of the zone whenever it changes. For nameservers that do not,
+        the TXT records are queried from all nameservers after O(serial_recheck_rounds) rounds anyway.
+      - DNS names that are a CNAME are always queried from all nameservers.
+    type: bool
+    default: false
+    version_added: 4.2.0
+  serial_recheck_rounds:
+    description:
+      - When O(check_serial=true), the number of rounds after which the TXT records are queried from all nameservers,
+        even if the SOA serials did not change.
+    type: int
+    default: 5
+    version_added: 4.2.0
+  notify_listen:
+    description:
+      - Listen for DNS NOTIFY messages on this UDP address and port while sleeping between two rounds.
+      - When a NOTIFY arrives for a zone that contains one of the DNS names whose checks did not complete yet, the next round
+        starts right away instead of sleeping until O(max_sleep).
+      - The primary nameserver of the zone must be configured to send NOTIFY messages to this address. NOTIFY messages for
+        zones of CNAME targets are not taken into account.
+    type: dict
+    suboptions:
+      address:
+        description:
+          - The IPv4 or IPv6 address to listen on.
+        type: str
+        required: true
+      port:
+        description:
+          - The UDP port to listen on.
+        type: int
+        default: 53
+    version_added: 4.2.0
 requirements:
   - dnspython >= 2.0.0
 """
@@ -199,8 +316,35 @@ completed:
   returned: always
   type: int
   sample: 3
+nameserver_statistics:
+  description:
+    - Statistics on the nameserver addresses that have been queried directly, indexed by address.
+    - For every address, V(queries) is the number of queries sent to it, V(timeouts) the number of these queries that timed
+      out, V(consecutive_failures) the number of timeouts since its last answer, and V(srtt) its smoothed round-trip time
+      in seconds (V(null) if unknown).
+    - An address that did not answer three queries in a row is not queried for 30 seconds. During that time, V(state) is
+      V(open). After that, V(state) is V(half-open) and a single query is sent to check whether it answers again. Otherwise,
+      V(state) is V(closed).
+  returned: always
+  type: dict
+  version_added: 4.2.0
+  sample:
+    192.0.2.1:
+      queries: 12
+      timeouts: 0
+      consecutive_failures: 0
+      srtt: 0.0213
+      state: closed
+    192.0.2.2:
+      queries: 3
+      timeouts: 3
+      consecutive_failures: 3
+      srtt: 10.0
+      state: open
 """
 
+import functools
+import threading
 import time
 import typing as t
 from time import monotonic
@@ -209,12 +353,19 @@ from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.common.text.converters import to_text
 
 from ansible_collections.community.dns.plugins.module_utils._resolver import (
+    NotifyListener,
     ResolveDirectlyFromNameServers,
     assert_requirements_present,
     guarded_run,
+    run_concurrently,
+)
+from ansible_collections.community.dns.plugins.module_utils._resolver_cache import (
+    open_persistent_cache,
 )
 
 try:
+    import dns.exception
+    import dns.name
     import dns.rdatatype
 except ImportError:
     pass  # handled in assert_requirements_present()
@@ -223,9 +374,15 @@ if t.TYPE_CHECKING:  # pragma: no cover
     import dns.rdtypes.ANY.TXT
 
 
-def lookup(resolver: ResolveDirectlyFromNameServers, name: str) -> dict[str, list[str]]:
+def lookup(
+    resolver: ResolveDirectlyFromNameServers,
+    name: str,
+    exclude_nameservers: list[str] | None = None,
+) -> dict[str, list[str]]:
     result = {}
-    txts = resolver.resolve(name, rdtype=dns.rdatatype.TXT)
+    txts = resolver.resolve(
+        name, rdtype=dns.rdatatype.TXT, exclude_nameservers=exclude_nameservers
+    )
     for key, txt in txts.items():
         res = []
         if txt is not None:
@@ -275,10 +432,22 @@ class Waiter:
                 "always_ask_default_resolver"
             ],
             server_addresses=self.module.params["server"],
+            persistent_cache=open_persistent_cache(
+                self.module, self.module.params["cache_path"]
+            ),
+            max_concurrency=self.module.params["max_concurrency"],
+            address_family=self.module.params["address_family"],
+            backend=self.module.params["concurrency_backend"],
+            hedging=self.module.params["hedge_queries"],
         )
         self.records: list[dict[str, t.Any]] = self.module.params["records"]
         self.timeout: float | None = self.module.params["timeout"]
+        self.query_timeout: float = self.module.params["query_timeout"]
         self.max_sleep: float = self.module.params["max_sleep"]
+        self.max_concurrency: int = self.module.params["max_concurrency"]
+        self.converged_nameservers: t.Literal["recheck", "skip", "confirm"] = (
+            self.module.params["converged_nameservers"]
+        )
 
         self.results = [
             {
@@ -288,7 +457,151 @@ class Waiter:
             }
             for record in self.records
         ]
+        # For every record, the values of the nameservers that already returned the expected values
+        self.converged: list[dict[str, list[str]]] = [{} for record in self.records]
+        self.check_serial: bool = self.module.params["check_serial"]
+        self.serial_recheck_rounds: int = self.module.params["serial_recheck_rounds"]
+        # For every zone, the SOA serials returned by its nameservers in the last round
+        self.serials: dict[str, dict[str, int | None]] = {}
+        # For every record, the number of rounds since all of its nameservers were queried
+        self.serial_skip_rounds = [0 for record in self.records]
+        self.notify_listener: NotifyListener | None = None
         self.finished_checks = 0
+        self._lock = threading.Lock()
+
+    def _lookup_record(
+        self, index: int, unchanged_nameservers: set[str] | None
+    ) -> dict[str, list[str]]:
+        record = self.records[index]
+        # Only for these modes, a nameserver that returned the expected values is
+        # expected to continue doing so
+        converging = self.converged_nameservers != "recheck" and record["mode"] in (
+            "subset",
+            "equals",
+        )
+        if not converging and unchanged_nameservers is None:
+            return lookup(self.resolver, record["name"])
+
+        previous: dict[str, list[str]] = self.results[index].get("entries", {})
+        converged = self.converged[index]
+        skip = set(unchanged_nameservers or ()) & set(previous)
+        if skip:
+            self.serial_skip_rounds[index] += 1
+        else:
+            self.serial_skip_rounds[index] = 0
+        if converging:
+            skip.update(converged)
+        txts = lookup(self.resolver, record["name"], exclude_nameservers=sorted(skip))
+        if converging:
+            for nameserver, values in txts.items():
+                if validate_check(values, record["values"], record["mode"]):
+                    converged[nameserver] = values
+        merged = dict(sorted({**{ns: previous[ns] for ns in skip}, **txts}.items()))
+        if (
+            self.converged_nameservers == "confirm"
+            and converging
+            and len(txts) < len(merged)
+            and all(
+                validate_check(values, record["values"], record["mode"])
+                for values in merged.values()
+            )
+        ):
+            # Make sure that the nameservers not queried in this round still have the expected values
+            merged = lookup(self.resolver, record["name"])
+            self.converged[index] = {
+                nameserver: values
+                for nameserver, values in merged.items()
+                if validate_check(values, record["values"], record["mode"])
+            }
+        return merged
+
+    def _check_record(
+        self, index: int, unchanged_nameservers: set[str] | None = None
+    ) -> bool:
+        record = self.records[index]
+        result = self.results[index]
+        txts = self._lookup_record(index, unchanged_nameservers)
+        result["values"] = txts
+        result["entries"] = txts
+        result["check_count"] += 1
+        if txts and all(
+            validate_check(txt, record["values"], record["mode"])
+            for txt in txts.values()
+        ):
+            result["done"] = True
+            with self._lock:
+                self.finished_checks += 1
+            return True
+        return False
+
+    def _get_zone(self, index: int) -> str | None:
+        name = self.records[index]["name"]
+        if self.resolver.cname_cache.get(str(dns.name.from_unicode(name))) is not None:
+            # The TXT records are looked up in the zone of the CNAME's target
+            return None
+        return self.resolver.get_zone(name)
+
+    def _get_serials(self, zone: str) -> dict[str, int | None]:
+        rrsets = self.resolver.resolve(zone, rdtype=dns.rdatatype.SOA)
+        return {
+            nameserver: rrset[0].serial if rrset else None
+            for nameserver, rrset in rrsets.items()
+        }
+
+    def _get_unchanged_nameservers(
+        self, pending: list[int]
+    ) -> dict[int, set[str] | None]:
+        """
+        For every record in ``pending``, determine the nameservers whose SOA serial
+        did not change since the last round.
+        """
+        zones = run_concurrently(
+            [functools.partial(self._get_zone, index) for index in pending],
+            max_concurrency=self.max_concurrency,
+        )
+        zone_names = sorted({zone for zone in zones if zone is not None})
+        zone_serials = run_concurrently(
+            [functools.partial(self._get_serials, zone) for zone in zone_names],
+            max_concurrency=self.max_concurrency,
+        )
+        serials = {zone: zone_serials[i] for i, zone in enumerate(zone_names)}
+        result: dict[int, set[str] | None] = {}
+        for i, index in enumerate(pending):
+            zone = zones[i]
+            if zone is None:
+                result[index] = None
+            elif self.serial_skip_rounds[index] >= self.serial_recheck_rounds:
+                result[index] = set()
+            else:
+                previous = self.serials.get(zone, {})
+                result[index] = {
+                    nameserver
+                    for nameserver, serial in serials[zone].items()
+                    if serial is not None and previous.get(nameserver) == serial
+                }
+        self.serials.update(serials)
+        return result
+
+    def _check_records(self) -> bool:
+        # The records are checked at the same time, so that the duration of a round
+        # does not grow with the number of records
+        pending = [
+            index for index, result in enumerate(self.results) if not result["done"]
+        ]
+        unchanged_nameservers: dict[int, set[str] | None] = {}
+        if self.check_serial:
+            unchanged_nameservers = self._get_unchanged_nameservers(pending)
+        return all(
+            run_concurrently(
+                [
+                    functools.partial(
+                        self._check_record, index, unchanged_nameservers.get(index)
+                    )
+                    for index in pending
+                ],
+                max_concurrency=self.max_concurrency,
+            )
+        )
 
     def _run(self) -> None:
         start_time = monotonic()
@@ -296,26 +609,24 @@ class Waiter:
         step = 0
         while True:
             has_timeout = False
+            # The DNS queries of a round must not take longer than the time remaining.
+            # After the timeout expired, one last round is done; it may take one query timeout.
+            round_time_limit = None
             if self.timeout is not None:
                 expired = monotonic() - start_time
                 has_timeout = expired > self.timeout
+                round_time_limit = (
+                    self.query_timeout if has_timeout else self.timeout - expired
+                )
 
-            done = True
-            for index, record in enumerate(self.records):
-                if self.results[index]["done"]:
-                    continue
-                txts = lookup(self.resolver, record["name"])
-                self.results[index]["values"] = txts
-                self.results[index]["entries"] = txts
-                self.results[index]["check_count"] += 1
-                if txts and all(
-                    validate_check(txt, record["values"], record["mode"])
-                    for txt in txts.values()
-                ):
-                    self.results[index]["done"] = True
-                    self.finished_checks += 1
-                else:
-                    done = False
+            try:
+                with self.resolver.retry_policy.limit_time(round_time_limit):
+                    done = self._check_records()
+            except dns.exception.Timeout:
+                if self.timeout is None or monotonic() - start_time <= self.timeout:
+                    raise
+                done = False
+                has_timeout = True
 
             if done:
                 self.module.exit_json(
@@ -335,21 +646,43 @@ class Waiter:
                 expired = monotonic() - start_time
                 wait = max(min(wait, self.timeout - expired + 0.1), 0.1)
 
-            time.sleep(wait)
+            self._sleep(wait)
             step += 1
 
+    def _sleep(self, wait: float) -> None:
+        if self.notify_listener is None:
+            time.sleep(wait)
+            return
+        names = [result["name"] for result in self.results if not result["done"]]
+        self.notify_listener.wait(names, wait)
+
     def _generate_additional_results(self) -> dict[str, t.Any]:
         return {
             "records": self.results,
             "completed": self.finished_checks,
+            "nameserver_statistics": self.resolver.get_nameserver_statistics(),
         }
 
     def run(self) -> None:
-        guarded_run(
-            self._run,
-            self.module,
-            generate_additional_results=self._generate_additional_results,
-        )
+        notify_listen = self.module.params["notify_listen"]
+        if notify_listen is not None:
+            try:
+                self.notify_listener = NotifyListener(
+                    notify_listen["address"], notify_listen["port"]
+                )
+            except (OSError, ValueError) as exc:
+                self.module.fail_json(
+                    msg=f"Cannot listen for NOTIFY messages on {notify_listen['address']} port {notify_listen['port']}: {exc}"
+                )
+        try:
+            guarded_run(
+                self._run,
+                self.module,
+                generate_additional_results=self._generate_additional_results,
+            )
+        finally:
+            if self.notify_listener is not None:
+                self.notify_listener.close()
 
 
 def main() -> None:
@@ -387,11 +720,43 @@ def main() -> None:
             "always_ask_default_resolver": {"type": "bool", "default": True},
             "servfail_retries": {"type": "int", "default": 0},
             "server": {"type": "list", "elements": "str"},
+            "cache_path": {"type": "path"},
+            "address_family": {
+                "type": "str",
+                "default": "auto",
+                "choices": ["auto", "ipv4", "ipv6", "both"],
+            },
+            "concurrency_backend": {
+                "type": "str",
+                "default": "threads",
+                "choices": ["threads", "asyncio"],
+            },
+            "hedge_queries": {"type": "bool", "default": False},
+            "converged_nameservers": {
+                "type": "str",
+                "default": "recheck",
+                "choices": ["recheck", "skip", "confirm"],
+            },
+            "check_serial": {"type": "bool", "default": False},
+            "serial_recheck_rounds": {"type": "int", "default": 5},
+            "notify_listen": {
+                "type": "dict",
+                "options": {
+                    "address": {"required": True, "type": "str"},
+                    "port": {"type": "int", "default": 53},
+                },
+            },
+            "max_concurrency": {"type": "int", "default": 1},
         },
         supports_check_mode=True,
     )
     assert_requirements_present(module)
 
+    if module.params["max_concurrency"] < 1:
+        module.fail_json(msg="max_concurrency must be at least 1")
+    if module.params["serial_recheck_rounds"] < 1:
+        module.fail_json(msg="serial_recheck_rounds must be at least 1")
+
     waiter = Waiter(module)
     waiter.run()
 
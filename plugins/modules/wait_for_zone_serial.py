@@ -0,0 +1,498 @@
+#!/usr/bin/python
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+DOCUMENTATION = r"""
+module: wait_for_zone_serial
+short_description: Wait for a zone serial to be available on all authoritative nameservers
+version_added: 4.2.0
+description:
+  - Wait until B(all) authoritative nameservers of DNS zones return a SOA record whose serial is at least a given serial.
+  - Since every change of a zone increases its serial, this can be used to wait for many changes to a zone at once, by
+    querying a single record per nameserver.
+extends_documentation_fragment:
+  - community.dns._attributes
+  - community.dns._attributes.idempotent_not_modify_state
+attributes:
+  check_mode:
+    support: full
+    details:
+      - This action does not modify state.
+  diff_mode:
+    support: N/A
+    details:
+      - This action does not modify state.
+author:
+  - Felix Fontein (@felixfontein)
+options:
+  zones:
+    description:
+      - A list of DNS zones to wait for.
+    required: true
+    type: list
+    elements: dict
+    suboptions:
+      name:
+        description:
+          - The name of the zone, like V(example.com). This must be the name of the zone itself, not of a DNS name in the
+            zone. The module fails if it is not.
+        type: str
+        required: true
+      serial:
+        description:
+          - The serial that all nameservers must have reached.
+          - Serials are compared with serial number arithmetic (RFC 1982), so serials that wrapped around are handled
+            correctly.
+          - If not specified, the highest serial returned by one of the nameservers in the first round is used. This
+            waits until all nameservers caught up with the most recent one.
+        type: int
+  query_retry:
+    description:
+      - Number of retries for DNS query timeouts.
+    type: int
+    default: 3
+  query_timeout:
+    description:
+      - Timeout per DNS query in seconds.
+    type: float
+    default: 10
+  timeout:
+    description:
+      - Global timeout for waiting for all zones in seconds.
+      - If not set, will wait indefinitely.
+      - The timeouts of DNS queries are shortened so that they do not exceed this timeout. After the timeout expired, one
+        last check is made whose DNS queries are limited by O(query_timeout).
+    type: float
+  max_sleep:
+    description:
+      - Maximal amount of seconds to sleep between two rounds of probing the SOA records.
+    type: float
+    default: 10
+  always_ask_default_resolver:
+    description:
+      - When set to V(true) (default), will use the default resolver to find the authoritative nameservers of a subzone. See
+        O(server) for how to configure the default resolver.
+      - When set to V(false), will use the authoritative nameservers of the parent zone to find the authoritative nameservers
+        of a subzone. This only makes sense when the nameservers were recently changed and have not yet propagated.
+    type: bool
+    default: true
+  servfail_retries:
+    description:
+      - How often to retry on SERVFAIL errors.
+    type: int
+    default: 0
+  server:
+    description:
+      - The DNS server(s) to use to look up the result. Must be a list of one or more IP addresses.
+      - By default, the system's standard resolver is used.
+    type: list
+    elements: str
+  max_concurrency:
+    description:
+      - Maximal number of DNS queries to send at the same time.
+      - This is used to check the zones of O(zones) at the same time, to query all authoritative nameservers of a zone at the
+        same time, and to resolve the names of these nameservers to IPv4 and IPv6 addresses in parallel.
+      - The default V(1) sends all queries one after another.
+    type: int
+    default: 1
+  cache_path:
+    description:
+      - Path to a SQLite database in which the nameservers of zones, the addresses of these nameservers, and CNAMEs are cached
+        across module invocations.
+      - The database is created if it does not exist. It can be shared by tasks running at the same time.
+      - Cache entries expire according to the TTLs of the DNS records, but at the latest after one hour.
+      - If not specified, this information is only cached during a single module invocation.
+    type: path
+  address_family:
+    description:
+      - Which IP address families to use for querying nameservers.
+      - V(auto) checks which address families this host can reach. Addresses of other families are only used after all
+        addresses of reachable families have been tried.
+      - V(ipv4) only uses IPv4 addresses, and V(ipv6) only uses IPv6 addresses. Nameservers without addresses of that
+        family are not queried.
+      - V(both) uses IPv4 and IPv6 addresses without checking whether they can be reached.
+    type: str
+    choices:
+      - auto
+      - ipv4
+      - ipv6
+      - both
+    default: auto
+  concurrency_backend:
+    description:
+      - How to send DNS queries at the same time when O(max_concurrency) is larger than V(1).
+      - V(threads) sends every query from its own thread.
+      - V(asyncio) sends the queries from a single thread with an C(asyncio) event loop, which needs fewer resources
+        when many queries are sent at the same time.
+    type: str
+    choices:
+      - threads
+      - asyncio
+    default: threads
+requirements:
+  - dnspython >= 2.0.0
+seealso:
+  - module: community.dns.wait_for_txt
+"""
+
+EXAMPLES = r"""
+- name: Wait for all nameservers of example.com to serve a serial of at least 2024010101
+  community.dns.wait_for_zone_serial:
+    zones:
+      - name: example.com
+        serial: 2024010101
+    timeout: 600
+
+- name: Wait for all nameservers of two zones to catch up with the most recent nameserver
+  community.dns.wait_for_zone_serial:
+    zones:
+      - name: example.com
+      - name: example.org
+    max_concurrency: 8
+    timeout: 600
+"""
+
+RETURN = r"""
+zones:
+  description:
+    - Results on the zones queried.
+    - The entries are in a 1:1 correspondence to the entries of the O(zones) parameter, in exactly the same order.
+  returned: always
+  type: list
+  elements: dict
+  contains:
+    name:
+      description:
+        - The zone this check is for.
+      returned: always
+      type: str
+      sample: example.com
+    done:
+      description:
+        - Whether all nameservers of the zone reached the serial.
+      returned: always
+      type: bool
+      sample: false
+    serial:
+      description:
+        - The serial that is waited for.
+        - This is V(null) if O(zones[].serial) was not specified and no nameserver returned a serial yet.
+      returned: always
+      type: int
+      sample: 2024010101
+    serials:
+      description:
+        - For every authoritative nameserver of the zone, the serial retrieved during the last lookup made.
+        - The serial is V(null) if the nameserver did not return a SOA record for the zone.
+        - Once the check completed, the serials of this zone are no longer checked.
+      returned: lookup was done at least once
+      type: dict
+      sample:
+        ns1.example.com: 2024010101
+        ns2.example.com: 2023123101
+    check_count:
+      description:
+        - How often the serials of this zone were checked.
+      returned: always
+      type: int
+      sample: 3
+  sample:
+    - name: example.com
+      done: true
+      serial: 2024010101
+      serials:
+        ns1.example.com: 2024010101
+        ns2.example.com: 2024010102
+      check_count: 2
+completed:
+  description:
+    - How many of the checks were completed.
+  returned: always
+  type: int
+  sample: 1
+nameserver_statistics:
+  description:
+    - Statistics on the nameserver addresses that have been queried directly, indexed by address.
+    - For every address, V(queries) is the number of queries sent to it, V(timeouts) the number of these queries that timed
+      out, V(consecutive_failures) the number of timeouts since its last answer, and V(srtt) its smoothed round-trip time
+      in seconds (V(null) if unknown).
+    - An address that did not answer three queries in a row is not queried for 30 seconds. During that time, V(state) is
+      V(open). After that, V(state) is V(half-open) and a single query is sent to check whether it answers again. Otherwise,
+      V(state) is V(closed).
+  returned: always
+  type: dict
+  sample:
+    192.0.2.1:
+      queries: 12
+      timeouts: 0
+      consecutive_failures: 0
+      srtt: 0.0213
+      state: closed
+"""
+
+import functools
+import threading
+import time
+import typing as t
+from time import monotonic
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ansible_collections.community.dns.plugins.module_utils._resolver import (
+    ResolveDirectlyFromNameServers,
+    assert_requirements_present,
+    guarded_run,
+    run_concurrently,
+)
+from ansible_collections.community.dns.plugins.module_utils._resolver_cache import (
+    open_persistent_cache,
+)
+
+try:
+    import dns.exception
+    import dns.name
+    import dns.rdatatype
+except ImportError:
+    pass  # handled in assert_requirements_present()
+
+
+def lookup_serials(
+    resolver: ResolveDirectlyFromNameServers, zone: str
+) -> dict[str, int | None]:
+    result = {}
+    rrsets = resolver.resolve(zone, rdtype=dns.rdatatype.SOA)
+    for key, rrset in rrsets.items():
+        result[key] = rrset[0].serial if rrset else None
+    return result
+
+
+def serial_reached(serial: int, expected_serial: int) -> bool:
+    # Serial number arithmetic (RFC 1982, section 3.2)
+    return serial == expected_serial or 0 < (serial - expected_serial) % 2**32 < 2**31
+
+
+class Waiter:
+    def __init__(self, module: AnsibleModule) -> None:
+        self.module = module
+
+        self.resolver = ResolveDirectlyFromNameServers(
+            timeout=self.module.params["query_timeout"],
+            timeout_retries=self.module.params["query_retry"],
+            servfail_retries=self.module.params["servfail_retries"],
+            always_ask_default_resolver=self.module.params[
+                "always_ask_default_resolver"
+            ],
+            server_addresses=self.module.params["server"],
+            persistent_cache=open_persistent_cache(
+                self.module, self.module.params["cache_path"]
+            ),
+            max_concurrency=self.module.params["max_concurrency"],
+            address_family=self.module.params["address_family"],
+            backend=self.module.params["concurrency_backend"],
+        )
+        self.zones: list[dict[str, t.Any]] = self.module.params["zones"]
+        self.timeout: float | None = self.module.params["timeout"]
+        self.query_timeout: float = self.module.params["query_timeout"]
+        self.max_sleep: float = self.module.params["max_sleep"]
+        self.max_concurrency: int = self.module.params["max_concurrency"]
+
+        self.results = [
+            {
+                "name": zone["name"],
+                "done": False,
+                "serial": zone["serial"],
+                "check_count": 0,
+            }
+            for zone in self.zones
+        ]
+        self.finished_checks = 0
+        self._lock = threading.Lock()
+
+    def _check_zone(self, index: int) -> bool:
+        result = self.results[index]
+        serials = lookup_serials(self.resolver, result["name"])
+        result["serials"] = serials
+        result["check_count"] += 1
+        if result["serial"] is None:
+            known_serials = [
+                serial for serial in serials.values() if serial is not None
+            ]
+            if not known_serials:
+                return False
+            # Find the most recent serial
+            expected_serial = known_serials[0]
+            for serial in known_serials[1:]:
+                if serial_reached(serial, expected_serial):
+                    expected_serial = serial
+            result["serial"] = expected_serial
+        if serials and all(
+            serial is not None and serial_reached(serial, result["serial"])
+            for serial in serials.values()
+        ):
+            result["done"] = True
+            with self._lock:
+                self.finished_checks += 1
+            return True
+        return False
+
+    def _check_apex(self, index: int) -> str | None:
+        """
+        Return an error message if the name of a zone is not the apex of a zone.
+        """
+        name = self.results[index]["name"]
+        zone = self.resolver.get_zone(name)
+        if zone is not None and dns.name.from_unicode(zone) != dns.name.from_unicode(
+            name
+        ):
+            return f"{name} is not the name of a zone, but part of the zone {zone}"
+        return None
+
+    def _check_zones(self) -> bool:
+        pending = [
+            index for index, result in enumerate(self.results) if not result["done"]
+        ]
+        return all(
+            run_concurrently(
+                [functools.partial(self._check_zone, index) for index in pending],
+                max_concurrency=self.max_concurrency,
+            )
+        )
+
+    def _run(self) -> None:
+        start_time = monotonic()
+
+        # Otherwise the SOA queries return no serial, and the module waits until the timeout.
+        # Like the last round, this check may take one query timeout if the timeout is shorter.
+        try:
+            with self.resolver.retry_policy.limit_time(
+                None if self.timeout is None else max(self.timeout, self.query_timeout)
+            ):
+                errors = run_concurrently(
+                    [
+                        functools.partial(self._check_apex, index)
+                        for index in range(len(self.results))
+                    ],
+                    max_concurrency=self.max_concurrency,
+                )
+        except dns.exception.Timeout:
+            if self.timeout is None or monotonic() - start_time <= self.timeout:
+                raise
+            self._fail_timeout()
+        for error in errors:
+            if error is not None:
+                self.module.fail_json(msg=error, **self._generate_additional_results())
+
+        step = 0
+        while True:
+            has_timeout = False
+            # The DNS queries of a round must not take longer than the time remaining.
+            # After the timeout expired, one last round is done; it may take one query timeout.
+            round_time_limit = None
+            if self.timeout is not None:
+                expired = monotonic() - start_time
+                has_timeout = expired > self.timeout
+                round_time_limit = (
+                    self.query_timeout if has_timeout else self.timeout - expired
+                )
+
+            try:
+                with self.resolver.retry_policy.limit_time(round_time_limit):
+                    done = self._check_zones()
+            except dns.exception.Timeout:
+                if self.timeout is None or monotonic() - start_time <= self.timeout:
+                    raise
+                done = False
+                has_timeout = True
+
+            if done:
+                self.module.exit_json(
+                    msg="All checks passed", **self._generate_additional_results()
+                )
+
+            if has_timeout:
+                self._fail_timeout()
+
+            # Simple quadratic sleep with maximum wait of max_sleep seconds
+            wait = min(2 + step * 0.5, self.max_sleep)
+            if self.timeout is not None:
+                # Make sure we do not exceed the timeout by much by waiting
+                expired = monotonic() - start_time
+                wait = max(min(wait, self.timeout - expired + 0.1), 0.1)
+
+            time.sleep(wait)
+            step += 1
+
+    def _fail_timeout(self) -> t.NoReturn:
+        self.module.fail_json(
+            msg=f"Timeout ({self.finished_checks} out of {len(self.zones)} check(s) passed).",
+            **self._generate_additional_results(),
+        )
+
+    def _generate_additional_results(self) -> dict[str, t.Any]:
+        return {
+            "zones": self.results,
+            "completed": self.finished_checks,
+            "nameserver_statistics": self.resolver.get_nameserver_statistics(),
+        }
+
+    def run(self) -> None:
+        guarded_run(
+            self._run,
+            self.module,
+            generate_additional_results=self._generate_additional_results,
+        )
+
+
+def main() -> None:
+    module = AnsibleModule(
+        argument_spec={
+            "zones": {
+                "required": True,
+                "type": "list",
+                "elements": "dict",
+                "options": {
+                    "name": {"required": True, "type": "str"},
+                    "serial": {"type": "int"},
+                },
+            },
+            "query_retry": {"type": "int", "default": 3},
+            "query_timeout": {"type": "float", "default": 10},
+            "timeout": {"type": "float"},
+            "max_sleep": {"type": "float", "default": 10},
+            "always_ask_default_resolver": {"type": "bool", "default": True},
+            "servfail_retries": {"type": "int", "default": 0},
+            "server": {"type": "list", "elements": "str"},
+            "max_concurrency": {"type": "int", "default": 1},
+            "cache_path": {"type": "path"},
+            "address_family": {
+                "type": "str",
+                "default": "auto",
+                "choices": ["auto", "ipv4", "ipv6", "both"],
+            },
+            "concurrency_backend": {
+                "type": "str",
+                "default": "threads",
+                "choices": ["threads", "asyncio"],
+            },
+        },
+        supports_check_mode=True,
+    )
+    assert_requirements_present(module)
+
+    if module.params["max_concurrency"] < 1:
+        module.fail_json(msg="max_concurrency must be at least 1")
+    for zone in module.params["zones"]:
+        if zone["serial"] is not None and not 0 <= zone["serial"] < 2**32:
+            module.fail_json(
+                msg=f"The serial of zone {zone['name']} must be between 0 and 4294967295"
+            )
+
+    waiter = Waiter(module)
+    waiter.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,11 @@ from ansible.module_utils.common.text.converters import to_native
 
 from ansible_collections.community.dns.plugins.module_utils._resolver import (
     ResolverError,
+    ResolverPool,
+    create_negative_cache,
+)
+from ansible_collections.community.dns.plugins.module_utils._resolver_cache import (
+    TTLCache,
 )
 
 DNSPYTHON_IMPORTERROR: ImportError | None
@@ -38,6 +43,24 @@ if t.TYPE_CHECKING:  # pragma: no cover
     _T = t.TypeVar("_T")
 
 
+# Negative answers (NXDOMAIN and NODATA) and configured resolvers with their answer caches
+# are shared by all lookups running in this process; use get_caches() to access them
+NEGATIVE_CACHE = create_negative_cache()
+RESOLVER_POOL = ResolverPool()
+
+
+def get_caches(cache_size: int) -> tuple[TTLCache | None, ResolverPool | None]:
+    """
+    Return the negative cache and the resolver pool for lookups with the given ``cache_size``.
+
+    Both are shared by all lookups of this process. If ``cache_size`` is not positive,
+    caching is disabled, and neither of them is used, so that every lookup sends its queries.
+    """
+    if cache_size <= 0:
+        return None, None
+    return NEGATIVE_CACHE, RESOLVER_POOL
+
+
 def guarded_run(
     runner: Callable[[], _T],
     error_class: type[Exception] = AnsibleError,
@@ -4,6 +4,8 @@
 
 from __future__ import annotations
 
+import threading
+
 import pytest
 from ansible.errors import AnsibleLookupError
 from ansible.plugins.loader import lookup_loader
@@ -19,6 +21,10 @@ from ansible_collections.community.dns.plugins.module_utils._dnspython_records i
     NAME_TO_RDTYPE,
     NAME_TO_REQUIRED_VERSION,
 )
+from ansible_collections.community.dns.plugins.plugin_utils._resolver import (
+    NEGATIVE_CACHE,
+    RESOLVER_POOL,
+)
 
 from ..module_utils.resolver_helper import (
     create_mock_answer,
@@ -312,6 +318,91 @@ class TestLookup(TestCase):
         print(exc.value.args[0])
         assert exc.value.args[0] == "Got NXDOMAIN when querying www.example.com"
 
+    def test_negative_cache(self) -> None:
+        soa = dns.rrset.from_rdata(
+            "example.com",
+            3600,
+            dns.rdata.from_text(
+                dns.rdataclass.IN,
+                dns.rdatatype.SOA,
+                "ns.example.com. hostmaster.example.com. 1 7200 120 2419200 300",
+            ),
+        )
+        resolver = mock_resolver(
+            ["1.1.1.1"],
+            {
+                ("1.1.1.1",): [
+                    {
+                        "target": dns.name.from_unicode("www.example.com", origin=None),
+                        "search": True,
+                        "rdtype": dns.rdatatype.A,
+                        "lifetime": 10,
+                        "result": create_mock_answer(
+                            rcode=dns.rcode.NXDOMAIN, authority=[soa]
+                        ),
+                    },
+                ],
+            },
+        )
+        NEGATIVE_CACHE.clear()
+        try:
+            with patch("dns.resolver.get_default_resolver", resolver):
+                with patch("dns.resolver.Resolver", resolver):
+                    with patch("dns.query.udp", mock_query_udp([])):
+                        # The second lookup uses the cached NXDOMAIN answer
+                        for dummy in range(2):
+                            result = self.lookup.run(
+                                ["www.example.com"],
+                                nxdomain_handling="message",
+                                cache_size=1000,
+                            )
+                            assert result == ["NXDOMAIN"]
+        finally:
+            NEGATIVE_CACHE.clear()
+            RESOLVER_POOL.clear()
+
+    def test_no_cache(self) -> None:
+        soa = dns.rrset.from_rdata(
+            "example.com",
+            3600,
+            dns.rdata.from_text(
+                dns.rdataclass.IN,
+                dns.rdatatype.SOA,
+                "ns.example.com. hostmaster.example.com. 1 7200 120 2419200 300",
+            ),
+        )
+        resolver = mock_resolver(
+            ["1.1.1.1"],
+            {
+                ("1.1.1.1",): [
+                    {
+                        "target": dns.name.from_unicode("www.example.com", origin=None),
+                        "search": True,
+                        "rdtype": dns.rdatatype.A,
+                        "lifetime": 10,
+                        "result": create_mock_answer(
+                            rcode=dns.rcode.NXDOMAIN, authority=[soa]
+                        ),
+                    },
+                ]
+                * 3,
+            },
+        )
+        NEGATIVE_CACHE.clear()
+        try:
+            with patch("dns.resolver.get_default_resolver", resolver):
+                with patch("dns.resolver.Resolver", resolver):
+                    with patch("dns.query.udp", mock_query_udp([])):
+                        # Caching is disabled by default, so every lookup sends a query
+                        for dummy in range(3):
+                            result = self.lookup.run(
+                                ["www.example.com"], nxdomain_handling="message"
+                            )
+                            assert result == ["NXDOMAIN"]
+            assert len(NEGATIVE_CACHE) == 0
+        finally:
+            NEGATIVE_CACHE.clear()
+
     def test_simple_servfail(self) -> None:
         resolver = mock_resolver(
             ["1.1.1.1"],
@@ -853,3 +944,88 @@ class TestLookup(TestCase):
             exc.value.args[0]
             == "Your dnspython version does not support A records. You need version 1.2.3 or newer."
         )
+
+    @staticmethod
+    def _create_concurrent_resolver(answers, barrier):
+        """
+        Create a mock for the default resolver that answers A queries from ``answers``,
+        in any order, and only once ``barrier`` is passed.
+        """
+
+        def create_resolver(configure=True):
+            mock = MagicMock()
+            mock.nameservers = ["1.1.1.1"]
+
+            def resolve(target, rdtype=None, lifetime=None, search=None):
+                barrier.wait()
+                address = answers[str(target)]
+                if address is None:
+                    return create_mock_answer(rcode=dns.rcode.NXDOMAIN)
+                return create_mock_answer(
+                    dns.rrset.from_rdata(
+                        str(target),
+                        300,
+                        dns.rdata.from_text(dns.rdataclass.IN, rdtype, address),
+                    )
+                )
+
+            mock.resolve = MagicMock(side_effect=resolve)
+            return mock
+
+        return create_resolver
+
+    def test_max_concurrency(self) -> None:
+        answers = {
+            "a.example.com": "1.1.1.1",
+            "b.example.com": "2.2.2.2",
+            "c.example.com": "3.3.3.3",
+        }
+        # All three queries must be sent at the same time, otherwise the barrier breaks
+        resolver = self._create_concurrent_resolver(
+            answers, threading.Barrier(3, timeout=10)
+        )
+        with patch("dns.resolver.get_default_resolver", resolver):
+            with patch("dns.resolver.Resolver", resolver):
+                with patch("dns.query.udp", mock_query_udp([])):
+                    result = self.lookup.run(
+                        ["a.example.com", "b.example.com", "c.example.com"],
+                        max_concurrency=3,
+                    )
+
+        print(result)
+        assert result == ["1.1.1.1", "2.2.2.2", "3.3.3.3"]
+
+    def test_max_concurrency_nxdomain(self) -> None:
+        answers = {
+            "a.example.com": "1.1.1.1",
+            "b.example.com": None,
+        }
+        resolver = self._create_concurrent_resolver(
+            answers, threading.Barrier(2, timeout=10)
+        )
+        with patch("dns.resolver.get_default_resolver", resolver):
+            with patch("dns.resolver.Resolver", resolver):
+                with patch("dns.query.udp", mock_query_udp([])):
+                    result = self.lookup.run(
+                        ["b.example.com", "a.example.com"],
+                        max_concurrency=2,
+                        nxdomain_handling="message",
+                    )
+                    assert result == ["NXDOMAIN", "1.1.1.1"]
+
+                    with pytest.raises(AnsibleLookupError) as exc:
+                        self.lookup.run(
+                            ["a.example.com", "b.example.com"],
+                            max_concurrency=2,
+                            nxdomain_handling="fail",
+                        )
+
+        print(exc.value.args[0])
+        assert exc.value.args[0] == "Got NXDOMAIN when querying b.example.com"
+
+    def test_invalid_max_concurrency(self) -> None:
+        with pytest.raises(AnsibleLookupError) as exc:
+            self.lookup.run(["www.example.com"], max_concurrency=0)
+
+        print(exc.value.args[0])
+        assert exc.value.args[0] == "max_concurrency must be at least 1"
@@ -15,6 +15,7 @@ from ansible_collections.community.internal_test_tools.tests.unit.compat.unittes
     TestCase,
 )
 
+
 from ..module_utils.resolver_helper import (
     create_mock_answer,
     mock_query_udp,
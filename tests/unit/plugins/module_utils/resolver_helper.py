@@ -88,10 +88,12 @@ def create_mock_response(rcode, authority=None, answer=None):
     return response
 
 
-def create_mock_answer(rrset=None, rcode=None):
+def create_mock_answer(rrset=None, rcode=None, authority=None):
     answer = MagicMock()
     answer.response = create_mock_response(
-        dns.rcode.NOERROR if rcode is None else rcode, answer=[rrset] if rrset else None
+        dns.rcode.NOERROR if rcode is None else rcode,
+        answer=[rrset] if rrset else None,
+        authority=authority,
     )
     answer.rrset = rrset
     return answer
@@ -0,0 +1,96 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import (
+    MagicMock,
+)
+
+from ansible_collections.community.dns.plugins.module_utils._output_file import (
+    JSONLinesWriter,
+    open_output_file,
+)
+
+
+def test_json_lines_writer(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    writer = JSONLinesWriter(path)
+    writer.write({"name": "www.example.com", "nameservers": ["ns.example.com"]})
+    # Every line is written right away
+    with open(path, encoding="utf-8") as f:
+        assert f.read().count("\n") == 1
+    writer.write({"name": "www.example.org"}, error="Unexpected DNS error: foo")
+    writer.close()
+
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [
+        {"name": "www.example.com", "nameservers": ["ns.example.com"]},
+        {"name": "www.example.org", "error": "Unexpected DNS error: foo"},
+    ]
+    assert writer.get_summary() == {
+        "path": path,
+        "total": 2,
+        "succeeded": 1,
+        "failed": 1,
+        "failed_names": ["www.example.org"],
+    }
+
+
+def test_json_lines_writer_failed_names(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    writer = JSONLinesWriter(path)
+    for index in range(150):
+        writer.write({"name": f"{index}.example.com"}, error="foo")
+    writer.close()
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read().count("\n") == 150
+    summary = writer.get_summary()
+    assert summary["failed"] == 150
+    assert summary["succeeded"] == 0
+    # Only the first names whose lookup failed are kept
+    assert summary["failed_names"] == [f"{index}.example.com" for index in range(100)]
+
+
+def test_json_lines_writer_dry_run(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    writer = JSONLinesWriter(path, dry_run=True)
+    writer.write({"name": "www.example.com"})
+    writer.write({"name": "www.example.org"}, error="foo")
+    writer.close()
+
+    assert not (tmp_path / "results.jsonl").exists()
+    assert writer.get_summary() == {
+        "path": path,
+        "total": 2,
+        "succeeded": 1,
+        "failed": 1,
+        "failed_names": ["www.example.org"],
+    }
+
+
+def test_open_output_file(tmp_path):
+    module = MagicMock()
+    module.check_mode = False
+    assert open_output_file(module, None) is None
+
+    # In check mode, the file is not created
+    module.check_mode = True
+    path = str(tmp_path / "results.jsonl")
+    open_output_file(module, path).close()
+    assert not (tmp_path / "results.jsonl").exists()
+    module.check_mode = False
+
+    module.fail_json.side_effect = Exception("fail_json")
+    path = str(tmp_path / "does-not-exist" / "results.jsonl")
+    with pytest.raises(Exception, match="fail_json"):
+        open_output_file(module, path)
+    assert module.fail_json.call_args[1]["msg"].startswith(
+        f"Cannot open output file {path}: "
+    )
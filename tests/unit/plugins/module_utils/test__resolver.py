@@ -4,6 +4,12 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import socket
+import threading
+import time
+
 import pytest
 from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import (
     MagicMock,
@@ -12,9 +18,19 @@ from ansible_collections.community.internal_test_tools.tests.unit.compat.mock im
 
 from ansible_collections.community.dns.plugins.module_utils import _resolver as resolver
 from ansible_collections.community.dns.plugins.module_utils._resolver import (
+    NotifyListener,
     ResolveDirectlyFromNameServers,
     ResolverError,
+    SimpleResolver,
+    TransportPool,
     assert_requirements_present,
+    is_address_family_reachable,
+    run_concurrently,
+    run_coroutines,
+    select_addresses,
+)
+from ansible_collections.community.dns.plugins.module_utils._resolver_cache import (
+    PersistentCache,
 )
 
 from .resolver_helper import (
@@ -117,18 +133,20 @@ def test_lookup_ns_names():
                     always_ask_default_resolver=False
                 )
                 # Use default resolver
-                ns, cname = resolver_instance._lookup_ns_names(
+                ns, cname, ttl = resolver_instance._lookup_ns_names(
                     dns.name.from_unicode("example.com")
                 )
                 assert ns == ["ns.example.com.", "ns.example.org."]
                 assert cname is None
+                assert ttl == 3600
                 # Provide nameserver IPs
-                ns, cname = resolver_instance._lookup_ns_names(
+                ns, cname, ttl = resolver_instance._lookup_ns_names(
                     dns.name.from_unicode("example.com"),
                     nameserver_ips=["3.3.3.3", "1.1.1.1"],
                 )
                 assert ns == ["ns.example.com."]
                 assert cname == dns.name.from_unicode("foo.bar.")
+                assert ttl == 60
                 # Provide empty nameserver list
                 with pytest.raises(ResolverError) as exc:
                     resolver_instance._lookup_ns_names(
@@ -147,7 +165,7 @@ def test_resolver():
         {
             ("1.1.1.1",): [
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -161,7 +179,7 @@ def test_resolver():
                     ),
                 },
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -178,7 +196,7 @@ def test_resolver():
                     ),
                 },
                 {
-                    "target": "ns.example.org",
+                    "target": dns.name.from_unicode("ns.example.org"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -192,13 +210,13 @@ def test_resolver():
                     ),
                 },
                 {
-                    "target": "ns.example.org",
+                    "target": dns.name.from_unicode("ns.example.org"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "raise": dns.resolver.NoAnswer(response=fake_query),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -212,7 +230,7 @@ def test_resolver():
                     ),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -410,13 +428,13 @@ def test_timeout_handling():
         {
             ("1.1.1.1",): [
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "raise": dns.exception.Timeout(timeout=10),
                 },
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -430,31 +448,31 @@ def test_timeout_handling():
                     ),
                 },
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "raise": dns.exception.Timeout(timeout=10),
                 },
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "raise": dns.resolver.NoAnswer(response=fake_query),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "raise": dns.exception.Timeout(timeout=10),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "raise": dns.exception.Timeout(timeout=10),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -468,7 +486,7 @@ def test_timeout_handling():
                     ),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -715,7 +733,7 @@ def test_error_nxdomain_ok():
         {
             ("1.1.1.1",): [
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -729,7 +747,7 @@ def test_error_nxdomain_ok():
                     ),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -806,7 +824,7 @@ def test_error_nxdomain_fail():
         {
             ("1.1.1.1",): [
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -820,7 +838,7 @@ def test_error_nxdomain_fail():
                     ),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -1020,13 +1038,13 @@ def test_servfail_handling():
         {
             ("1.1.1.1",): [
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(rcode=dns.rcode.SERVFAIL),
                 },
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -1040,31 +1058,31 @@ def test_servfail_handling():
                     ),
                 },
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "result": create_mock_answer(rcode=dns.rcode.SERVFAIL),
                 },
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "raise": dns.resolver.NoAnswer(response=fake_query),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(rcode=dns.rcode.SERVFAIL),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(rcode=dns.rcode.SERVFAIL),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -1078,7 +1096,7 @@ def test_servfail_handling():
                     ),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -1156,13 +1174,13 @@ def test_servfail_failing():
         {
             ("1.1.1.1",): [
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(rcode=dns.rcode.SERVFAIL),
                 },
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -1176,31 +1194,31 @@ def test_servfail_failing():
                     ),
                 },
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "result": create_mock_answer(rcode=dns.rcode.SERVFAIL),
                 },
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "raise": dns.resolver.NoAnswer(response=fake_query),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(rcode=dns.rcode.SERVFAIL),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(rcode=dns.rcode.SERVFAIL),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -1214,19 +1232,19 @@ def test_servfail_failing():
                     ),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "result": create_mock_answer(rcode=dns.rcode.SERVFAIL),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "result": create_mock_answer(rcode=dns.rcode.SERVFAIL),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "result": create_mock_answer(rcode=dns.rcode.SERVFAIL),
@@ -1298,7 +1316,7 @@ def test_no_response():
         {
             ("1.1.1.1",): [
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -1315,13 +1333,13 @@ def test_no_response():
                     ),
                 },
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "raise": dns.resolver.NoAnswer(response=fake_query),
                 },
                 {
-                    "target": "ns2.example.com",
+                    "target": dns.name.from_unicode("ns2.example.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -1335,7 +1353,7 @@ def test_no_response():
                     ),
                 },
                 {
-                    "target": "ns2.example.com",
+                    "target": dns.name.from_unicode("ns2.example.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -1433,7 +1451,7 @@ def test_cname_loop():
         {
             ("1.1.1.1",): [
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "lifetime": 10,
                     "result": create_mock_answer(
                         dns.rrset.from_rdata(
@@ -1446,7 +1464,7 @@ def test_cname_loop():
                     ),
                 },
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "lifetime": 10,
                     "result": create_mock_answer(
                         dns.rrset.from_rdata(
@@ -1459,7 +1477,7 @@ def test_cname_loop():
                     ),
                 },
                 {
-                    "target": "ns.org",
+                    "target": dns.name.from_unicode("ns.org"),
                     "lifetime": 10,
                     "result": create_mock_answer(
                         dns.rrset.from_rdata(
@@ -1472,7 +1490,7 @@ def test_cname_loop():
                     ),
                 },
                 {
-                    "target": "ns.example.org",
+                    "target": dns.name.from_unicode("ns.example.org"),
                     "lifetime": 10,
                     "result": create_mock_answer(
                         dns.rrset.from_rdata(
@@ -1624,7 +1642,7 @@ def test_resolver_non_default():
         {
             ("1.1.1.1",): [
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -1638,13 +1656,13 @@ def test_resolver_non_default():
                     ),
                 },
                 {
-                    "target": "ns.com",
+                    "target": dns.name.from_unicode("ns.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "raise": dns.resolver.NoAnswer(response=fake_query),
                 },
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -1658,13 +1676,13 @@ def test_resolver_non_default():
                     ),
                 },
                 {
-                    "target": "ns.example.com",
+                    "target": dns.name.from_unicode("ns.example.com"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "raise": dns.resolver.NoAnswer(response=fake_query),
                 },
                 {
-                    "target": "ns.org",
+                    "target": dns.name.from_unicode("ns.org"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -1678,13 +1696,13 @@ def test_resolver_non_default():
                     ),
                 },
                 {
-                    "target": "ns.org",
+                    "target": dns.name.from_unicode("ns.org"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "raise": dns.resolver.NoAnswer(response=fake_query),
                 },
                 {
-                    "target": "ns.example.org",
+                    "target": dns.name.from_unicode("ns.example.org"),
                     "rdtype": dns.rdatatype.A,
                     "lifetime": 10,
                     "result": create_mock_answer(
@@ -1698,7 +1716,7 @@ def test_resolver_non_default():
                     ),
                 },
                 {
-                    "target": "ns.example.org",
+                    "target": dns.name.from_unicode("ns.example.org"),
                     "rdtype": dns.rdatatype.AAAA,
                     "lifetime": 10,
                     "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -1894,3 +1912,2041 @@ def test_resolver_non_default():
                 assert resolver_instance.resolve_nameservers(
                     "example.org", resolve_addresses=True
                 ) == ["3.3.3.3", "4.4.4.4"]
+
+
+def test_run_concurrently():
+    assert run_concurrently([]) == []
+    assert run_concurrently([lambda: 1, lambda: 2, lambda: 3]) == [1, 2, 3]
+    assert run_concurrently([lambda: 1, lambda: 2, lambda: 3], max_concurrency=2) == [
+        1,
+        2,
+        3,
+    ]
+
+    barrier = threading.Barrier(3, timeout=10)
+
+    def wait_for_others(value):
+        barrier.wait()
+        return value
+
+    assert run_concurrently(
+        [functools.partial(wait_for_others, value) for value in range(3)],
+        max_concurrency=3,
+    ) == [0, 1, 2]
+
+    def fail(message):
+        raise ResolverError(message)
+
+    with pytest.raises(ResolverError) as exc:
+        run_concurrently(
+            [lambda: 1, functools.partial(fail, "a"), functools.partial(fail, "b")],
+            max_concurrency=3,
+        )
+    assert exc.value.args[0] == "a"
+
+
+def test_resolve_concurrently():
+    fake_query = MagicMock()
+    fake_query.question = "Doctor Who?"
+    default_sequence = []
+    nameserver_sequences = {}
+    for index in range(1, 4):
+        address = f"3.3.3.{index}"
+        default_sequence.extend(
+            [
+                {
+                    "target": dns.name.from_unicode(f"ns{index}.example.com"),
+                    "rdtype": dns.rdatatype.A,
+                    "lifetime": 10,
+                    "result": create_mock_answer(
+                        dns.rrset.from_rdata(
+                            f"ns{index}.example.com",
+                            300,
+                            dns.rdata.from_text(
+                                dns.rdataclass.IN, dns.rdatatype.A, address
+                            ),
+                        )
+                    ),
+                },
+                {
+                    "target": dns.name.from_unicode(f"ns{index}.example.com"),
+                    "rdtype": dns.rdatatype.AAAA,
+                    "lifetime": 10,
+                    "raise": dns.resolver.NoAnswer(response=fake_query),
+                },
+            ]
+        )
+        nameserver_sequences[(address,)] = [
+            {
+                "target": dns.name.from_unicode("www.example.com"),
+                "lifetime": 10,
+                "rdtype": dns.rdatatype.TXT,
+                "result": create_mock_answer(
+                    dns.rrset.from_rdata(
+                        "www.example.com",
+                        300,
+                        dns.rdata.from_text(
+                            dns.rdataclass.IN, dns.rdatatype.TXT, f'"{index}"'
+                        ),
+                    )
+                ),
+            },
+        ]
+    mock_resolver_instance = mock_resolver(
+        ["1.1.1.1"], {("1.1.1.1",): default_sequence, **nameserver_sequences}
+    )
+    udp_sequence = [
+        {
+            "query_target": dns.name.from_unicode("com"),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "1.1.1.1",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(
+                dns.rcode.NOERROR,
+                authority=[
+                    dns.rrset.from_rdata(
+                        "com",
+                        3600,
+                        dns.rdata.from_text(
+                            dns.rdataclass.IN, dns.rdatatype.NS, "ns.com"
+                        ),
+                    )
+                ],
+            ),
+        },
+        {
+            "query_target": dns.name.from_unicode("example.com"),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "1.1.1.1",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(
+                dns.rcode.NOERROR,
+                authority=[
+                    dns.rrset.from_rdata(
+                        "example.com",
+                        3600,
+                        *[
+                            dns.rdata.from_text(
+                                dns.rdataclass.IN,
+                                dns.rdatatype.NS,
+                                f"ns{index}.example.com",
+                            )
+                            for index in range(1, 4)
+                        ],
+                    )
+                ],
+            ),
+        },
+        {
+            "query_target": dns.name.from_unicode("www.example.com"),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "1.1.1.1",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(dns.rcode.NOERROR),
+        },
+    ]
+
+    # All three nameservers must be queried at the same time, otherwise the barrier breaks
+    barrier = threading.Barrier(3, timeout=10)
+
+    def create_resolver(configure=True):
+        result = mock_resolver_instance(configure=configure)
+        original_resolve = result.resolve.side_effect
+
+        def resolve(*args, **kwargs):
+            barrier.wait()
+            return original_resolve(*args, **kwargs)
+
+        result.resolve.side_effect = resolve
+        return result
+
+    with patch("dns.resolver.get_default_resolver", mock_resolver_instance):
+        with patch("dns.resolver.Resolver", create_resolver):
+            with patch("dns.query.udp", mock_query_udp(udp_sequence)):
+                resolver_instance = ResolveDirectlyFromNameServers(max_concurrency=3)
+                assert resolver_instance.resolve_nameservers(
+                    "www.example.com", resolve_addresses=True
+                ) == ["3.3.3.1", "3.3.3.2", "3.3.3.3"]
+                rrset_dict = resolver_instance.resolve(
+                    "www.example.com", rdtype=dns.rdatatype.TXT
+                )
+                assert list(rrset_dict) == [
+                    "ns1.example.com",
+                    "ns2.example.com",
+                    "ns3.example.com",
+                ]
+                for index in range(1, 4):
+                    rrset = rrset_dict[f"ns{index}.example.com"]
+                    assert rrset[0].to_text() == f'"{index}"'
+
+
+def test_resolve_exclude_nameservers():
+    fake_query = MagicMock()
+    fake_query.question = "Doctor Who?"
+    default_sequence = []
+    nameserver_sequences = {}
+    # The addresses of ns2.example.com are never looked up, and it is never queried
+    for index in (1, 3):
+        address = f"3.3.3.{index}"
+        default_sequence.extend(
+            [
+                {
+                    "target": dns.name.from_unicode(f"ns{index}.example.com"),
+                    "rdtype": dns.rdatatype.A,
+                    "lifetime": 10,
+                    "result": create_mock_answer(
+                        dns.rrset.from_rdata(
+                            f"ns{index}.example.com",
+                            300,
+                            dns.rdata.from_text(
+                                dns.rdataclass.IN, dns.rdatatype.A, address
+                            ),
+                        )
+                    ),
+                },
+                {
+                    "target": dns.name.from_unicode(f"ns{index}.example.com"),
+                    "rdtype": dns.rdatatype.AAAA,
+                    "lifetime": 10,
+                    "raise": dns.resolver.NoAnswer(response=fake_query),
+                },
+            ]
+        )
+        nameserver_sequences[(address,)] = [
+            {
+                "target": dns.name.from_unicode("www.example.com"),
+                "lifetime": 10,
+                "rdtype": dns.rdatatype.TXT,
+                "result": create_mock_answer(
+                    dns.rrset.from_rdata(
+                        "www.example.com",
+                        300,
+                        dns.rdata.from_text(
+                            dns.rdataclass.IN, dns.rdatatype.TXT, f'"{index}"'
+                        ),
+                    )
+                ),
+            },
+        ]
+    mock_resolver_instance = mock_resolver(
+        ["1.1.1.1"], {("1.1.1.1",): default_sequence, **nameserver_sequences}
+    )
+    udp_sequence = [
+        {
+            "query_target": dns.name.from_unicode("com"),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "1.1.1.1",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(
+                dns.rcode.NOERROR,
+                authority=[
+                    dns.rrset.from_rdata(
+                        "com",
+                        3600,
+                        dns.rdata.from_text(
+                            dns.rdataclass.IN, dns.rdatatype.NS, "ns.com"
+                        ),
+                    )
+                ],
+            ),
+        },
+        {
+            "query_target": dns.name.from_unicode("example.com"),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "1.1.1.1",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(
+                dns.rcode.NOERROR,
+                authority=[
+                    dns.rrset.from_rdata(
+                        "example.com",
+                        3600,
+                        *[
+                            dns.rdata.from_text(
+                                dns.rdataclass.IN,
+                                dns.rdatatype.NS,
+                                f"ns{index}.example.com",
+                            )
+                            for index in range(1, 4)
+                        ],
+                    )
+                ],
+            ),
+        },
+        {
+            "query_target": dns.name.from_unicode("www.example.com"),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "1.1.1.1",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(dns.rcode.NOERROR),
+        },
+    ]
+
+    with patch("dns.resolver.get_default_resolver", mock_resolver_instance):
+        with patch("dns.resolver.Resolver", mock_resolver_instance):
+            with patch("dns.query.udp", mock_query_udp(udp_sequence)):
+                resolver_instance = ResolveDirectlyFromNameServers()
+                rrset_dict = resolver_instance.resolve(
+                    "www.example.com",
+                    rdtype=dns.rdatatype.TXT,
+                    exclude_nameservers=["ns2.example.com"],
+                )
+                assert list(rrset_dict) == [
+                    "ns1.example.com",
+                    "ns3.example.com",
+                ]
+                for index in (1, 3):
+                    rrset = rrset_dict[f"ns{index}.example.com"]
+                    assert rrset[0].to_text() == f'"{index}"'
+
+
+def test_cache_expiry():
+    mock_resolver_instance = mock_resolver(["1.1.1.1"], {})
+
+    def ns_query(target, ttl, nameserver):
+        return {
+            "query_target": dns.name.from_unicode(target),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "1.1.1.1",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(
+                dns.rcode.NOERROR,
+                authority=[
+                    dns.rrset.from_rdata(
+                        target,
+                        ttl,
+                        dns.rdata.from_text(
+                            dns.rdataclass.IN, dns.rdatatype.NS, nameserver
+                        ),
+                    )
+                ],
+            ),
+        }
+
+    udp_sequence = [
+        ns_query("com", 3600, "ns.com"),
+        ns_query("example.com", 60, "ns1.example.com"),
+        # example.com expired, com is still cached
+        ns_query("example.com", 60, "ns2.example.com"),
+        # The cached information for com is capped to 120 seconds
+        ns_query("com", 3600, "ns.com"),
+        ns_query("example.com", 60, "ns3.example.com"),
+    ]
+    now = [1000.0]
+    with patch(
+        "ansible_collections.community.dns.plugins.module_utils._resolver_cache.monotonic",
+        lambda: now[0],
+    ):
+        with patch("dns.resolver.get_default_resolver", mock_resolver_instance):
+            with patch("dns.resolver.Resolver", mock_resolver_instance):
+                with patch("dns.query.udp", mock_query_udp(udp_sequence)):
+                    resolver_instance = ResolveDirectlyFromNameServers(
+                        cache_max_ttl=120
+                    )
+                    assert resolver_instance.resolve_nameservers("example.com") == [
+                        "ns1.example.com"
+                    ]
+                    now[0] += 30
+                    assert resolver_instance.resolve_nameservers("example.com") == [
+                        "ns1.example.com"
+                    ]
+                    now[0] += 31
+                    assert resolver_instance.resolve_nameservers("example.com") == [
+                        "ns2.example.com"
+                    ]
+                    now[0] += 60
+                    assert resolver_instance.resolve_nameservers("example.com") == [
+                        "ns3.example.com"
+                    ]
+                    assert len(udp_sequence) == 0
+
+
+def test_persistent_cache(tmp_path):
+    fake_query = MagicMock()
+    fake_query.question = "Doctor Who?"
+    mock_resolver_instance = mock_resolver(
+        ["1.1.1.1"],
+        {
+            ("1.1.1.1",): [
+                {
+                    "target": dns.name.from_unicode("ns.example.com"),
+                    "rdtype": dns.rdatatype.A,
+                    "lifetime": 10,
+                    "result": create_mock_answer(
+                        dns.rrset.from_rdata(
+                            "ns.example.com",
+                            300,
+                            dns.rdata.from_text(
+                                dns.rdataclass.IN, dns.rdatatype.A, "3.3.3.3"
+                            ),
+                        )
+                    ),
+                },
+                {
+                    "target": dns.name.from_unicode("ns.example.com"),
+                    "rdtype": dns.rdatatype.AAAA,
+                    "lifetime": 10,
+                    "raise": dns.resolver.NoAnswer(response=fake_query),
+                },
+            ],
+        },
+    )
+    udp_sequence = [
+        {
+            "query_target": dns.name.from_unicode("com"),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "1.1.1.1",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(
+                dns.rcode.NOERROR,
+                authority=[
+                    dns.rrset.from_rdata(
+                        "com",
+                        3600,
+                        dns.rdata.from_text(
+                            dns.rdataclass.IN, dns.rdatatype.NS, "ns.com"
+                        ),
+                    )
+                ],
+            ),
+        },
+        {
+            "query_target": dns.name.from_unicode("example.com"),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "1.1.1.1",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(
+                dns.rcode.NOERROR,
+                authority=[
+                    dns.rrset.from_rdata(
+                        "example.com",
+                        3600,
+                        dns.rdata.from_text(
+                            dns.rdataclass.IN, dns.rdatatype.NS, "ns.example.com"
+                        ),
+                    )
+                ],
+            ),
+        },
+        {
+            "query_target": dns.name.from_unicode("www.example.com"),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "1.1.1.1",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(
+                dns.rcode.NOERROR,
+                answer=[
+                    dns.rrset.from_rdata(
+                        "www.example.com",
+                        3600,
+                        dns.rdata.from_text(
+                            dns.rdataclass.IN, dns.rdatatype.CNAME, "example.org"
+                        ),
+                    ),
+                ],
+                authority=[
+                    dns.rrset.from_rdata(
+                        "example.com",
+                        3600,
+                        dns.rdata.from_text(
+                            dns.rdataclass.IN,
+                            dns.rdatatype.SOA,
+                            "ns.example.com. ns.example.com. 12345 7200 120 2419200 10800",
+                        ),
+                    ),
+                ],
+            ),
+        },
+    ]
+    path = str(tmp_path / "cache.sqlite")
+    with patch("dns.resolver.get_default_resolver", mock_resolver_instance):
+        with patch("dns.resolver.Resolver", mock_resolver_instance):
+            with patch("dns.query.udp", mock_query_udp(udp_sequence)):
+                persistent_cache = PersistentCache(path)
+                resolver_instance = ResolveDirectlyFromNameServers(
+                    persistent_cache=persistent_cache
+                )
+                assert resolver_instance.resolve_nameservers(
+                    "www.example.com", resolve_addresses=True
+                ) == ["3.3.3.3"]
+                persistent_cache.close()
+                assert len(udp_sequence) == 0
+
+                # A new resolver does not need to send any query
+                persistent_cache = PersistentCache(path)
+                resolver_instance = ResolveDirectlyFromNameServers(
+                    persistent_cache=persistent_cache
+                )
+                assert resolver_instance.resolve_nameservers(
+                    "www.example.com", resolve_addresses=True
+                ) == ["3.3.3.3"]
+                assert resolver_instance._lookup_ns(
+                    dns.name.from_unicode("www.example.com")
+                ) == ["ns.example.com"]
+                assert resolver_instance.cname_cache.get("www.example.com.") == (
+                    "example.org."
+                )
+
+                # A resolver configured differently does not use the cached results
+                resolver_instance = ResolveDirectlyFromNameServers(
+                    persistent_cache=persistent_cache,
+                    always_ask_default_resolver=False,
+                )
+                with pytest.raises(AssertionError) as exc:
+                    resolver_instance.resolve_nameservers("www.example.com")
+                assert exc.value.args[0] == "UDP query call sequence is empty"
+                persistent_cache.close()
+
+
+def _create_concurrent_address_resolver(addresses, barrier):
+    """
+    Create a mock for the default resolver that answers A and AAAA queries
+    from ``addresses``, in any order, and only once all queries are in flight.
+    The names in ``addresses`` can be given with or without the final dot.
+    """
+    addresses = {name.rstrip("."): values for name, values in addresses.items()}
+
+    def create_resolver(configure=True):
+        mock = MagicMock()
+        mock.nameservers = ["1.1.1.1"]
+
+        def resolve(target, rdtype=None, lifetime=None, search=None):
+            barrier.wait()
+            values = [
+                address
+                for address in addresses.get(str(target).rstrip("."), [])
+                if (":" in address) == (rdtype == dns.rdatatype.AAAA)
+            ]
+            if not values:
+                raise dns.resolver.NoAnswer(response=MagicMock())
+            return create_mock_answer(
+                dns.rrset.from_rdata(
+                    str(target),
+                    300,
+                    *[
+                        dns.rdata.from_text(dns.rdataclass.IN, rdtype, value)
+                        for value in values
+                    ],
+                )
+            )
+
+        mock.resolve = MagicMock(side_effect=resolve)
+        return mock
+
+    return create_resolver
+
+
+def test_lookup_addresses_concurrently():
+    addresses = {
+        "ns1.example.com": ["1.2.3.4", "1::2"],
+        "ns2.example.com": ["2.3.4.5"],
+    }
+    # All four A and AAAA queries must be sent at the same time, otherwise the barrier breaks
+    barrier = threading.Barrier(4, timeout=10)
+    mock_resolver_instance = _create_concurrent_address_resolver(addresses, barrier)
+    with patch("dns.resolver.get_default_resolver", mock_resolver_instance):
+        resolver_instance = ResolveDirectlyFromNameServers(max_concurrency=4)
+        assert (
+            resolver_instance._lookup_addresses(
+                ["ns1.example.com", "ns2.example.com", "ns1.example.com"]
+            )
+            == addresses
+        )
+        # Everything is cached now
+        assert resolver_instance._lookup_address("ns1.example.com") == [
+            "1.2.3.4",
+            "1::2",
+        ]
+        assert resolver_instance.default_resolver.resolve.call_count == 4
+
+
+def test_simple_resolver_resolve_addresses_concurrently():
+    addresses = {
+        "ns1.example.com.": ["1.2.3.4", "1::2"],
+    }
+    barrier = threading.Barrier(2, timeout=10)
+    mock_resolver_instance = _create_concurrent_address_resolver(addresses, barrier)
+    with patch("dns.resolver.get_default_resolver", mock_resolver_instance):
+        resolver_instance = SimpleResolver(max_concurrency=2)
+        assert resolver_instance.resolve_addresses("ns1.example.com") == [
+            "1.2.3.4",
+            "1::2",
+        ]
+
+
+def _run_coalesced(resolver_instance, key, started, release, function):
+    """
+    Run ``function`` in two threads. The second thread is only started once the first
+    one is blocked in a query, and the query is only released once the second thread
+    waits for the result of the first one.
+    """
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(function()))
+        for dummy in range(2)
+    ]
+    threads[0].start()
+    assert started.wait(10)
+    threads[1].start()
+    for dummy in range(1000):
+        if resolver_instance.in_flight.get_waiters(key) == 1:
+            break
+        threading.Event().wait(0.01)
+    assert resolver_instance.in_flight.get_waiters(key) == 1
+    release.set()
+    for thread in threads:
+        thread.join(10)
+    return results
+
+
+def test_coalesce_address_lookups():
+    started = threading.Event()
+    release = threading.Event()
+    default_resolver = MagicMock()
+    default_resolver.nameservers = ["1.1.1.1"]
+
+    def resolve(target, rdtype=None, lifetime=None, search=None):
+        started.set()
+        assert release.wait(10)
+        if rdtype == dns.rdatatype.AAAA:
+            raise dns.resolver.NoAnswer(response=MagicMock())
+        return create_mock_answer(
+            dns.rrset.from_rdata(
+                str(target),
+                300,
+                dns.rdata.from_text(dns.rdataclass.IN, rdtype, "1.2.3.4"),
+            )
+        )
+
+    default_resolver.resolve = MagicMock(side_effect=resolve)
+    with patch(
+        "dns.resolver.get_default_resolver", MagicMock(return_value=default_resolver)
+    ):
+        resolver_instance = ResolveDirectlyFromNameServers()
+        results = _run_coalesced(
+            resolver_instance,
+            ("ns1.example.com", "addr"),
+            started,
+            release,
+            lambda: resolver_instance._lookup_addresses(["ns1.example.com"]),
+        )
+    assert results == [{"ns1.example.com": ["1.2.3.4"]}] * 2
+    # Only one A and one AAAA query were sent
+    assert default_resolver.resolve.call_count == 2
+
+
+def test_coalesce_ns_lookups():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def udp(query, nameserver, **kwargs):
+        calls.append(str(query.question[0].name))
+        started.set()
+        assert release.wait(10)
+        name = query.question[0].name
+        return create_mock_response(
+            dns.rcode.NOERROR,
+            authority=[
+                dns.rrset.from_rdata(
+                    name,
+                    3600,
+                    dns.rdata.from_text(
+                        dns.rdataclass.IN, dns.rdatatype.NS, f"ns.{name}"
+                    ),
+                )
+            ],
+        )
+
+    with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+        with patch("dns.query.udp", udp):
+            resolver_instance = ResolveDirectlyFromNameServers()
+            results = _run_coalesced(
+                resolver_instance,
+                ("com.", "ns"),
+                started,
+                release,
+                lambda: resolver_instance.resolve_nameservers("example.com"),
+            )
+    assert results == [["ns.example.com."]] * 2
+    # Every zone cut was only queried once
+    assert calls == ["com.", "example.com."]
+
+
+def test_prefetch_nameservers():
+    barriers = {
+        "com.": threading.Barrier(2, timeout=10),
+        "org.": threading.Barrier(2, timeout=10),
+        "example.com.": threading.Barrier(2, timeout=10),
+        "example.org.": threading.Barrier(2, timeout=10),
+        "a.example.com.": threading.Barrier(3, timeout=10),
+        "b.example.com.": threading.Barrier(3, timeout=10),
+        "c.example.org.": threading.Barrier(3, timeout=10),
+    }
+    # The zones of one level share a barrier, so all of them must be queried at the same time
+    barriers["org."] = barriers["com."]
+    barriers["example.org."] = barriers["example.com."]
+    barriers["b.example.com."] = barriers["c.example.org."] = barriers["a.example.com."]
+    calls = []
+
+    def udp(query, nameserver, **kwargs):
+        name = query.question[0].name
+        calls.append(str(name))
+        barriers[str(name)].wait()
+        if len(name.labels) > 3:
+            return create_mock_response(dns.rcode.NOERROR)
+        return create_mock_response(
+            dns.rcode.NOERROR,
+            authority=[
+                dns.rrset.from_rdata(
+                    name,
+                    3600,
+                    dns.rdata.from_text(
+                        dns.rdataclass.IN, dns.rdatatype.NS, f"ns.{name}"
+                    ),
+                )
+            ],
+        )
+
+    names = ["a.example.com", "b.example.com", "c.example.org"]
+    with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+        with patch("dns.query.udp", udp):
+            resolver_instance = ResolveDirectlyFromNameServers(max_concurrency=3)
+            resolver_instance.prefetch_nameservers(names)
+            assert sorted(calls) == sorted(barriers)
+            # Every zone is queried after its parent zone
+            assert max(calls.index("com."), calls.index("org.")) < min(
+                calls.index("example.com."), calls.index("example.org.")
+            )
+        with patch("dns.query.udp", MagicMock(side_effect=AssertionError)):
+            assert resolver_instance.resolve_nameservers("a.example.com") == [
+                "ns.example.com."
+            ]
+            assert resolver_instance.resolve_nameservers("c.example.org") == [
+                "ns.example.org."
+            ]
+
+        # Without concurrency, nothing is prefetched
+        with patch("dns.query.udp", MagicMock(side_effect=AssertionError)):
+            ResolveDirectlyFromNameServers().prefetch_nameservers(names)
+
+        # Errors are ignored, and the zones below are not looked up
+        calls.clear()
+
+        def fail(query, nameserver, **kwargs):
+            calls.append(str(query.question[0].name))
+            raise dns.exception.Timeout(timeout=10)
+
+        with patch("dns.query.udp", fail):
+            ResolveDirectlyFromNameServers(
+                max_concurrency=2, timeout_retries=0
+            ).prefetch_nameservers(["c.example.org"])
+        assert calls == ["org."]
+
+
+def test_walk_from_cached_ancestor():
+    udp_sequence = [
+        {
+            "query_target": dns.name.from_unicode("_acme-challenge.sub.example.com"),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "1.2.3.4",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(dns.rcode.NOERROR),
+        },
+    ]
+    with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+        with patch("dns.query.udp", mock_query_udp(udp_sequence)):
+            resolver_instance = ResolveDirectlyFromNameServers(
+                always_ask_default_resolver=False
+            )
+            resolver_instance.cache.set(
+                ("sub.example.com.", "ns"), ["ns.sub.example.com."], 300
+            )
+            resolver_instance.cache.set(
+                ("ns.sub.example.com.", "addr"), ["1.2.3.4"], 300
+            )
+            # Only the nameserver of sub.example.com is asked
+            assert resolver_instance.resolve_nameservers(
+                "_acme-challenge.sub.example.com"
+            ) == ["ns.sub.example.com."]
+            # The TTL of the parent zone is kept
+            nameservers, ttl = resolver_instance.cache.get_with_ttl(
+                ("_acme-challenge.sub.example.com.", "ns")
+            )
+            assert nameservers == ["ns.sub.example.com."]
+            assert ttl <= 300
+
+
+def _create_async_gate(count):
+    """
+    Create a coroutine function that only returns once ``count`` coroutines wait for it.
+    """
+    state = {"waiting": 0}
+
+    async def gate():
+        state["waiting"] += 1
+        await asyncio.wait_for(_wait_for(lambda: state["waiting"] >= count), 10)
+
+    return gate
+
+
+async def _wait_for(condition):
+    while not condition():
+        await asyncio.sleep(0)
+
+
+def test_run_coroutines():
+    async def value(value):
+        return value
+
+    assert run_coroutines([]) == []
+    assert run_coroutines(
+        [functools.partial(value, value_) for value_ in range(3)], max_concurrency=2
+    ) == [0, 1, 2]
+
+    gate = _create_async_gate(3)
+
+    async def wait_for_others(value):
+        await gate()
+        return value
+
+    assert run_coroutines(
+        [functools.partial(wait_for_others, value) for value in range(3)],
+        max_concurrency=3,
+    ) == [0, 1, 2]
+
+    async def fail(message):
+        raise ResolverError(message)
+
+    with pytest.raises(ResolverError) as exc:
+        run_coroutines(
+            [
+                functools.partial(value, 1),
+                functools.partial(fail, "a"),
+                functools.partial(fail, "b"),
+            ],
+            max_concurrency=3,
+        )
+    assert exc.value.args[0] == "a"
+
+    # Also works when called from a running event loop
+    async def nested():
+        return run_coroutines(
+            [functools.partial(value, value_) for value_ in range(2)],
+            max_concurrency=2,
+        )
+
+    assert asyncio.run(nested()) == [0, 1]
+
+
+def _create_async_address_resolver(addresses, gate, queries):
+    """
+    Create a mock for ``dns.asyncresolver.Resolver`` that answers A and AAAA queries
+    from ``addresses`` once all queries are in flight, and records them in ``queries``.
+    The names in ``addresses`` can be given with or without the final dot.
+    """
+    addresses = {name.rstrip("."): values for name, values in addresses.items()}
+
+    def create_resolver(configure=True):
+        mock = MagicMock()
+        mock.nameservers = []
+
+        async def resolve(target, rdtype=None, lifetime=None, search=None):
+            queries.append((str(target), rdtype, tuple(mock.nameservers)))
+            await gate()
+            values = [
+                address
+                for address in addresses.get(str(target).rstrip("."), [])
+                if (":" in address) == (rdtype == dns.rdatatype.AAAA)
+            ]
+            if not values:
+                raise dns.resolver.NoAnswer(response=MagicMock())
+            return create_mock_answer(
+                dns.rrset.from_rdata(
+                    str(target),
+                    300,
+                    *[
+                        dns.rdata.from_text(dns.rdataclass.IN, rdtype, value)
+                        for value in values
+                    ],
+                )
+            )
+
+        mock.resolve = resolve
+        return mock
+
+    return create_resolver
+
+
+def test_asyncio_backend():
+    addresses = {
+        "ns1.example.com": ["1.2.3.4", "1::2"],
+        "ns2.example.com": ["2.3.4.5"],
+    }
+    default_resolver = MagicMock()
+    default_resolver.nameservers = ["1.1.1.1"]
+    default_resolver.resolve = MagicMock(side_effect=AssertionError("sync query"))
+    queries = []
+    # All four A and AAAA queries must be sent at the same time, otherwise the gate times out
+    async_resolver = _create_async_address_resolver(
+        addresses, _create_async_gate(4), queries
+    )
+    with patch(
+        "dns.resolver.get_default_resolver", MagicMock(return_value=default_resolver)
+    ):
+        with patch("dns.asyncresolver.Resolver", async_resolver):
+            resolver_instance = ResolveDirectlyFromNameServers(
+                max_concurrency=4, backend="asyncio"
+            )
+            assert resolver_instance._lookup_addresses(
+                ["ns1.example.com", "ns2.example.com"]
+            ) == {
+                "ns1.example.com": ["1.2.3.4", "1::2"],
+                "ns2.example.com": ["2.3.4.5"],
+            }
+            # The nameserver names are queried as absolute names
+            assert sorted(queries) == [
+                ("ns1.example.com.", dns.rdatatype.A, ("1.1.1.1",)),
+                ("ns1.example.com.", dns.rdatatype.AAAA, ("1.1.1.1",)),
+                ("ns2.example.com.", dns.rdatatype.A, ("1.1.1.1",)),
+                ("ns2.example.com.", dns.rdatatype.AAAA, ("1.1.1.1",)),
+            ]
+
+    queries.clear()
+    async_resolver = _create_async_address_resolver(
+        addresses, _create_async_gate(2), queries
+    )
+    with patch(
+        "dns.resolver.get_default_resolver", MagicMock(return_value=default_resolver)
+    ):
+        with patch("dns.asyncresolver.Resolver", async_resolver):
+            resolver_instance = SimpleResolver(max_concurrency=2, backend="asyncio")
+            assert resolver_instance.resolve_addresses("ns1.example.com") == [
+                "1.2.3.4",
+                "1::2",
+            ]
+            assert len(queries) == 2
+
+    # Without concurrency, the threads backend is used
+    barrier = threading.Barrier(1)
+    mock_resolver_instance = _create_concurrent_address_resolver(addresses, barrier)
+    with patch("dns.resolver.get_default_resolver", mock_resolver_instance):
+        with patch("dns.asyncresolver.Resolver", MagicMock(side_effect=AssertionError)):
+            resolver_instance = SimpleResolver(max_concurrency=1, backend="asyncio")
+            assert resolver_instance.resolve_addresses("ns1.example.com") == [
+                "1.2.3.4",
+                "1::2",
+            ]
+
+
+def test_server_statistics():
+    statistics = resolver._ServerStatistics(failure_penalty=5)
+    # Without measurements, the order is kept
+    assert statistics.sort(["1.1.1.1", "2.2.2.2", "3.3.3.3"]) == [
+        "1.1.1.1",
+        "2.2.2.2",
+        "3.3.3.3",
+    ]
+    statistics.record_success("1.1.1.1", 0.2)
+    statistics.record_success("2.2.2.2", 0.1)
+    statistics.record_success("1.1.1.1", 0.1)
+    assert statistics.get_srtt("1.1.1.1") == pytest.approx(0.17)
+    assert statistics.get_srtt("2.2.2.2") == pytest.approx(0.1)
+    # Unknown servers are probed first, then the fastest ones are used
+    assert statistics.sort(["1.1.1.1", "2.2.2.2", "3.3.3.3"]) == [
+        "3.3.3.3",
+        "2.2.2.2",
+        "1.1.1.1",
+    ]
+    # Failed servers are used last
+    statistics.record_failure("2.2.2.2")
+    statistics.record_failure("3.3.3.3")
+    assert statistics.get_failures("2.2.2.2") == 1
+    assert statistics.get_srtt("3.3.3.3") == 5
+    assert statistics.sort(["1.1.1.1", "2.2.2.2", "3.3.3.3"]) == [
+        "1.1.1.1",
+        "2.2.2.2",
+        "3.3.3.3",
+    ]
+    # A successful query makes the server healthy again
+    statistics.record_success("3.3.3.3", 0.1)
+    assert statistics.get_failures("3.3.3.3") == 0
+    assert statistics.sort(["2.2.2.2", "3.3.3.3"]) == ["3.3.3.3", "2.2.2.2"]
+
+
+def test_circuit_breaker():
+    now = [0]
+    with patch(
+        "ansible_collections.community.dns.plugins.module_utils._resolver.monotonic",
+        lambda: now[0],
+    ):
+        statistics = resolver._ServerStatistics(failure_threshold=2, open_duration=30)
+        statistics.record_failure("1.1.1.1")
+        assert statistics.get_state("1.1.1.1") == "closed"
+        assert statistics.filter_available(["1.1.1.1", "2.2.2.2"]) == [
+            "1.1.1.1",
+            "2.2.2.2",
+        ]
+        # Two consecutive failures open the circuit
+        statistics.record_failure("1.1.1.1")
+        assert statistics.get_state("1.1.1.1") == "open"
+        assert statistics.filter_available(["1.1.1.1", "2.2.2.2"]) == ["2.2.2.2"]
+        # After the open duration, a single probe is allowed
+        now[0] = 30
+        assert statistics.get_state("1.1.1.1") == "half-open"
+        assert statistics.is_available("1.1.1.1") is True
+        assert statistics.is_available("1.1.1.1") is False
+        # A failed probe opens the circuit again
+        statistics.record_failure("1.1.1.1")
+        assert statistics.get_state("1.1.1.1") == "open"
+        now[0] = 60
+        assert statistics.is_available("1.1.1.1") is True
+        # A successful probe closes it
+        statistics.record_success("1.1.1.1")
+        assert statistics.get_state("1.1.1.1") == "closed"
+        assert statistics.is_available("1.1.1.1") is True
+        assert statistics.get_statistics() == {
+            "1.1.1.1": {
+                "queries": 4,
+                "timeouts": 3,
+                "consecutive_failures": 0,
+                "srtt": pytest.approx(10),
+                "state": "closed",
+            },
+        }
+
+    udp_sequence = [
+        {
+            "query_target": dns.name.from_unicode("example.com"),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "3.3.3.3",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "raise": dns.exception.Timeout(timeout=10),
+        },
+    ]
+    with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+        with patch("dns.query.udp", mock_query_udp(udp_sequence)):
+            resolver_instance = ResolveDirectlyFromNameServers(
+                timeout_retries=0, always_ask_default_resolver=False
+            )
+            resolver_instance.server_statistics.failure_threshold = 1
+            with pytest.raises(dns.exception.Timeout):
+                resolver_instance._lookup_ns_names(
+                    dns.name.from_unicode("example.com"), nameserver_ips=["3.3.3.3"]
+                )
+            # The nameserver is not asked again
+            with pytest.raises(ResolverError) as exc:
+                resolver_instance._lookup_ns_names(
+                    dns.name.from_unicode("example.com"), nameserver_ips=["3.3.3.3"]
+                )
+            assert exc.value.args[0] == (
+                "Cannot get NS for example.com.: the nameservers 3.3.3.3 did not respond to recent queries"
+            )
+            assert (
+                resolver_instance.get_nameserver_statistics()["3.3.3.3"]["state"]
+                == "open"
+            )
+
+
+def test_query_statistics():
+    name = dns.name.from_unicode("www.example.com")
+    with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+        resolver_instance = ResolveDirectlyFromNameServers(
+            timeout_retries=0,
+            always_ask_default_resolver=False,
+            negative_cache=resolver.create_negative_cache(),
+        )
+
+    # Only the addresses that were tried are marked as failed
+    dns_resolver = MagicMock()
+    dns_resolver.nameservers = ["1.1.1.1", "2.2.2.2", "3.3.3.3"]
+    dns_resolver.resolve.side_effect = dns.resolver.LifetimeTimeout(
+        timeout=10,
+        errors=[
+            ("2.2.2.2", False, 53, dns.exception.Timeout(timeout=5), None),
+            ("1.1.1.1", False, 53, "SERVFAIL", None),
+        ],
+    )
+    with pytest.raises(dns.exception.Timeout):
+        resolver_instance._resolve_with_statistics(
+            dns_resolver, name, rdtype=dns.rdatatype.A
+        )
+    assert sorted(resolver_instance.get_nameserver_statistics()) == ["2.2.2.2"]
+    # Without the errors, only the first address was tried
+    dns_resolver.resolve.side_effect = dns.exception.Timeout(timeout=10)
+    with pytest.raises(dns.exception.Timeout):
+        resolver_instance._resolve_with_statistics(
+            dns_resolver, name, rdtype=dns.rdatatype.A
+        )
+    assert sorted(resolver_instance.get_nameserver_statistics()) == [
+        "1.1.1.1",
+        "2.2.2.2",
+    ]
+    # Answers are attributed to the address that sent them
+    dns_resolver.resolve.side_effect = None
+    answer = create_mock_answer()
+    answer.nameserver = "3.3.3.3"
+    dns_resolver.resolve.return_value = answer
+    resolver_instance._resolve_with_statistics(
+        dns_resolver, name, rdtype=dns.rdatatype.AAAA
+    )
+    assert resolver_instance.get_nameserver_statistics()["3.3.3.3"]["queries"] == 1
+
+    # Answers from the negative cache are not counted
+    dns_resolver = MagicMock()
+    dns_resolver.nameservers = ["4.4.4.4"]
+    dns_resolver.resolve.side_effect = dns.resolver.NXDOMAIN(
+        qnames=[name],
+        responses={
+            name: create_mock_response(
+                dns.rcode.NXDOMAIN, authority=[_create_soa("example.com", 3600, 300)]
+            )
+        },
+    )
+    for dummy in range(3):
+        with pytest.raises(dns.resolver.NXDOMAIN):
+            resolver_instance._resolve_with_statistics(
+                dns_resolver, name, rdtype=dns.rdatatype.A
+            )
+    assert dns_resolver.resolve.call_count == 1
+    statistics = resolver_instance.get_nameserver_statistics()["4.4.4.4"]
+    assert statistics["queries"] == 1
+    assert statistics["timeouts"] == 0
+
+
+def test_hedged_queries():
+    statistics = resolver._ServerStatistics()
+    assert statistics.get_rtt_quantile(0.9) is None
+    for index in range(10):
+        statistics.record_success("1.1.1.1", (index + 1) / 100)
+    assert statistics.get_rtt_quantile(0.9) == pytest.approx(0.1)
+
+    release = threading.Event()
+    queried = []
+    slow_queries = []
+    behavior = {}
+
+    def create_resolver(configure=True):
+        mock = MagicMock()
+        mock.nameservers = []
+
+        def resolve(target, rdtype=None, lifetime=None, search=None):
+            address = mock.nameservers[0]
+            queried.append(address)
+            if behavior[address] == "slow":
+                slow_queries.append((threading.current_thread().daemon, lifetime))
+                release.wait(10)
+                raise dns.exception.Timeout(timeout=lifetime)
+            if behavior[address] == "timeout":
+                raise dns.exception.Timeout(timeout=lifetime)
+            return create_mock_answer(
+                dns.rrset.from_rdata(
+                    str(target),
+                    300,
+                    dns.rdata.from_text(dns.rdataclass.IN, rdtype, f'"{address}"'),
+                )
+            )
+
+        mock.resolve = MagicMock(side_effect=resolve)
+        return mock
+
+    dnsname = dns.name.from_unicode("example.com")
+    with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+        with patch("dns.resolver.Resolver", create_resolver):
+            resolver_instance = ResolveDirectlyFromNameServers(
+                timeout_retries=0, hedging=True, max_concurrency=2
+            )
+            for dummy in range(10):
+                resolver_instance.server_statistics.record_success("9.9.9.9", 0.01)
+
+            # The first address does not answer in time, so the second one is asked as well
+            behavior.update({"1.1.1.1": "slow", "2.2.2.2": "ok"})
+            with resolver_instance.retry_policy.limit_time(5):
+                rrset = resolver_instance._resolve_hedged(
+                    ["1.1.1.1", "2.2.2.2"], dnsname, rdtype=dns.rdatatype.TXT
+                )
+            assert rrset[0].to_text() == '"2.2.2.2"'
+            assert queried == ["1.1.1.1", "2.2.2.2"]
+            # The query that lost the race does not keep the interpreter alive,
+            # and does not take longer than the deadline
+            assert len(slow_queries) == 1
+            assert slow_queries[0][0] is True
+            assert slow_queries[0][1] <= 5
+            release.set()
+
+            # A failed query makes the next address being asked right away
+            queried.clear()
+            behavior.update({"1.1.1.1": "timeout"})
+            rrset = resolver_instance._resolve_hedged(
+                ["1.1.1.1", "2.2.2.2"], dnsname, rdtype=dns.rdatatype.TXT
+            )
+            assert rrset[0].to_text() == '"2.2.2.2"'
+            assert queried == ["1.1.1.1", "2.2.2.2"]
+            assert resolver_instance.server_statistics.get_failures("1.1.1.1") >= 1
+
+            # If no address answers, the error is raised
+            behavior.update({"2.2.2.2": "timeout"})
+            with pytest.raises(dns.exception.Timeout):
+                resolver_instance._resolve_hedged(
+                    ["1.1.1.1", "2.2.2.2"], dnsname, rdtype=dns.rdatatype.TXT
+                )
+
+
+def test_query_slots():
+    lock = threading.Lock()
+    in_flight = [0]
+    max_in_flight = [0]
+
+    def query(timeout):
+        with lock:
+            in_flight[0] += 1
+            max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        return timeout
+
+    async def query_async(timeout):
+        with lock:
+            in_flight[0] += 1
+            max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+        await asyncio.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        return timeout
+
+    with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+        resolver_instance = SimpleResolver(max_concurrency=2)
+
+    # Nested concurrent calls share the bound of the resolver
+    def send_queries():
+        return run_concurrently(
+            [lambda: resolver_instance._handle_timeout(query)] * 3,
+            max_concurrency=3,
+        )
+
+    assert run_concurrently([send_queries] * 3, max_concurrency=3) == [[10] * 3] * 3
+    assert max_in_flight[0] == 2
+
+    # This also holds for queries sent from event loops in different threads
+    max_in_flight[0] = 0
+
+    def send_queries_async():
+        return run_coroutines(
+            [lambda: resolver_instance._handle_timeout_async(query_async)] * 3,
+            max_concurrency=3,
+        )
+
+    assert (
+        run_concurrently([send_queries_async] * 3, max_concurrency=3) == [[10] * 3] * 3
+    )
+    assert max_in_flight[0] == 2
+
+
+def test_retry_policy_thread_deadline():
+    policy = resolver.RetryPolicy()
+    assert policy.get_remaining_time() is None
+    with policy.limit_thread_time(time.monotonic() + 5):
+        assert 0 < policy.get_remaining_time() <= 5
+        with policy.limit_time(1):
+            assert 0 < policy.get_remaining_time() <= 1
+        with policy.limit_time(10):
+            assert 0 < policy.get_remaining_time() <= 5
+        # Other threads are not affected
+        remaining = []
+        thread = threading.Thread(
+            target=lambda: remaining.append(policy.get_remaining_time())
+        )
+        thread.start()
+        thread.join(10)
+        assert remaining == [None]
+    assert policy.get_remaining_time() is None
+
+
+def test_notify_listener():
+    listener = NotifyListener("127.0.0.1", 0)
+    try:
+        assert listener.wait(["www.example.com"], 0.01) is False
+
+        # The listener keeps running after polling for a while without receiving anything
+        time.sleep(resolver._NOTIFY_POLL_INTERVAL * 3)
+        assert listener._thread.is_alive()
+
+        # Act like the primary nameserver of example.com
+        notify = dns.message.make_query("example.com", dns.rdatatype.SOA)
+        notify.set_opcode(dns.opcode.NOTIFY)
+        notify.flags |= dns.flags.AA
+        response = dns.query.udp(notify, "127.0.0.1", port=listener.port, timeout=5)
+        assert response.id == notify.id
+        assert response.opcode() == dns.opcode.NOTIFY
+        assert response.rcode() == dns.rcode.NOERROR
+
+        # Other messages are ignored
+        query = dns.message.make_query("example.org", dns.rdatatype.SOA)
+        with pytest.raises(dns.exception.Timeout):
+            dns.query.udp(query, "127.0.0.1", port=listener.port, timeout=0.1)
+
+        assert listener.wait(["www.example.org"], 0.01) is False
+        assert listener.wait(["www.example.org", "www.example.com"], 5) is True
+        # The NOTIFY has been consumed
+        assert listener.wait(["www.example.com"], 0.01) is False
+    finally:
+        listener.close()
+
+
+def test_transport_pool():
+    calls = []
+    responses = []
+
+    def udp(query, nameserver, **kwargs):
+        calls.append(("udp", nameserver, kwargs["sock"]))
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def tcp(query, nameserver, **kwargs):
+        calls.append(("tcp", nameserver, kwargs["sock"]))
+        # Over TCP, the nameserver is asked to keep the connection open
+        assert [option.otype for option in query.options] == [
+            dns.edns.OptionType.KEEPALIVE
+        ]
+        return responses.pop(0)
+
+    def response(flags=0):
+        result = create_mock_response(dns.rcode.NOERROR)
+        result.flags = flags
+        return result
+
+    def create_socket(*args):
+        return MagicMock()
+
+    query = dns.message.make_query("example.com", dns.rdatatype.NS)
+    pool = TransportPool()
+    with patch("dns.query.udp", udp):
+        with patch("dns.query.tcp", tcp):
+            with patch.object(resolver.socket, "socket", create_socket):
+                responses.extend(
+                    [
+                        response(),
+                        response(),
+                        response(dns.flags.TC),
+                        response(),
+                        response(),
+                        dns.exception.Timeout(timeout=10),
+                        response(),
+                    ]
+                )
+                pool.query(query, "1.1.1.1", timeout=10)
+                pool.query(query, "2.2.2.2", timeout=10)
+                # The response is truncated, so the query is repeated over TCP
+                pool.query(query, "3.3.3.3", timeout=10)
+                # This nameserver is now asked over TCP right away
+                pool.query(query, "3.3.3.3", timeout=10)
+                with pytest.raises(dns.exception.Timeout):
+                    pool.query(query, "1.1.1.1", timeout=10)
+                pool.query(query, "1.1.1.1", timeout=10)
+                assert query.edns < 0
+                assert not responses
+                assert [call[:2] for call in calls] == [
+                    ("udp", "1.1.1.1"),
+                    ("udp", "2.2.2.2"),
+                    ("udp", "3.3.3.3"),
+                    ("tcp", "3.3.3.3"),
+                    ("tcp", "3.3.3.3"),
+                    ("udp", "1.1.1.1"),
+                    ("udp", "1.1.1.1"),
+                ]
+                udp_socket = calls[0][2]
+                # The UDP socket is reused until a query fails
+                assert calls[1][2] is udp_socket
+                assert calls[2][2] is udp_socket
+                assert calls[5][2] is udp_socket
+                udp_socket.close.assert_called_once_with()
+                assert calls[6][2] is not udp_socket
+                # The TCP connection is reused
+                assert calls[3][2] is calls[4][2]
+                assert pool.needs_tcp("3.3.3.3")
+                pool.close()
+                calls[3][2].close.assert_called_once_with()
+
+    # Idle sockets are shared by all threads, but every query uses its own socket
+    pool = TransportPool()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_udp(query, nameserver, **kwargs):
+        if nameserver == "2.2.2.2":
+            started.set()
+            release.wait(10)
+        return udp(query, nameserver, **kwargs)
+
+    with patch("dns.query.udp", slow_udp):
+        with patch.object(resolver.socket, "socket", create_socket):
+            responses.extend([response(), response(), response(), response()])
+            calls.clear()
+            pool.query(query, "1.1.1.1", timeout=10)
+            thread = threading.Thread(
+                target=lambda: pool.query(query, "2.2.2.2", timeout=10)
+            )
+            thread.start()
+            assert started.wait(10)
+            # The other thread uses the idle socket, so a new one is needed
+            pool.query(query, "1.1.1.1", timeout=10)
+            release.set()
+            thread.join(10)
+            assert not thread.is_alive()
+            # Both sockets are idle now
+            pool.query(query, "1.1.1.1", timeout=10)
+            assert [call[1] for call in calls] == [
+                "1.1.1.1",
+                "1.1.1.1",
+                "2.2.2.2",
+                "1.1.1.1",
+            ]
+            first_socket, second_socket = calls[0][2], calls[1][2]
+            assert first_socket is not second_socket
+            assert calls[2][2] is first_socket
+            assert calls[3][2] in (first_socket, second_socket)
+            pool.close()
+            first_socket.close.assert_called_once_with()
+            second_socket.close.assert_called_once_with()
+
+
+def test_transport_pool_queries():
+    name = dns.name.from_unicode("www.example.com")
+    behavior = {}
+    queried = []
+
+    def query(query, nameserver, timeout):
+        queried.append(nameserver)
+        assert query.ednsflags & dns.flags.DO
+        if behavior[nameserver] == "timeout":
+            raise dns.exception.Timeout(timeout=timeout)
+        response = dns.message.make_response(query)
+        if behavior[nameserver] == "nxdomain":
+            response.set_rcode(dns.rcode.NXDOMAIN)
+        elif behavior[nameserver] == "answer":
+            rrset = response.find_rrset(
+                response.answer,
+                name,
+                dns.rdataclass.IN,
+                dns.rdatatype.A,
+                create=True,
+            )
+            rrset.add(
+                dns.rdata.from_text(dns.rdataclass.IN, dns.rdatatype.A, "1.2.3.4"),
+                300,
+            )
+        return response
+
+    transport_pool = MagicMock()
+    transport_pool.query.side_effect = query
+    default_resolver = mock_resolver(["1.1.1.1"], {})()
+    with patch("dns.resolver.get_default_resolver", lambda: default_resolver):
+        resolver_instance = ResolveDirectlyFromNameServers(
+            timeout_retries=0, transport_pool=transport_pool
+        )
+    dns_resolver = resolver_instance._get_resolver_for_addresses(["2.2.2.2", "3.3.3.3"])
+
+    # The addresses are asked one after another until one answers
+    behavior.update({"2.2.2.2": "timeout", "3.3.3.3": "answer"})
+    rrset = resolver_instance._resolve_with_statistics(
+        dns_resolver, name, rdtype=dns.rdatatype.A
+    )
+    assert [str(data) for data in rrset] == ["1.2.3.4"]
+    assert queried == ["2.2.2.2", "3.3.3.3"]
+    # The answer is attributed to the address that sent it
+    assert list(resolver_instance.get_nameserver_statistics()) == ["3.3.3.3"]
+
+    behavior.update({"2.2.2.2": "nxdomain"})
+    with pytest.raises(dns.resolver.NXDOMAIN):
+        resolver_instance._resolve_with_statistics(
+            dns_resolver, name, rdtype=dns.rdatatype.A
+        )
+
+    behavior.update({"2.2.2.2": "noerror"})
+    with pytest.raises(dns.resolver.NoAnswer):
+        resolver_instance._resolve_with_statistics(
+            dns_resolver, name, rdtype=dns.rdatatype.AAAA
+        )
+
+    behavior.update({"2.2.2.2": "timeout", "3.3.3.3": "timeout"})
+    with pytest.raises(dns.resolver.LifetimeTimeout) as exc:
+        resolver_instance._resolve_with_statistics(
+            dns_resolver, name, rdtype=dns.rdatatype.MX
+        )
+    assert [error[0] for error in exc.value.kwargs["errors"]] == [
+        "2.2.2.2",
+        "3.3.3.3",
+    ]
+
+    # Queries of the default resolver are still sent by dnspython
+    queried.clear()
+    default_resolver.resolve = MagicMock(
+        return_value=create_mock_answer(
+            dns.rrset.from_rdata(
+                "ns.example.com",
+                300,
+                dns.rdata.from_text(dns.rdataclass.IN, dns.rdatatype.A, "4.4.4.4"),
+            )
+        )
+    )
+    assert "4.4.4.4" in resolver_instance._lookup_address("ns.example.com")
+    assert default_resolver.resolve.called
+    assert queried == []
+
+
+def test_zone_transfer():
+    def ns_query(name, *nameservers):
+        return {
+            "query_target": dns.name.from_unicode(name),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "1.1.1.1",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(
+                dns.rcode.NOERROR,
+                answer=(
+                    [
+                        dns.rrset.from_rdata(
+                            name,
+                            3600,
+                            *[
+                                dns.rdata.from_text(
+                                    dns.rdataclass.IN, dns.rdatatype.NS, nameserver
+                                )
+                                for nameserver in nameservers
+                            ],
+                        )
+                    ]
+                    if nameservers
+                    else None
+                ),
+            ),
+        }
+
+    def create_udp_sequence():
+        return [
+            ns_query("com", "ns.com."),
+            ns_query("example.com", "ns1.example.com.", "ns2.example.com."),
+            ns_query("www.example.com"),
+            ns_query("cname.example.com"),
+            ns_query("other.example.com"),
+            ns_query("dname.example.com"),
+            ns_query("www.dname.example.com"),
+        ]
+
+    def rrset(name, rdtype, *values):
+        return dns.rrset.from_rdata(
+            name,
+            300,
+            *[
+                dns.rdata.from_text(dns.rdataclass.IN, rdtype, value)
+                for value in values
+            ],
+        )
+
+    def message(*rrsets):
+        result = MagicMock()
+        result.answer = list(rrsets)
+        return result
+
+    transfers = []
+    refusing = set()
+
+    def xfr(where, zone, **kwargs):
+        transfers.append((where, zone))
+        assert kwargs["relativize"] is False
+        if where in refusing:
+            raise dns.query.TransferError(dns.rcode.REFUSED)
+        yield message(
+            rrset(
+                "example.com.", dns.rdatatype.SOA, "ns1 admin 1 7200 120 2419200 300"
+            ),
+            rrset("www.example.com.", dns.rdatatype.TXT, '"a"'),
+        )
+        yield message(
+            rrset("www.example.com.", dns.rdatatype.TXT, '"b"'),
+            rrset("cname.example.com.", dns.rdatatype.CNAME, "www.example.com."),
+            rrset("*.example.com.", dns.rdatatype.TXT, '"wildcard"'),
+            rrset("dname.example.com.", dns.rdatatype.DNAME, "example.net."),
+            rrset(
+                "example.com.", dns.rdatatype.SOA, "ns1 admin 1 7200 120 2419200 300"
+            ),
+        )
+
+    addresses = {
+        "ns1.example.com.": ["1.2.3.4"],
+        "ns2.example.com.": ["2.3.4.5"],
+    }
+    mock_resolver_instance = _create_concurrent_address_resolver(
+        addresses, threading.Barrier(1)
+    )
+    with patch("dns.resolver.get_default_resolver", mock_resolver_instance):
+        with patch("dns.query.xfr", xfr):
+            with patch("dns.query.udp", mock_query_udp(create_udp_sequence())):
+                resolver_instance = ResolveDirectlyFromNameServers()
+                assert resolver_instance.get_zone("www.example.com") == "example.com."
+                result = resolver_instance.resolve_from_zone_transfer(
+                    "www.example.com", rdtype=dns.rdatatype.TXT
+                )
+                assert sorted(result) == ["ns1.example.com.", "ns2.example.com."]
+                for rrset_ in result.values():
+                    assert sorted(rdata.to_text() for rdata in rrset_) == ['"a"', '"b"']
+                assert sorted(transfers) == [
+                    ("1.2.3.4", "example.com."),
+                    ("2.3.4.5", "example.com."),
+                ]
+                # The zone is only transferred once
+                assert resolver_instance.resolve_from_zone_transfer(
+                    "www.example.com", rdtype=dns.rdatatype.A
+                ) == {"ns1.example.com.": None, "ns2.example.com.": None}
+                assert len(transfers) == 2
+                # CNAMEs have to be followed by querying
+                assert (
+                    resolver_instance.resolve_from_zone_transfer(
+                        "cname.example.com", rdtype=dns.rdatatype.TXT
+                    )
+                    is None
+                )
+                # Names covered by wildcards have to be queried
+                assert (
+                    resolver_instance.resolve_from_zone_transfer(
+                        "other.example.com", rdtype=dns.rdatatype.TXT
+                    )
+                    is None
+                )
+                # Names below a DNAME have to be queried, while the DNAME's owner exists
+                assert resolver_instance.resolve_from_zone_transfer(
+                    "dname.example.com", rdtype=dns.rdatatype.TXT
+                ) == {"ns1.example.com.": None, "ns2.example.com.": None}
+                assert (
+                    resolver_instance.resolve_from_zone_transfer(
+                        "www.dname.example.com", rdtype=dns.rdatatype.TXT
+                    )
+                    is None
+                )
+                assert len(transfers) == 2
+
+            # If one nameserver refuses the transfer, the records have to be queried
+            refusing.add("2.3.4.5")
+            with patch("dns.query.udp", mock_query_udp(create_udp_sequence())):
+                resolver_instance = ResolveDirectlyFromNameServers()
+                assert (
+                    resolver_instance.resolve_from_zone_transfer(
+                        "www.example.com", rdtype=dns.rdatatype.TXT
+                    )
+                    is None
+                )
+
+
+def test_lookup_ns_names_failover():
+    mock_resolver_instance = mock_resolver(["1.1.1.1"], {})
+
+    def ns_query(nameserver, **kwargs):
+        result = {
+            "query_target": dns.name.from_unicode("example.com"),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": nameserver,
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(
+                dns.rcode.NOERROR,
+                authority=[
+                    dns.rrset.from_rdata(
+                        "example.com",
+                        3600,
+                        dns.rdata.from_text(
+                            dns.rdataclass.IN, dns.rdatatype.NS, "ns.example.com."
+                        ),
+                    )
+                ],
+            ),
+        }
+        result.update(kwargs)
+        return result
+
+    udp_sequence = [
+        # The first nameserver times out, so the second one is asked
+        ns_query("3.3.3.3", **{"raise": dns.exception.Timeout(timeout=10)}),
+        ns_query("4.4.4.4"),
+        # The nameserver that timed out is only asked after the working one
+        ns_query("4.4.4.4", **{"raise": dns.exception.Timeout(timeout=10)}),
+        ns_query("3.3.3.3"),
+        # Both failed once; the one that answered last is preferred
+        ns_query("3.3.3.3", **{"raise": dns.exception.Timeout(timeout=10)}),
+        ns_query("4.4.4.4", **{"raise": dns.exception.Timeout(timeout=10)}),
+    ]
+    with patch("dns.resolver.get_default_resolver", mock_resolver_instance):
+        with patch("dns.resolver.Resolver", mock_resolver_instance):
+            with patch("dns.query.udp", mock_query_udp(udp_sequence)):
+                resolver_instance = ResolveDirectlyFromNameServers(
+                    timeout_retries=1, always_ask_default_resolver=False
+                )
+                for dummy in range(2):
+                    ns, cname, ttl = resolver_instance._lookup_ns_names(
+                        dns.name.from_unicode("example.com"),
+                        nameserver_ips=["3.3.3.3", "4.4.4.4"],
+                    )
+                    assert ns == ["ns.example.com."]
+                    assert cname is None
+                    assert ttl == 3600
+                # timeout_retries limits the total number of attempts
+                with pytest.raises(dns.exception.Timeout):
+                    resolver_instance._lookup_ns_names(
+                        dns.name.from_unicode("example.com"),
+                        nameserver_ips=["3.3.3.3", "4.4.4.4"],
+                    )
+                assert len(udp_sequence) == 0
+
+
+def test_address_family_reachability():
+    probe = MagicMock(side_effect=[True, False])
+    with patch.dict(resolver._REACHABLE_ADDRESS_FAMILIES, clear=True):
+        with patch(
+            "ansible_collections.community.dns.plugins.module_utils._resolver._probe_address_family",
+            probe,
+        ):
+            assert is_address_family_reachable(socket.AF_INET) is True
+            assert is_address_family_reachable(socket.AF_INET6) is False
+            # The results are cached
+            assert is_address_family_reachable(socket.AF_INET) is True
+            assert is_address_family_reachable(socket.AF_INET6) is False
+    assert probe.call_count == 2
+
+
+def test_select_addresses():
+    addresses = ["1::2", "1.2.3.4", "2::3", "2.3.4.5"]
+    with patch(
+        "ansible_collections.community.dns.plugins.module_utils._resolver.is_address_family_reachable",
+        lambda family: family == socket.AF_INET,
+    ):
+        assert select_addresses(addresses, "auto") == [
+            "1.2.3.4",
+            "2.3.4.5",
+            "1::2",
+            "2::3",
+        ]
+        assert select_addresses(addresses, "both") == addresses
+        assert select_addresses(addresses, "ipv4") == ["1.2.3.4", "2.3.4.5"]
+        assert select_addresses(addresses, "ipv6") == ["1::2", "2::3"]
+
+
+def test_address_family():
+    addresses = {
+        "ns1.example.com": ["1.2.3.4", "1::2"],
+        "ns1.example.com.": ["1.2.3.4", "1::2"],
+        "ns2.example.com": ["2::3"],
+    }
+    barrier = threading.Barrier(1)
+    mock_resolver_instance = _create_concurrent_address_resolver(addresses, barrier)
+    with patch(
+        "ansible_collections.community.dns.plugins.module_utils._resolver.is_address_family_reachable",
+        lambda family: family == socket.AF_INET6,
+    ):
+        with patch("dns.resolver.get_default_resolver", mock_resolver_instance):
+            with patch("dns.resolver.Resolver", mock_resolver_instance):
+                resolver_instance = SimpleResolver()
+                assert resolver_instance.resolve_addresses("ns1.example.com") == [
+                    "1::2",
+                    "1.2.3.4",
+                ]
+                resolver_instance = SimpleResolver(address_family="ipv4")
+                assert resolver_instance.resolve_addresses("ns1.example.com") == [
+                    "1.2.3.4",
+                ]
+                assert [
+                    call.kwargs["rdtype"]
+                    for call in resolver_instance.default_resolver.resolve.call_args_list
+                ] == [dns.rdatatype.A]
+
+                resolver_instance = ResolveDirectlyFromNameServers()
+                assert resolver_instance._get_resolver(
+                    dns.name.from_unicode("example.com"),
+                    ["ns1.example.com", "ns2.example.com"],
+                ).nameservers == ["1::2", "2::3", "1.2.3.4"]
+                resolver_instance = ResolveDirectlyFromNameServers(
+                    address_family="ipv4"
+                )
+                assert resolver_instance._get_resolver(
+                    dns.name.from_unicode("example.com"),
+                    ["ns1.example.com", "ns2.example.com"],
+                ).nameservers == ["1.2.3.4"]
+                with pytest.raises(ResolverError) as exc:
+                    resolver_instance._get_resolver(
+                        dns.name.from_unicode("example.com"), ["ns2.example.com"]
+                    )
+                assert (
+                    exc.value.args[0]
+                    == "The nameservers ns2.example.com have no addresses of the selected address family"
+                )
+                # Only the addresses of the selected family are looked up
+                assert {
+                    call.kwargs["rdtype"]
+                    for call in resolver_instance.default_resolver.resolve.call_args_list
+                } == {dns.rdatatype.A}
+
+                # Nameservers without addresses of the selected family are skipped
+                nameservers = ["ns1.example.com", "ns2.example.com"]
+                with patch.object(
+                    resolver_instance, "_lookup_ns", lambda target: nameservers
+                ):
+                    with patch.object(
+                        resolver_instance,
+                        "_resolve_with_statistics",
+                        MagicMock(return_value=None),
+                    ):
+                        assert resolver_instance.resolve(
+                            "www.example.com", rdtype=dns.rdatatype.A
+                        ) == {"ns1.example.com": None}
+                        nameservers.remove("ns1.example.com")
+                        with pytest.raises(ResolverError) as exc:
+                            resolver_instance.resolve(
+                                "www.example.com", rdtype=dns.rdatatype.A
+                            )
+                        assert (
+                            exc.value.args[0]
+                            == "The nameservers ns2.example.com have no addresses of the selected address family"
+                        )
+
+
+def test_retry_policy():
+    policy = resolver.RetryPolicy(backoff=0.1, max_backoff=0.3, jitter=0.5)
+    with patch("random.random", lambda: 0):
+        assert policy.get_delay(1) == pytest.approx(0.1)
+        assert policy.get_delay(2) == pytest.approx(0.2)
+        assert policy.get_delay(3) == pytest.approx(0.3)
+        assert policy.get_delay(4) == pytest.approx(0.3)
+    with patch("random.random", lambda: 1):
+        assert policy.get_delay(2) == pytest.approx(0.1)
+
+    now = [100.0]
+    sleep = MagicMock()
+    with patch(
+        "ansible_collections.community.dns.plugins.module_utils._resolver.monotonic",
+        lambda: now[0],
+    ):
+        with patch("time.sleep", sleep):
+            with patch("random.random", lambda: 0):
+                assert policy.get_timeout(10) == 10
+                with policy.limit_time(5):
+                    assert policy.get_timeout(10) == 5
+                    now[0] += 4.9
+                    assert policy.get_timeout(10) == pytest.approx(0.1)
+                    # The delay is capped by the remaining time
+                    policy.wait(3)
+                    sleep.assert_called_once_with(pytest.approx(0.1))
+                    now[0] += 0.1
+                    with pytest.raises(dns.exception.Timeout):
+                        policy.get_timeout(10)
+                assert policy.get_timeout(10) == 10
+
+
+def test_timeout_backoff():
+    mock_resolver_instance = mock_resolver(
+        ["1.1.1.1"],
+        {
+            ("1.1.1.1",): [
+                {
+                    "target": dns.name.from_unicode("example.com"),
+                    "rdtype": dns.rdatatype.A,
+                    "lifetime": 10,
+                    "raise": dns.exception.Timeout(timeout=10),
+                },
+                {
+                    "target": dns.name.from_unicode("example.com"),
+                    "rdtype": dns.rdatatype.A,
+                    "lifetime": 10,
+                    "raise": dns.exception.Timeout(timeout=10),
+                },
+                {
+                    "target": dns.name.from_unicode("example.com"),
+                    "rdtype": dns.rdatatype.A,
+                    "lifetime": 10,
+                    "result": create_mock_answer(rcode=dns.rcode.SERVFAIL),
+                },
+                {
+                    "target": dns.name.from_unicode("example.com"),
+                    "rdtype": dns.rdatatype.A,
+                    "lifetime": 10,
+                    "result": create_mock_answer(),
+                },
+            ],
+        },
+    )
+    sleep = MagicMock()
+    with patch("dns.resolver.get_default_resolver", mock_resolver_instance):
+        with patch("dns.resolver.Resolver", mock_resolver_instance):
+            with patch("time.sleep", sleep):
+                with patch("random.random", lambda: 0):
+                    resolver_instance = SimpleResolver(
+                        servfail_retries=1,
+                        retry_policy=resolver.RetryPolicy(backoff=0.5),
+                    )
+                    assert (
+                        resolver_instance.resolve("example.com", rdtype=dns.rdatatype.A)
+                        is None
+                    )
+    assert [call.args[0] for call in sleep.call_args_list] == [0.5, 1, 0.5]
+
+
+def _create_soa(name, ttl, minimum):
+    return dns.rrset.from_rdata(
+        name,
+        ttl,
+        dns.rdata.from_text(
+            dns.rdataclass.IN,
+            dns.rdatatype.SOA,
+            f"ns.example.com. hostmaster.example.com. 1 7200 120 2419200 {minimum}",
+        ),
+    )
+
+
+def test_negative_cache():
+    mock_resolver_instance = mock_resolver(
+        ["1.1.1.1"],
+        {
+            ("1.1.1.1",): [
+                {
+                    "target": dns.name.from_unicode("www.example.com"),
+                    "rdtype": dns.rdatatype.A,
+                    "lifetime": 10,
+                    "result": create_mock_answer(
+                        rcode=dns.rcode.NXDOMAIN,
+                        authority=[_create_soa("example.com", 3600, 300)],
+                    ),
+                },
+                {
+                    "target": dns.name.from_unicode("example.com"),
+                    "rdtype": dns.rdatatype.AAAA,
+                    "lifetime": 10,
+                    "result": create_mock_answer(
+                        authority=[_create_soa("example.com", 60, 300)],
+                    ),
+                },
+                # Without SOA, negative answers are not cached
+                {
+                    "target": dns.name.from_unicode("example.com"),
+                    "rdtype": dns.rdatatype.MX,
+                    "lifetime": 10,
+                    "result": create_mock_answer(),
+                },
+                {
+                    "target": dns.name.from_unicode("example.com"),
+                    "rdtype": dns.rdatatype.MX,
+                    "lifetime": 10,
+                    "result": create_mock_answer(),
+                },
+            ],
+            ("2.2.2.2",): [
+                {
+                    "target": dns.name.from_unicode("www.example.com"),
+                    "rdtype": dns.rdatatype.A,
+                    "lifetime": 10,
+                    "result": create_mock_answer(
+                        dns.rrset.from_rdata(
+                            "www.example.com",
+                            300,
+                            dns.rdata.from_text(
+                                dns.rdataclass.IN, dns.rdatatype.A, "1.2.3.4"
+                            ),
+                        ),
+                    ),
+                },
+            ],
+        },
+    )
+    with patch("dns.resolver.get_default_resolver", mock_resolver_instance):
+        with patch("dns.resolver.Resolver", mock_resolver_instance):
+            negative_cache = resolver.create_negative_cache()
+            resolver_instance = SimpleResolver(negative_cache=negative_cache)
+            for dummy in range(2):
+                with pytest.raises(dns.resolver.NXDOMAIN):
+                    resolver_instance.resolve(
+                        "www.example.com",
+                        rdtype=dns.rdatatype.A,
+                        nxdomain_is_empty=False,
+                    )
+                assert (
+                    resolver_instance.resolve("www.example.com", rdtype=dns.rdatatype.A)
+                    is None
+                )
+                assert (
+                    resolver_instance.resolve("example.com", rdtype=dns.rdatatype.AAAA)
+                    is None
+                )
+                assert (
+                    resolver_instance.resolve("example.com", rdtype=dns.rdatatype.MX)
+                    is None
+                )
+            # The TTL is the minimum of the SOA's TTL and its MINIMUM field
+            assert negative_cache.get_with_ttl(
+                ("www.example.com.", dns.rdatatype.A, "1.1.1.1", False)
+            ) == ("NXDOMAIN", pytest.approx(300, abs=1))
+            assert negative_cache.get_with_ttl(
+                ("example.com.", dns.rdatatype.AAAA, "1.1.1.1", False)
+            ) == ("NODATA", pytest.approx(60, abs=1))
+            # Other servers are asked again
+            rrset = resolver_instance.resolve(
+                "www.example.com", rdtype=dns.rdatatype.A, server_addresses=["2.2.2.2"]
+            )
+            assert [str(data) for data in rrset] == ["1.2.3.4"]
+
+
+def test_resolver_pool():
+    created = []
+
+    def create_resolver(configure=True):
+        mock = MagicMock()
+        mock.nameservers = ["1.1.1.1"] if configure else []
+        created.append(mock)
+        return mock
+
+    with patch("dns.resolver.Resolver", create_resolver):
+        pool = resolver.ResolverPool()
+        default = pool.get(cache_size=100)
+        assert default.nameservers == ["1.1.1.1"]
+        assert isinstance(default.cache, dns.resolver.LRUCache)
+        assert default.cache.max_size == 100
+        assert pool.get(cache_size=100) is default
+
+        servers = pool.get(["2.2.2.2", "3.3.3.3"], timeout=5)
+        assert servers.nameservers == ["2.2.2.2", "3.3.3.3"]
+        assert servers.timeout == 5
+        servers.use_edns.assert_called_once()
+        assert pool.get(["2.2.2.2", "3.3.3.3"], timeout=5) is servers
+        assert pool.get(["2.2.2.2", "3.3.3.3"], timeout=10) is not servers
+        assert len(created) == 3
+
+        resolver_instance = SimpleResolver(resolver_pool=pool, cache_size=100)
+        assert resolver_instance.default_resolver is default
+
+        pool.clear()
+        assert pool.get(cache_size=100) is not default
@@ -0,0 +1,77 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import (
+    patch,
+)
+
+from ansible_collections.community.dns.plugins.module_utils._resolver_cache import (
+    PersistentCache,
+    TTLCache,
+)
+
+
+def test_ttl_cache():
+    now = [1000.0]
+    with patch(
+        "ansible_collections.community.dns.plugins.module_utils._resolver_cache.monotonic",
+        lambda: now[0],
+    ):
+        cache = TTLCache(max_size=2, max_ttl=100)
+        cache.set("a", 1, 10)
+        cache.set("b", 2, 1000)
+        assert cache.get("a") == 1
+        assert cache.get_with_ttl("b") == (2, 100)
+        now[0] += 10
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert len(cache) == 1
+
+        # Least recently used entries are evicted
+        cache.set("c", 3, 50)
+        cache.set("d", 4, 50)
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        cache.set("e", 5, 50)
+        assert cache.get("d") is None
+        assert cache.get("c") == 3
+        assert cache.get("e") == 5
+
+
+def test_persistent_cache(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    now = [1000.0]
+    with patch("time.time", lambda: now[0]):
+        persistent_cache = PersistentCache(path)
+        persistent_cache.set("a", ["ns1.example.com", "ns2.example.com"], 60)
+        persistent_cache.set("b", None, 10)
+        assert persistent_cache.get("a") == (["ns1.example.com", "ns2.example.com"], 60)
+        assert persistent_cache.get("b") == (None, 10)
+        assert persistent_cache.get("c") is None
+        persistent_cache.close()
+
+        # Another process (or a later run) sees the same entries
+        now[0] += 30
+        persistent_cache = PersistentCache(path)
+        assert persistent_cache.get("a") == (["ns1.example.com", "ns2.example.com"], 30)
+        assert persistent_cache.get("b") is None
+
+        # A TTLCache falls back to the persistent cache
+        cache = TTLCache(persistent_cache=persistent_cache, persistent_prefix="x|")
+        cache.set(("example.com", "ns"), ["ns.example.com"], 100)
+        assert persistent_cache.get('x|["example.com", "ns"]') == (
+            ["ns.example.com"],
+            100,
+        )
+        other_cache = TTLCache(
+            persistent_cache=persistent_cache, persistent_prefix="x|", max_ttl=20
+        )
+        assert other_cache.get_with_ttl(("example.com", "ns")) == (
+            ["ns.example.com"],
+            20,
+        )
+        assert other_cache.get(("example.org", "ns")) is None
+        persistent_cache.close()
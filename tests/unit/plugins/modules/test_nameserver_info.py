@@ -4,6 +4,10 @@
 
 from __future__ import annotations
 
+import json
+import os
+import tempfile
+
 import pytest
 from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import (
     MagicMock,
@@ -16,6 +20,9 @@ from ansible_collections.community.internal_test_tools.tests.unit.plugins.module
     set_module_args,
 )
 
+from ansible_collections.community.dns.plugins.module_utils._resolver import (
+    ResolverError,
+)
 from ansible_collections.community.dns.plugins.modules import nameserver_info
 
 from ..module_utils.resolver_helper import (
@@ -123,6 +130,10 @@ class TestNameserverInfo(ModuleTestCase):
         assert exc.value.args[0]["results"][0]["nameservers"] == [
             "ns.example.com",
         ]
+        assert exc.value.args[0]["nameserver_statistics"]["1.1.1.1"]["queries"] == 3
+        assert (
+            exc.value.args[0]["nameserver_statistics"]["1.1.1.1"]["state"] == "closed"
+        )
 
     def test_single_ips(self):
         fake_query = MagicMock()
@@ -132,7 +143,7 @@ class TestNameserverInfo(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -146,7 +157,7 @@ class TestNameserverInfo(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -379,7 +390,7 @@ class TestNameserverInfo(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -393,7 +404,7 @@ class TestNameserverInfo(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -506,3 +517,94 @@ class TestNameserverInfo(ModuleTestCase):
         assert len(exc.value.args[0]["results"]) == 1
         assert exc.value.args[0]["results"][0]["name"] == "www.example.com"
         assert "nameservers" not in exc.value.args[0]["results"][0]
+
+    def test_output_file(self):
+        def resolve_nameservers(self, target, resolve_addresses=False):
+            if target == "does-not-exist.example.com":
+                raise ResolverError("foo")
+            return ["ns2.example.com", "ns1.example.com"]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "results.jsonl")
+            with patch(
+                "dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})
+            ):
+                with patch.multiple(
+                    nameserver_info.ResolveDirectlyFromNameServers,
+                    prefetch_nameservers=lambda self, targets: None,
+                    resolve_nameservers=resolve_nameservers,
+                ):
+                    with pytest.raises(AnsibleExitJson) as exc:
+                        with set_module_args(
+                            {
+                                "name": [
+                                    "www.example.com",
+                                    "does-not-exist.example.com",
+                                    "example.com",
+                                ],
+                                "output_file": path,
+                            }
+                        ):
+                            nameserver_info.main()
+
+            with open(path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+
+        print(exc.value.args[0])
+        assert "results" not in exc.value.args[0]
+        assert exc.value.args[0]["output_summary"] == {
+            "path": path,
+            "total": 3,
+            "succeeded": 2,
+            "failed": 1,
+            "failed_names": ["does-not-exist.example.com"],
+        }
+        assert lines == [
+            {
+                "name": "www.example.com",
+                "nameservers": ["ns1.example.com", "ns2.example.com"],
+            },
+            {
+                "name": "does-not-exist.example.com",
+                "error": "Unexpected resolving error: foo",
+            },
+            {
+                "name": "example.com",
+                "nameservers": ["ns1.example.com", "ns2.example.com"],
+            },
+        ]
+
+    def test_output_file_check_mode(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "results.jsonl")
+            with patch(
+                "dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})
+            ):
+                with patch.multiple(
+                    nameserver_info.ResolveDirectlyFromNameServers,
+                    prefetch_nameservers=lambda self, targets: None,
+                    resolve_nameservers=lambda self, target, resolve_addresses=False: [
+                        "ns.example.com"
+                    ],
+                ):
+                    with pytest.raises(AnsibleExitJson) as exc:
+                        with set_module_args(
+                            {
+                                "name": ["www.example.com"],
+                                "output_file": path,
+                                "_ansible_check_mode": True,
+                            }
+                        ):
+                            nameserver_info.main()
+
+            # The file is not written in check mode
+            assert not os.path.exists(path)
+
+        print(exc.value.args[0])
+        assert exc.value.args[0]["output_summary"] == {
+            "path": path,
+            "total": 1,
+            "succeeded": 1,
+            "failed": 0,
+            "failed_names": [],
+        }
@@ -4,6 +4,10 @@
 
 from __future__ import annotations
 
+import json
+import os
+import tempfile
+
 import pytest
 from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import (
     MagicMock,
@@ -42,7 +46,7 @@ class TestNameserverRecordInfo(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -56,7 +60,7 @@ class TestNameserverRecordInfo(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -70,7 +74,7 @@ class TestNameserverRecordInfo(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.org",
+                        "target": dns.name.from_unicode("ns.example.org"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -84,7 +88,7 @@ class TestNameserverRecordInfo(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.org",
+                        "target": dns.name.from_unicode("ns.example.org"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -307,7 +311,7 @@ class TestNameserverRecordInfo(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 9,
                         "result": create_mock_answer(
@@ -321,7 +325,7 @@ class TestNameserverRecordInfo(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 9,
                         "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -496,7 +500,7 @@ class TestNameserverRecordInfo(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -510,7 +514,7 @@ class TestNameserverRecordInfo(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -606,7 +610,7 @@ class TestNameserverRecordInfo(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -620,7 +624,7 @@ class TestNameserverRecordInfo(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -750,7 +754,7 @@ class TestNameserverRecordInfo(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -764,13 +768,13 @@ class TestNameserverRecordInfo(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "raise": dns.resolver.NoAnswer(response=fake_query),
                     },
                     {
-                        "target": "ns.example.org",
+                        "target": dns.name.from_unicode("ns.example.org"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -784,7 +788,7 @@ class TestNameserverRecordInfo(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.org",
+                        "target": dns.name.from_unicode("ns.example.org"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -933,6 +937,153 @@ class TestNameserverRecordInfo(ModuleTestCase):
         assert exc.value.args[0]["results"][0]["name"] == "www.example.com"
         assert exc.value.args[0]["results"][0]["result"] == []
 
+    def test_types(self):
+        resolver = mock_resolver(
+            ["1.1.1.1"],
+            {
+                # The addresses of the nameserver are only looked up once
+                ("1.1.1.1",): [
+                    {
+                        "target": dns.name.from_unicode("ns.example.com"),
+                        "rdtype": dns.rdatatype.A,
+                        "lifetime": 10,
+                        "result": create_mock_answer(
+                            dns.rrset.from_rdata(
+                                "ns.example.com",
+                                300,
+                                dns.rdata.from_text(
+                                    dns.rdataclass.IN, dns.rdatatype.A, "3.3.3.3"
+                                ),
+                            )
+                        ),
+                    },
+                    {
+                        "target": dns.name.from_unicode("ns.example.com"),
+                        "rdtype": dns.rdatatype.AAAA,
+                        "lifetime": 10,
+                        "result": create_mock_answer(),
+                    },
+                ],
+                ("3.3.3.3",): [
+                    {
+                        "target": dns.name.from_unicode("example.com"),
+                        "rdtype": dns.rdatatype.A,
+                        "lifetime": 10,
+                        "result": create_mock_answer(
+                            dns.rrset.from_rdata(
+                                "example.com",
+                                300,
+                                dns.rdata.from_text(
+                                    dns.rdataclass.IN, dns.rdatatype.A, "5.5.5.5"
+                                ),
+                            )
+                        ),
+                    },
+                    {
+                        "target": dns.name.from_unicode("example.com"),
+                        "rdtype": dns.rdatatype.MX,
+                        "lifetime": 10,
+                        "result": create_mock_answer(
+                            dns.rrset.from_rdata(
+                                "example.com",
+                                300,
+                                dns.rdata.from_text(
+                                    dns.rdataclass.IN,
+                                    dns.rdatatype.MX,
+                                    "10 mail.example.com.",
+                                ),
+                            )
+                        ),
+                    },
+                ],
+            },
+        )
+        # The nameservers are only looked up once
+        udp_sequence = [
+            {
+                "query_target": dns.name.from_unicode("com"),
+                "query_type": dns.rdatatype.NS,
+                "nameserver": "1.1.1.1",
+                "kwargs": {
+                    "timeout": 10,
+                },
+                "result": create_mock_response(dns.rcode.NOERROR),
+            },
+            {
+                "query_target": dns.name.from_unicode("example.com"),
+                "query_type": dns.rdatatype.NS,
+                "nameserver": "1.1.1.1",
+                "kwargs": {
+                    "timeout": 10,
+                },
+                "result": create_mock_response(
+                    dns.rcode.NOERROR,
+                    answer=[
+                        dns.rrset.from_rdata(
+                            "example.com",
+                            3600,
+                            dns.rdata.from_text(
+                                dns.rdataclass.IN, dns.rdatatype.NS, "ns.example.com"
+                            ),
+                        )
+                    ],
+                ),
+            },
+        ]
+        with patch("dns.resolver.get_default_resolver", resolver):
+            with patch("dns.resolver.Resolver", resolver):
+                with patch("dns.query.udp", mock_query_udp(udp_sequence)):
+                    with pytest.raises(AnsibleExitJson) as exc:
+                        with set_module_args(
+                            {
+                                "name": ["example.com"],
+                                "types": ["A", "MX", "A"],
+                            }
+                        ):
+                            nameserver_record_info.main()
+
+        print(exc.value.args[0])
+        assert exc.value.args[0]["changed"] is False
+        assert exc.value.args[0]["results"] == [
+            {
+                "name": "example.com",
+                "result_by_type": {
+                    "A": [
+                        {
+                            "nameserver": "ns.example.com",
+                            "entries": [
+                                {"address": "5.5.5.5"},
+                            ],
+                        },
+                    ],
+                    "MX": [
+                        {
+                            "nameserver": "ns.example.com",
+                            "entries": [
+                                {"exchange": "mail.example.com.", "preference": 10},
+                            ],
+                        },
+                    ],
+                },
+            },
+        ]
+
+    def test_type_and_types(self):
+        with pytest.raises(AnsibleFailJson) as exc:
+            with set_module_args(
+                {
+                    "name": ["www.example.com"],
+                    "type": "A",
+                    "types": ["A"],
+                }
+            ):
+                nameserver_record_info.main()
+
+        print(exc.value.args[0])
+        assert (
+            exc.value.args[0]["msg"] == "parameters are mutually exclusive: type|types"
+        )
+
     def test_unsupported_type(self):
         with patch_dict(nameserver_record_info.NAME_TO_REQUIRED_VERSION, "A", "1.2.3"):
             with patch_dict_absent(nameserver_record_info.NAME_TO_RDTYPE, "A"):
@@ -950,3 +1101,74 @@ class TestNameserverRecordInfo(ModuleTestCase):
             exc.value.args[0]["msg"]
             == "Your dnspython version does not support A records. You need version 1.2.3 or newer."
         )
+
+    def test_invalid_max_concurrency(self):
+        with pytest.raises(AnsibleFailJson) as exc:
+            with set_module_args(
+                {
+                    "name": ["www.example.com"],
+                    "type": "A",
+                    "max_concurrency": 0,
+                }
+            ):
+                nameserver_record_info.main()
+
+        print(exc.value.args[0])
+        assert exc.value.args[0]["msg"] == "max_concurrency must be at least 1"
+
+    def test_output_file(self):
+        def resolve(self, target, rdtype, **kwargs):
+            if target == "does-not-exist.example.com":
+                raise dns.exception.Timeout(timeout=10)
+            return {
+                "ns.example.com": dns.rrset.from_rdata(
+                    target,
+                    300,
+                    dns.rdata.from_text(dns.rdataclass.IN, rdtype, "1.2.3.4"),
+                ),
+            }
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "results.jsonl")
+            with patch(
+                "dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})
+            ):
+                with patch.multiple(
+                    nameserver_record_info.ResolveDirectlyFromNameServers,
+                    prefetch_nameservers=lambda self, targets: None,
+                    resolve=resolve,
+                ):
+                    with pytest.raises(AnsibleExitJson) as exc:
+                        with set_module_args(
+                            {
+                                "name": [
+                                    "does-not-exist.example.com",
+                                    "www.example.com",
+                                ],
+                                "types": ["A"],
+                                "output_file": path,
+                            }
+                        ):
+                            nameserver_record_info.main()
+
+            with open(path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+
+        print(exc.value.args[0])
+        assert "results" not in exc.value.args[0]
+        assert exc.value.args[0]["output_summary"]["total"] == 2
+        assert exc.value.args[0]["output_summary"]["failed_names"] == [
+            "does-not-exist.example.com"
+        ]
+        assert lines[0]["error"].startswith("Unexpected DNS error: ")
+        assert lines[1] == {
+            "name": "www.example.com",
+            "result_by_type": {
+                "A": [
+                    {
+                        "nameserver": "ns.example.com",
+                        "entries": [{"address": "1.2.3.4"}],
+                    },
+                ],
+            },
+        }
@@ -4,6 +4,8 @@
 
 from __future__ import annotations
 
+import threading
+
 import pytest
 from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import (
     MagicMock,
@@ -52,7 +54,7 @@ class TestWaitForTXT(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -66,7 +68,7 @@ class TestWaitForTXT(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -80,7 +82,7 @@ class TestWaitForTXT(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.org",
+                        "target": dns.name.from_unicode("ns.example.org"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -94,7 +96,7 @@ class TestWaitForTXT(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.org",
+                        "target": dns.name.from_unicode("ns.example.org"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -283,6 +285,15 @@ class TestWaitForTXT(ModuleTestCase):
         }
         assert exc.value.args[0]["records"][0]["check_count"] == 1
 
+    # Freeze the clocks, so that the time limit of every DNS query is exactly the module's timeout
+    @patch(
+        "ansible_collections.community.dns.plugins.module_utils._resolver.monotonic",
+        lambda: 0,
+    )
+    @patch(
+        "ansible_collections.community.dns.plugins.modules.wait_for_txt.monotonic",
+        lambda: 0,
+    )
     def test_double(self):
         fake_query = MagicMock()
         fake_query.question = "Doctor Who?"
@@ -291,7 +302,7 @@ class TestWaitForTXT(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -305,7 +316,7 @@ class TestWaitForTXT(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -520,7 +531,7 @@ class TestWaitForTXT(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -534,7 +545,7 @@ class TestWaitForTXT(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -690,7 +701,7 @@ class TestWaitForTXT(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -704,7 +715,7 @@ class TestWaitForTXT(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -914,7 +925,7 @@ class TestWaitForTXT(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -928,7 +939,7 @@ class TestWaitForTXT(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -1080,7 +1091,7 @@ class TestWaitForTXT(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -1094,7 +1105,7 @@ class TestWaitForTXT(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -1247,7 +1258,7 @@ class TestWaitForTXT(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -1261,7 +1272,7 @@ class TestWaitForTXT(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -1409,6 +1420,11 @@ class TestWaitForTXT(ModuleTestCase):
         }
         assert exc.value.args[0]["records"][0]["check_count"] == 4
 
+    # Freeze the clock used for the time limits of the DNS queries
+    @patch(
+        "ansible_collections.community.dns.plugins.module_utils._resolver.monotonic",
+        lambda: 0,
+    )
     def test_timeout(self):
         fake_query = MagicMock()
         fake_query.question = "Doctor Who?"
@@ -1417,7 +1433,7 @@ class TestWaitForTXT(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -1431,7 +1447,7 @@ class TestWaitForTXT(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -1469,7 +1485,7 @@ class TestWaitForTXT(ModuleTestCase):
                     {
                         "target": dns.name.from_unicode("www.example.com"),
                         "rdtype": dns.rdatatype.TXT,
-                        "lifetime": 10,
+                        "lifetime": 12 - 6.013,
                         "result": create_mock_answer(
                             dns.rrset.from_rdata(
                                 "www.example.com",
@@ -1642,15 +1658,20 @@ class TestWaitForTXT(ModuleTestCase):
         }
         assert exc.value.args[0]["records"][1]["check_count"] == 1
 
+    # Freeze the clock used for the time limits of the DNS queries
+    @patch(
+        "ansible_collections.community.dns.plugins.module_utils._resolver.monotonic",
+        lambda: 0,
+    )
     def test_nxdomain(self):
         resolver = mock_resolver(
             ["1.1.1.1"],
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
-                        "lifetime": 10,
+                        "lifetime": 2 - 0.01,
                         "result": create_mock_answer(
                             dns.rrset.from_rdata(
                                 "ns.example.com",
@@ -1662,9 +1683,9 @@ class TestWaitForTXT(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
-                        "lifetime": 10,
+                        "lifetime": 2 - 0.01,
                         "result": create_mock_answer(
                             dns.rrset.from_rdata(
                                 "ns.example.com",
@@ -1680,7 +1701,7 @@ class TestWaitForTXT(ModuleTestCase):
                     {
                         "target": dns.name.from_unicode("www.example.com"),
                         "rdtype": dns.rdatatype.TXT,
-                        "lifetime": 10,
+                        "lifetime": 2 - 0.01,
                         "result": create_mock_answer(rcode=dns.rcode.NXDOMAIN),
                     },
                     {
@@ -1698,7 +1719,7 @@ class TestWaitForTXT(ModuleTestCase):
                 "query_type": dns.rdatatype.NS,
                 "nameserver": "1.1.1.1",
                 "kwargs": {
-                    "timeout": 10,
+                    "timeout": 2 - 0.01,
                 },
                 "result": create_mock_response(dns.rcode.NXDOMAIN),
             },
@@ -1707,7 +1728,7 @@ class TestWaitForTXT(ModuleTestCase):
                 "query_type": dns.rdatatype.NS,
                 "nameserver": "1.1.1.1",
                 "kwargs": {
-                    "timeout": 10,
+                    "timeout": 2 - 0.01,
                 },
                 "result": create_mock_response(
                     dns.rcode.NOERROR,
@@ -1727,7 +1748,7 @@ class TestWaitForTXT(ModuleTestCase):
                 "query_type": dns.rdatatype.NS,
                 "nameserver": "1.1.1.1",
                 "kwargs": {
-                    "timeout": 10,
+                    "timeout": 2 - 0.01,
                 },
                 "result": create_mock_response(dns.rcode.NXDOMAIN),
             },
@@ -1769,6 +1790,346 @@ class TestWaitForTXT(ModuleTestCase):
         assert exc.value.args[0]["records"][0]["entries"]["ns.example.com"] == []
         assert exc.value.args[0]["records"][0]["check_count"] == 2
 
+    def test_round_time_limit(self):
+        resolver = mock_resolver(["1.1.1.1"], {})
+        udp_sequence = [
+            {
+                "query_target": dns.name.from_unicode("com"),
+                "query_type": dns.rdatatype.NS,
+                "nameserver": "1.1.1.1",
+                "kwargs": {
+                    "timeout": 10,
+                },
+                "raise": dns.exception.Timeout(timeout=10),
+            },
+        ]
+        with patch("dns.resolver.get_default_resolver", resolver):
+            with patch("dns.resolver.Resolver", resolver):
+                with patch("dns.query.udp", mock_query_udp(udp_sequence)):
+                    with patch("time.sleep", mock_sleep):
+                        with patch(
+                            "ansible_collections.community.dns.plugins.modules.wait_for_txt.monotonic",
+                            mock_monotonic([0, 0.01, 20.5]),
+                        ):
+                            with pytest.raises(AnsibleFailJson) as exc:
+                                with set_module_args(
+                                    {
+                                        "records": [
+                                            {
+                                                "name": "www.example.com",
+                                                "values": [
+                                                    "asdf",
+                                                ],
+                                            },
+                                        ],
+                                        "query_retry": 0,
+                                        "timeout": 20,
+                                    }
+                                ):
+                                    wait_for_txt.main()
+
+        print(exc.value.args[0])
+        assert exc.value.args[0]["failed"] is True
+        assert exc.value.args[0]["msg"] == "Timeout (0 out of 1 check(s) passed)."
+        assert exc.value.args[0]["completed"] == 0
+        assert exc.value.args[0]["records"][0]["check_count"] == 0
+
+    def test_concurrent_checks(self):
+        # The three records of the first round must be checked at the same time,
+        # otherwise the barrier breaks
+        barrier = threading.Barrier(3, timeout=10)
+        lookups = []
+
+        def lookup(resolver, name):
+            first_round = len(lookups) < 3
+            lookups.append(name)
+            if first_round:
+                barrier.wait()
+            if first_round and name == "b.example.com":
+                return {"ns.example.com": []}
+            return {"ns.example.com": ["asdf"]}
+
+        with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+            with patch(
+                "ansible_collections.community.dns.plugins.modules.wait_for_txt.lookup",
+                lookup,
+            ):
+                with patch("time.sleep", mock_sleep):
+                    with pytest.raises(AnsibleExitJson) as exc:
+                        with set_module_args(
+                            {
+                                "records": [
+                                    {
+                                        "name": name,
+                                        "values": [
+                                            "asdf",
+                                        ],
+                                    }
+                                    for name in [
+                                        "a.example.com",
+                                        "b.example.com",
+                                        "c.example.com",
+                                    ]
+                                ],
+                                "max_concurrency": 3,
+                            }
+                        ):
+                            wait_for_txt.main()
+
+        print(exc.value.args[0])
+        assert exc.value.args[0]["msg"] == "All checks passed"
+        assert exc.value.args[0]["completed"] == 3
+        assert [record["check_count"] for record in exc.value.args[0]["records"]] == [
+            1,
+            2,
+            1,
+        ]
+        # The second round only checks the remaining record
+        assert lookups[3:] == ["b.example.com"]
+
+    def test_converged_nameservers_skip(self):
+        self._test_converged_nameservers(
+            "skip", [[], ["ns1.example.com"], ["ns1.example.com"]]
+        )
+
+    def test_converged_nameservers_confirm(self):
+        self._test_converged_nameservers(
+            "confirm", [[], ["ns1.example.com"], ["ns1.example.com"], None]
+        )
+
+    def _test_converged_nameservers(self, converged_nameservers, expected_lookups):
+        # ns1 has the value right away, ns2 only in the third round
+        answers = [
+            {"ns1.example.com": ["asdf"], "ns2.example.com": []},
+            {"ns2.example.com": ["foo"]},
+            {"ns2.example.com": ["asdf", "foo"]},
+            {"ns1.example.com": ["asdf"], "ns2.example.com": ["asdf", "foo"]},
+        ]
+        lookups = []
+
+        def lookup(resolver, name, exclude_nameservers=None):
+            lookups.append(exclude_nameservers)
+            return answers[len(lookups) - 1]
+
+        with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+            with patch(
+                "ansible_collections.community.dns.plugins.modules.wait_for_txt.lookup",
+                lookup,
+            ):
+                with patch("time.sleep", mock_sleep):
+                    with pytest.raises(AnsibleExitJson) as exc:
+                        with set_module_args(
+                            {
+                                "records": [
+                                    {
+                                        "name": "www.example.com",
+                                        "values": [
+                                            "asdf",
+                                        ],
+                                    },
+                                ],
+                                "converged_nameservers": converged_nameservers,
+                            }
+                        ):
+                            wait_for_txt.main()
+
+        print(exc.value.args[0])
+        assert exc.value.args[0]["msg"] == "All checks passed"
+        assert exc.value.args[0]["records"][0]["check_count"] == 3
+        assert exc.value.args[0]["records"][0]["entries"] == {
+            "ns1.example.com": ["asdf"],
+            "ns2.example.com": ["asdf", "foo"],
+        }
+        assert lookups == expected_lookups
+
+    def test_check_serial(self):
+        serials = [
+            {"ns1.example.com": 1, "ns2.example.com": 1},
+            # Only ns1 has a new serial
+            {"ns1.example.com": 2, "ns2.example.com": 1},
+            # Nothing changed
+            {"ns1.example.com": 2, "ns2.example.com": 1},
+            # ns2 did not change its serial, but has new values
+            {"ns1.example.com": 2, "ns2.example.com": 1},
+        ]
+        answers = [
+            {"ns1.example.com": [], "ns2.example.com": []},
+            {"ns1.example.com": ["asdf"]},
+            {},
+            {"ns1.example.com": ["asdf"], "ns2.example.com": ["asdf"]},
+        ]
+        soa_queries = []
+        lookups = []
+
+        def resolve(self, target, rdtype, **kwargs):
+            assert rdtype == dns.rdatatype.SOA
+            soa_queries.append(target)
+            return {
+                nameserver: dns.rrset.from_rdata(
+                    "example.com",
+                    3600,
+                    dns.rdata.from_text(
+                        dns.rdataclass.IN,
+                        dns.rdatatype.SOA,
+                        f"ns1.example.com. hostmaster.example.com. {serial} 1 1 1 1",
+                    ),
+                )
+                for nameserver, serial in serials[len(soa_queries) - 1].items()
+            }
+
+        def lookup(resolver, name, exclude_nameservers=None):
+            lookups.append((name, exclude_nameservers))
+            return answers[len(soa_queries) - 1]
+
+        with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+            with patch.multiple(
+                wait_for_txt.ResolveDirectlyFromNameServers,
+                get_zone=lambda self, target: "example.com",
+                resolve=resolve,
+            ):
+                with patch(
+                    "ansible_collections.community.dns.plugins.modules.wait_for_txt.lookup",
+                    lookup,
+                ):
+                    with patch("time.sleep", mock_sleep):
+                        with pytest.raises(AnsibleExitJson) as exc:
+                            with set_module_args(
+                                {
+                                    "records": [
+                                        {
+                                            "name": name,
+                                            "values": [
+                                                "asdf",
+                                            ],
+                                        }
+                                        for name in [
+                                            "a.example.com",
+                                            "b.example.com",
+                                        ]
+                                    ],
+                                    "check_serial": True,
+                                    "serial_recheck_rounds": 2,
+                                }
+                            ):
+                                wait_for_txt.main()
+
+        print(exc.value.args[0])
+        assert exc.value.args[0]["msg"] == "All checks passed"
+        assert exc.value.args[0]["completed"] == 2
+        # A single SOA query per round for both records
+        assert soa_queries == ["example.com"] * 4
+        expected_excludes = [
+            [],
+            ["ns2.example.com"],
+            ["ns1.example.com", "ns2.example.com"],
+            # After two rounds without querying all nameservers, all of them are queried
+            [],
+        ]
+        assert lookups == [
+            (name, exclude)
+            for exclude in expected_excludes
+            for name in ["a.example.com", "b.example.com"]
+        ]
+        for record in exc.value.args[0]["records"]:
+            assert record["check_count"] == 4
+
+    def test_notify_listen(self):
+        listeners = []
+
+        class FakeNotifyListener:
+            def __init__(self, address, port):
+                self.address = address
+                self.port = port
+                self.waits = []
+                self.closed = False
+                listeners.append(self)
+
+            def wait(self, names, timeout):
+                self.waits.append((names, timeout))
+                return True
+
+            def close(self):
+                self.closed = True
+
+        answers = [
+            {"ns.example.com": []},
+            {"ns.example.com": []},
+            {"ns.example.com": ["asdf"]},
+            {"ns.example.com": ["asdf"]},
+        ]
+
+        def lookup(resolver, name):
+            return answers.pop(0)
+
+        def sleep(delay):
+            raise AssertionError("time.sleep() must not be called")
+
+        with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+            with patch(
+                "ansible_collections.community.dns.plugins.modules.wait_for_txt.lookup",
+                lookup,
+            ):
+                with patch(
+                    "ansible_collections.community.dns.plugins.modules.wait_for_txt.NotifyListener",
+                    FakeNotifyListener,
+                ):
+                    with patch("time.sleep", sleep):
+                        with pytest.raises(AnsibleExitJson) as exc:
+                            with set_module_args(
+                                {
+                                    "records": [
+                                        {
+                                            "name": name,
+                                            "values": [
+                                                "asdf",
+                                            ],
+                                        }
+                                        for name in [
+                                            "a.example.com",
+                                            "b.example.com",
+                                        ]
+                                    ],
+                                    "notify_listen": {
+                                        "address": "127.0.0.1",
+                                        "port": 5353,
+                                    },
+                                }
+                            ):
+                                wait_for_txt.main()
+
+        print(exc.value.args[0])
+        assert exc.value.args[0]["msg"] == "All checks passed"
+        assert len(listeners) == 1
+        assert listeners[0].address == "127.0.0.1"
+        assert listeners[0].port == 5353
+        assert listeners[0].waits == [(["a.example.com", "b.example.com"], 2)]
+        assert listeners[0].closed is True
+
+    def test_notify_listen_fail(self):
+        with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+            with pytest.raises(AnsibleFailJson) as exc:
+                with set_module_args(
+                    {
+                        "records": [
+                            {
+                                "name": "www.example.com",
+                                "values": [
+                                    "asdf",
+                                ],
+                            },
+                        ],
+                        "notify_listen": {
+                            "address": "foo",
+                        },
+                    }
+                ):
+                    wait_for_txt.main()
+
+        print(exc.value.args[0])
+        assert exc.value.args[0]["msg"].startswith(
+            "Cannot listen for NOTIFY messages on foo port 53: "
+        )
+
     def test_servfail(self):
         resolver = mock_resolver(["1.1.1.1"], {})
         udp_sequence = [
@@ -1822,7 +2183,7 @@ class TestWaitForTXT(ModuleTestCase):
             {
                 ("1.1.1.1",): [
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -1836,13 +2197,13 @@ class TestWaitForTXT(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.com",
+                        "target": dns.name.from_unicode("ns.example.com"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "raise": dns.resolver.NoAnswer(response=fake_query),
                     },
                     {
-                        "target": "ns.example.org",
+                        "target": dns.name.from_unicode("ns.example.org"),
                         "rdtype": dns.rdatatype.A,
                         "lifetime": 10,
                         "result": create_mock_answer(
@@ -1856,7 +2217,7 @@ class TestWaitForTXT(ModuleTestCase):
                         ),
                     },
                     {
-                        "target": "ns.example.org",
+                        "target": dns.name.from_unicode("ns.example.org"),
                         "rdtype": dns.rdatatype.AAAA,
                         "lifetime": 10,
                         "raise": dns.resolver.NoAnswer(response=fake_query),
@@ -0,0 +1,426 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import pytest
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import (
+    patch,
+)
+from ansible_collections.community.internal_test_tools.tests.unit.plugins.modules.utils import (
+    AnsibleExitJson,
+    AnsibleFailJson,
+    ModuleTestCase,
+    set_module_args,
+)
+
+from ansible_collections.community.dns.plugins.modules import wait_for_zone_serial
+
+from ..module_utils.resolver_helper import (
+    create_mock_answer,
+    create_mock_response,
+    mock_query_udp,
+    mock_resolver,
+)
+
+# We need dnspython
+dns = pytest.importorskip("dns")
+
+
+def mock_sleep(delay):
+    pass
+
+
+def mock_get_zone(self, target):
+    # All names in these tests are zone apexes
+    return f"{target}."
+
+
+def mock_monotonic(call_sequence):
+    def f():
+        assert len(call_sequence) > 0, "monotonic() was called more often than expected"
+        value = call_sequence[0]
+        del call_sequence[0]
+        return value
+
+    return f
+
+
+def create_soa(name, serial):
+    return dns.rrset.from_rdata(
+        name,
+        3600,
+        dns.rdata.from_text(
+            dns.rdataclass.IN,
+            dns.rdatatype.SOA,
+            f"ns1.{name}. hostmaster.{name}. {serial} 7200 120 2419200 10800",
+        ),
+    )
+
+
+def create_address_sequence(nameservers):
+    result = []
+    for name, address in nameservers:
+        result.extend(
+            [
+                {
+                    "target": dns.name.from_unicode(name),
+                    "rdtype": dns.rdatatype.A,
+                    "lifetime": 10,
+                    "result": create_mock_answer(
+                        dns.rrset.from_rdata(
+                            name,
+                            300,
+                            dns.rdata.from_text(
+                                dns.rdataclass.IN, dns.rdatatype.A, address
+                            ),
+                        )
+                    ),
+                },
+                {
+                    "target": dns.name.from_unicode(name),
+                    "rdtype": dns.rdatatype.AAAA,
+                    "lifetime": 10,
+                    "result": create_mock_answer(),
+                },
+            ]
+        )
+    return result
+
+
+def create_ns_sequence(zone, nameservers):
+    return [
+        {
+            "query_target": dns.name.from_unicode(zone.split(".", 1)[1]),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "1.1.1.1",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(dns.rcode.NOERROR),
+        },
+        {
+            "query_target": dns.name.from_unicode(zone),
+            "query_type": dns.rdatatype.NS,
+            "nameserver": "1.1.1.1",
+            "kwargs": {
+                "timeout": 10,
+            },
+            "result": create_mock_response(
+                dns.rcode.NOERROR,
+                answer=[
+                    dns.rrset.from_rdata(
+                        zone,
+                        3600,
+                        *[
+                            dns.rdata.from_text(
+                                dns.rdataclass.IN, dns.rdatatype.NS, nameserver
+                            )
+                            for nameserver in nameservers
+                        ],
+                    )
+                ],
+            ),
+        },
+    ]
+
+
+def create_soa_query(zone, serial):
+    return {
+        "target": dns.name.from_unicode(zone),
+        "rdtype": dns.rdatatype.SOA,
+        "lifetime": 10,
+        "result": create_mock_answer(create_soa(zone, serial)),
+    }
+
+
+def test_serial_reached():
+    assert wait_for_zone_serial.serial_reached(5, 5)
+    assert wait_for_zone_serial.serial_reached(6, 5)
+    assert not wait_for_zone_serial.serial_reached(4, 5)
+    # Serials wrap around
+    assert wait_for_zone_serial.serial_reached(1, 2**32 - 1)
+    assert not wait_for_zone_serial.serial_reached(2**32 - 1, 1)
+    assert not wait_for_zone_serial.serial_reached(5 + 2**31, 5)
+
+
+class TestWaitForZoneSerial(ModuleTestCase):
+    def test_serial(self):
+        resolver = mock_resolver(
+            ["1.1.1.1"],
+            {
+                ("1.1.1.1",): create_address_sequence(
+                    [
+                        ("ns1.example.com", "3.3.3.1"),
+                        ("ns2.example.com", "3.3.3.2"),
+                    ]
+                ),
+                ("3.3.3.1",): [
+                    create_soa_query("example.com", 2024010101),
+                    create_soa_query("example.com", 2024010101),
+                ],
+                ("3.3.3.2",): [
+                    # ns2 is lagging behind in the first round
+                    create_soa_query("example.com", 2023123101),
+                    create_soa_query("example.com", 2024010102),
+                ],
+            },
+        )
+        udp_sequence = create_ns_sequence(
+            "example.com", ["ns1.example.com", "ns2.example.com"]
+        )
+        with patch("dns.resolver.get_default_resolver", resolver):
+            with patch("dns.resolver.Resolver", resolver):
+                with patch("dns.query.udp", mock_query_udp(udp_sequence)):
+                    with patch("time.sleep", mock_sleep):
+                        with pytest.raises(AnsibleExitJson) as exc:
+                            with set_module_args(
+                                {
+                                    "zones": [
+                                        {
+                                            "name": "example.com",
+                                            "serial": 2024010101,
+                                        },
+                                    ],
+                                }
+                            ):
+                                wait_for_zone_serial.main()
+
+        print(exc.value.args[0])
+        assert exc.value.args[0]["changed"] is False
+        assert exc.value.args[0]["msg"] == "All checks passed"
+        assert exc.value.args[0]["completed"] == 1
+        assert exc.value.args[0]["zones"] == [
+            {
+                "name": "example.com",
+                "done": True,
+                "serial": 2024010101,
+                "serials": {
+                    "ns1.example.com": 2024010101,
+                    "ns2.example.com": 2024010102,
+                },
+                "check_count": 2,
+            },
+        ]
+
+    def test_most_recent_serial(self):
+        serials = [
+            {"ns1.example.com": 10, "ns2.example.com": 12, "ns3.example.com": None},
+            {"ns1.example.com": 12, "ns2.example.com": 13, "ns3.example.com": 11},
+            {"ns1.example.com": 12, "ns2.example.com": 13, "ns3.example.com": 12},
+        ]
+
+        def lookup_serials(resolver, zone):
+            assert zone == "example.com"
+            return serials.pop(0)
+
+        with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+            with patch(
+                "ansible_collections.community.dns.plugins.modules.wait_for_zone_serial.lookup_serials",
+                lookup_serials,
+            ), patch(
+                "ansible_collections.community.dns.plugins.module_utils._resolver.ResolveDirectlyFromNameServers.get_zone",
+                mock_get_zone,
+            ):
+                with patch("time.sleep", mock_sleep):
+                    with pytest.raises(AnsibleExitJson) as exc:
+                        with set_module_args(
+                            {
+                                "zones": [
+                                    {
+                                        "name": "example.com",
+                                    },
+                                ],
+                            }
+                        ):
+                            wait_for_zone_serial.main()
+
+        print(exc.value.args[0])
+        assert exc.value.args[0]["msg"] == "All checks passed"
+        # The highest serial of the first round is used
+        assert exc.value.args[0]["zones"][0]["serial"] == 12
+        assert exc.value.args[0]["zones"][0]["check_count"] == 3
+        assert serials == []
+
+    def test_timeout(self):
+        def lookup_serials(resolver, zone):
+            return {"ns1.example.com": 1, "ns2.example.com": None}
+
+        with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+            with patch(
+                "ansible_collections.community.dns.plugins.modules.wait_for_zone_serial.lookup_serials",
+                lookup_serials,
+            ), patch(
+                "ansible_collections.community.dns.plugins.module_utils._resolver.ResolveDirectlyFromNameServers.get_zone",
+                mock_get_zone,
+            ):
+                with patch("time.sleep", mock_sleep):
+                    with patch(
+                        "ansible_collections.community.dns.plugins.modules.wait_for_zone_serial.monotonic",
+                        mock_monotonic([0, 0.01, 1.2, 5.5]),
+                    ):
+                        with pytest.raises(AnsibleFailJson) as exc:
+                            with set_module_args(
+                                {
+                                    "zones": [
+                                        {
+                                            "name": "example.com",
+                                            "serial": 1,
+                                        },
+                                        {
+                                            "name": "example.org",
+                                            "serial": 1,
+                                        },
+                                    ],
+                                    "timeout": 5,
+                                }
+                            ):
+                                wait_for_zone_serial.main()
+
+        print(exc.value.args[0])
+        assert exc.value.args[0]["msg"] == "Timeout (0 out of 2 check(s) passed)."
+        assert exc.value.args[0]["completed"] == 0
+        assert [zone["check_count"] for zone in exc.value.args[0]["zones"]] == [2, 2]
+        assert exc.value.args[0]["zones"][0]["serials"] == {
+            "ns1.example.com": 1,
+            "ns2.example.com": None,
+        }
+
+    def test_timeout_zero(self):
+        resolver = mock_resolver(
+            ["1.1.1.1"],
+            {
+                ("1.1.1.1",): create_address_sequence([("ns1.example.com", "3.3.3.1")]),
+                ("3.3.3.1",): [create_soa_query("example.com", 2023123101)],
+            },
+        )
+        udp_sequence = create_ns_sequence("example.com", ["ns1.example.com"])
+        with patch("dns.resolver.get_default_resolver", resolver):
+            with patch("dns.resolver.Resolver", resolver):
+                with patch("dns.query.udp", mock_query_udp(udp_sequence)):
+                    with patch(
+                        "ansible_collections.community.dns.plugins.module_utils._resolver.monotonic",
+                        lambda: 0,
+                    ):
+                        with patch(
+                            "ansible_collections.community.dns.plugins.modules.wait_for_zone_serial.monotonic",
+                            mock_monotonic([0, 0.01]),
+                        ):
+                            with pytest.raises(AnsibleFailJson) as exc:
+                                with set_module_args(
+                                    {
+                                        "zones": [
+                                            {
+                                                "name": "example.com",
+                                                "serial": 2024010101,
+                                            },
+                                        ],
+                                        "timeout": 0,
+                                    }
+                                ):
+                                    wait_for_zone_serial.main()
+
+        print(exc.value.args[0])
+        # The zone is checked once, limited by query_timeout
+        assert exc.value.args[0]["msg"] == "Timeout (0 out of 1 check(s) passed)."
+        assert exc.value.args[0]["zones"][0]["check_count"] == 1
+        assert exc.value.args[0]["zones"][0]["serials"] == {
+            "ns1.example.com": 2023123101,
+        }
+
+    def test_timeout_while_checking_apex(self):
+        udp_sequence = [
+            {
+                "query_target": dns.name.from_unicode("com"),
+                "query_type": dns.rdatatype.NS,
+                "nameserver": "1.1.1.1",
+                "kwargs": {
+                    "timeout": 10,
+                },
+                "raise": dns.exception.Timeout(timeout=10),
+            },
+        ]
+        with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+            with patch("dns.query.udp", mock_query_udp(udp_sequence)):
+                with patch(
+                    "ansible_collections.community.dns.plugins.module_utils._resolver.monotonic",
+                    lambda: 0,
+                ):
+                    with patch(
+                        "ansible_collections.community.dns.plugins.modules.wait_for_zone_serial.monotonic",
+                        mock_monotonic([0, 0.01]),
+                    ):
+                        with pytest.raises(AnsibleFailJson) as exc:
+                            with set_module_args(
+                                {
+                                    "zones": [
+                                        {
+                                            "name": "example.com",
+                                            "serial": 1,
+                                        },
+                                    ],
+                                    "query_retry": 0,
+                                    "timeout": 0,
+                                }
+                            ):
+                                wait_for_zone_serial.main()
+
+        print(exc.value.args[0])
+        assert exc.value.args[0]["msg"] == "Timeout (0 out of 1 check(s) passed)."
+        assert exc.value.args[0]["zones"][0]["check_count"] == 0
+
+    def test_not_zone_apex(self):
+        udp_sequence = create_ns_sequence("example.com", ["ns1.example.com"]) + [
+            {
+                "query_target": dns.name.from_unicode("www.example.com"),
+                "query_type": dns.rdatatype.NS,
+                "nameserver": "1.1.1.1",
+                "kwargs": {
+                    "timeout": 10,
+                },
+                "result": create_mock_response(dns.rcode.NOERROR),
+            },
+        ]
+        with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+            with patch("dns.query.udp", mock_query_udp(udp_sequence)):
+                with pytest.raises(AnsibleFailJson) as exc:
+                    with set_module_args(
+                        {
+                            "zones": [
+                                {
+                                    "name": "www.example.com",
+                                    "serial": 1,
+                                },
+                            ],
+                        }
+                    ):
+                        wait_for_zone_serial.main()
+
+        print(exc.value.args[0])
+        assert (
+            exc.value.args[0]["msg"]
+            == "www.example.com is not the name of a zone, but part of the zone example.com."
+        )
+        assert exc.value.args[0]["zones"][0]["check_count"] == 0
+
+    def test_invalid_serial(self):
+        with patch("dns.resolver.get_default_resolver", mock_resolver(["1.1.1.1"], {})):
+            with pytest.raises(AnsibleFailJson) as exc:
+                with set_module_args(
+                    {
+                        "zones": [
+                            {
+                                "name": "example.com",
+                                "serial": 2**32,
+                            },
+                        ],
+                    }
+                ):
+                    wait_for_zone_serial.main()
+
+        print(exc.value.args[0])
+        assert (
+            exc.value.args[0]["msg"]
+            == "The serial of zone example.com must be between 0 and 4294967295"
+        )
@@ -9,7 +9,10 @@ from ansible.errors import AnsibleError
 
 from ansible_collections.community.dns.plugins.plugin_utils import _resolver as resolver
 from ansible_collections.community.dns.plugins.plugin_utils._resolver import (
+    NEGATIVE_CACHE,
+    RESOLVER_POOL,
     assert_requirements_present,
+    get_caches,
 )
 
 
@@ -27,3 +30,9 @@ def test_assert_requirements_present() -> None:
 
     finally:
         resolver.DNSPYTHON_IMPORTERROR = orig_importerror
+
+
+def test_get_caches() -> None:
+    assert get_caches(1000) == (NEGATIVE_CACHE, RESOLVER_POOL)
+    # Caching is disabled
+    assert get_caches(0) == (None, None)